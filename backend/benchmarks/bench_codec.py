@@ -0,0 +1,80 @@
+"""
+Compares the footprint transport encoding (insider.codec) with the JSON
+payload Celery used to carry.
+
+Usage (from backend/):
+    python benchmarks/bench_codec.py [iterations]
+"""
+
+import os
+import sys
+import json
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from insider import codec  # noqa: E402
+
+
+def healthy_footprint():
+    return {
+        "request_id": "0f8fad5b-d9cb-469f-a165-70867728950e",
+        "request_user": "anonymous",
+        "request_path": "/api/products/",
+        "request_method": "get",
+        "request_body": None,
+        "status_code": 200,
+        "response_time": 23.51,
+        "db_query_count": 4,
+        "ip_address": "10.0.0.12",
+        "user_agent": "Mozilla/5.0 (X11; Linux x86_64)",
+        "response_body": None,
+        "system_logs": [],
+        "exception_name": None,
+        "stack_trace": None,
+        "__db_alias": "insider",
+    }
+
+
+def error_footprint():
+    data = healthy_footprint()
+    data.update({
+        "request_path": "/api/orders/1337/",
+        "request_method": "post",
+        "request_body": {"sku": "A-1", "qty": 3, "notes": "x" * 200},
+        "status_code": 500,
+        "response_body": {"detail": "Internal server error", "trace_id": "abc" * 20},
+        "system_logs": [f"2026-01-01 00:00:{i:02d} - app.orders - ERROR - payment retry {i}" for i in range(60)],
+        "exception_name": "ZeroDivisionError",
+        "stack_trace": [
+            {"file": f"/srv/app/orders/views_{i}.py", "line": 10 + i, "function": "create", "code": "total = amount / qty"}
+            for i in range(30)
+        ],
+    })
+    return data
+
+
+def timed(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - start)
+
+
+def run(iterations):
+    print(f"{'payload':<10}{'format':<8}{'bytes':>8}{'encode/s':>12}{'decode/s':>12}")
+
+    for label, data in (("healthy", healthy_footprint()), ("error", error_footprint())):
+        as_json = json.dumps(data)
+        as_codec = codec.encode_text(data)
+
+        rows = (
+            ("json", len(as_json), timed(lambda: json.dumps(data), iterations), timed(lambda: json.loads(as_json), iterations)),
+            ("codec", len(as_codec), timed(lambda: codec.encode_text(data), iterations), timed(lambda: codec.decode_text(as_codec), iterations)),
+        )
+        for fmt, size, enc, dec in rows:
+            print(f"{label:<10}{fmt:<8}{size:>8}{enc:>12.0f}{dec:>12.0f}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,100 @@
+"""
+Compares serializing a footprint list page with FootprintListSerializer
+and with FootprintListRows (plain value tuples, converters picked once),
+rendered by DRF's JSONRenderer and by FastJSONRenderer (orjson, when
+installed). Rows are built in memory, so only Python time is measured.
+
+Usage (from backend/):
+    python benchmarks/bench_list_serialization.py [page size] [iterations]
+"""
+
+import os
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+settings.configure(
+    INSTALLED_APPS=["django.contrib.contenttypes", "django.contrib.auth", "rest_framework", "insider"],
+    DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}},
+    USE_TZ=True,
+)
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from insider.api import renderers  # noqa: E402
+from insider.api.renderers import FastJSONRenderer  # noqa: E402
+from insider.api.serializers import FootprintListRows, FootprintListSerializer  # noqa: E402
+from insider.models import Footprint, FootprintPayload  # noqa: E402
+
+STACK_TRACE = [
+    {"file": f"/srv/app/orders/views_{i}.py", "line": 10 + i, "function": "create", "code": "total = amount / qty"}
+    for i in range(8)
+]
+
+
+def footprints(size):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    page = []
+    for n in range(size):
+        footprint = Footprint(
+            id=n + 1, request_id=f"0f8fad5b-d9cb-469f-a165-{n:012d}", request_method="GET",
+            request_path=f"/api/orders/{n}/", status_code=500 if n % 10 == 0 else 200,
+            request_user=str(n % 7), response_time=12.5 + n, created_at=start + timedelta(seconds=n),
+            db_query_count=4, ip_address="10.0.0.12", user_agent="Mozilla/5.0 (X11; Linux x86_64)",
+        )
+        footprint.payload = FootprintPayload(stack_trace=STACK_TRACE if n % 10 == 0 else None)
+        page.append(footprint)
+    return page
+
+
+def as_rows(fields, page):
+    """
+    The tuples FootprintListRows.values() would read for `page`.
+    """
+
+    Row = namedtuple("Row", fields.columns)
+    return [
+        Row(*(footprint.stack_trace if column == "stack_trace_json" else getattr(footprint, column)
+              for column in fields.columns))
+        for footprint in page
+    ]
+
+
+def timed(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def run(size, iterations):
+    page = footprints(size)
+    fields = FootprintListRows()
+    rows = as_rows(fields, page)
+
+    serialized = lambda: FootprintListSerializer(page, many=True).data  # noqa: E731
+    mapped = lambda: fields.to_representation(rows)  # noqa: E731
+    assert JSONRenderer().render(serialized()) == FastJSONRenderer().render(mapped())
+
+    cases = (
+        ("serializer + JSONRenderer", lambda: JSONRenderer().render(serialized())),
+        ("rows + JSONRenderer", lambda: JSONRenderer().render(mapped())),
+        ("rows + FastJSONRenderer", lambda: FastJSONRenderer().render(mapped())),
+    )
+    print(f"{size} footprints per page, orjson {'installed' if renderers.orjson else 'not installed'}")
+    print(f"{'path':<28}{'ms/page':>10}")
+    for label, fn in cases:
+        print(f"{label:<28}{timed(fn, iterations):>10.3f}")
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+    )
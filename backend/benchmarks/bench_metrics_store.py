@@ -0,0 +1,79 @@
+"""
+Measures dashboard aggregations over the memory-mapped metrics store
+(insider.services.metrics_store) filled with synthetic requests. Needs
+numpy and about 22 bytes of disk per request (~2.2 GB for the default 100M).
+
+Usage (from backend/):
+    python benchmarks/bench_metrics_store.py [requests] [directory]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from insider.services import metrics_store  # noqa: E402
+
+np = metrics_store.np
+CHUNK = 1_000_000
+ROUTES = [(f"/api/v1/resource{n}/{{id}}/", method) for n in range(200) for method in ("get", "post")]
+WINDOW = timedelta(days=7)
+
+
+def fill(store, requests, end):
+    rng = np.random.default_rng(1)
+    start_ms = int((end - WINDOW).timestamp() * 1000)
+    step_ms = WINDOW.total_seconds() * 1000 / requests
+
+    for offset in range(0, requests, CHUNK):
+        size = min(CHUNK, requests - offset)
+        store.append_columns({
+            "ts": start_ms + ((offset + np.arange(size)) * step_ms).astype(np.int64),
+            "route": rng.zipf(1.3, size) % len(ROUTES),
+            "status": rng.choice([200, 201, 404, 500], size, p=[0.9, 0.05, 0.04, 0.01]),
+            "latency": rng.lognormal(3.5, 0.9, size).astype(np.float32),
+            "queries": rng.poisson(4, size),
+        }, ROUTES)
+    store.flush()
+
+
+def timed(label, function):
+    start = time.perf_counter()
+    result = function()
+    print(f"{label:<24} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    return result
+
+
+def run(requests, directory):
+    end = datetime.now(timezone.utc)
+    writer = metrics_store.MetricsStore(directory, segment_rows=16 * CHUNK)
+    timed(f"append {requests:,}", lambda: fill(writer, requests, end))
+
+    store = metrics_store.MetricsStore(directory, segment_rows=16 * CHUNK)
+    day = end - timedelta(days=1)
+    totals = timed("window totals (24h)", lambda: store.window_totals(day))
+    timed("window totals (7d)", lambda: store.window_totals(end - WINDOW))
+    percentiles = timed("percentiles (24h)", lambda: store.latency_percentiles(day))
+    timed("percentiles, one route", lambda: store.latency_percentiles(day, route=ROUTES[0][0], method="get"))
+    timed("endpoint latencies (24h)", lambda: store.endpoint_latencies(day))
+    timed("5 min buckets (7d)", lambda: store.time_series(end - WINDOW, end, bucket_seconds=300))
+
+    print(f"24h requests             {totals['total']:,} ({totals['errors_500']:,} 5xx)")
+    print(f"p50/p95/p99              {percentiles['p50']} / {percentiles['p95']} / {percentiles['p99']} ms")
+
+
+if __name__ == "__main__":
+    if np is None:
+        sys.exit("numpy is not installed.")
+
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000_000
+    directory = sys.argv[2] if len(sys.argv) > 2 else tempfile.mkdtemp(prefix="insider-bench-metrics-")
+    try:
+        run(requests, directory)
+    finally:
+        if len(sys.argv) <= 2:
+            shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,45 @@
+"""
+Measures merging per-bucket latency sketches (insider.sketch) into
+window percentiles, the work behind the dashboard's p50/p95/p99.
+
+Usage (from backend/):
+    python benchmarks/bench_sketch.py [buckets]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from insider import sketch  # noqa: E402
+
+
+def minute_sketches(buckets, requests_per_bucket=200, seed=1):
+    rng = random.Random(seed)
+    return [
+        sketch.LatencySketch.of(rng.lognormvariate(3.5, 0.9) for _ in range(requests_per_bucket)).to_bytes()
+        for _ in range(buckets)
+    ]
+
+
+def run(buckets):
+    blobs = minute_sketches(buckets)
+    size = sum(len(blob) for blob in blobs)
+
+    start = time.perf_counter()
+    dense = sketch.merge_bytes(blobs)
+    merged = time.perf_counter()
+    p50, p95, p99 = sketch.dense_quantiles(dense, [0.5, 0.95, 0.99])
+    done = time.perf_counter()
+
+    print(f"backend        {'numpy' if sketch.np is not None else 'array (pure python)'}")
+    print(f"sketches       {buckets} ({size / buckets:.0f} bytes avg)")
+    print(f"merge          {(merged - start) * 1000:.1f} ms")
+    print(f"quantiles      {(done - merged) * 1000:.2f} ms")
+    print(f"p50/p95/p99    {p50:.1f} / {p95:.1f} / {p99:.1f} ms")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -3,6 +3,7 @@ from django.db.models import Q, TextField
 from django.contrib.auth import get_user_model
 from django.db.models.functions import Cast
 from insider.models import Footprint
+from insider.services import search
 
 class FootprintFilter(django_filters.FilterSet):
     """
@@ -57,18 +58,23 @@ class FootprintFilter(django_filters.FilterSet):
 
     def filter_global_search(self, queryset, name, value):
         """
-        Scans all JSON and text payloads simultaneously for a specific string.
-        In PostgreSQL, `icontains` on JSONFields works seamlessly.
+        Searches exception names and all JSON payloads at once, through the
+        full-text index (insider.services.search) when the database has one.
+        Without it, scans them for the string (`icontains` on the JSONFields).
         """
-        return queryset.annotate(
-            search_request_body=Cast('request_body', TextField()),
-            search_response_body=Cast('response_body', TextField()),
-            search_stack_trace=Cast('stack_trace', TextField()),
-            search_system_logs=Cast('system_logs', TextField()),
-        ).filter(
-            Q(search_request_body__icontains=value) | 
-            Q(search_response_body__icontains=value) | 
-            Q(search_stack_trace__icontains=value) |
-            Q(search_system_logs__icontains=value) |
-            Q(exception_name__icontains=value)
-        )
\ No newline at end of file
+
+        matches = search.matching(value, queryset.db)
+        if matches is not None:
+            return queryset.filter(id__in=matches)
+
+        # No search index: scan the payloads.
+        fields = ('request_body', 'response_body', 'stack_trace', 'system_logs')
+        annotations, condition = {}, Q(exception_name__icontains=value)
+        for field in fields:
+            # Inline values and deduplicated (blob) values.
+            for source in (f'payload__{field}', f'payload__{field}_blob__content'):
+                alias = f"search_{source.replace('payload__', '').replace('__', '_')}"
+                annotations[alias] = Cast(source, TextField())
+                condition |= Q(**{f'{alias}__icontains': value})
+
+        return queryset.annotate(**annotations).filter(condition)
\ No newline at end of file
@@ -0,0 +1,288 @@
+"""
+insider.api.live
+----------------
+
+Live tail behind the Server-Sent Events endpoint (`live/`).
+
+Every connection subscribes to one per-process hub. A single dispatcher
+thread serves all of them: it wakes up when this process moves a watermark
+(footprints ingested, incidences resolved or ignored) or every
+LIVE_POLL_INTERVAL seconds, which picks up what other processes (Celery
+workers, the collector) wrote. Each round costs the same few queries
+however many dashboards are open:
+
+- the ids of the footprints above the last one dispatched, then one
+  FootprintFilter query over those ids per distinct subscriber filter;
+- the incidences seen since the previous round, and the incidence counts
+  per status (insider.services.status_counts), sent when they changed.
+
+Events wait in a bounded queue per connection (LIVE_QUEUE_SIZE). A client
+too slow to keep up loses the oldest ones and gets an "overflow" event
+instead, telling it to reload.
+"""
+
+import json
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connections
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from insider.models import Footprint, Incidence
+from insider.services import status_counts, watermark
+from insider.settings import settings as insider_settings
+
+from .filters import FootprintFilter
+from .serializers import FootprintListRows
+from .streaming import is_asgi
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_SECONDS = 15
+MIN_ROUND_SECONDS = 0.25
+MAX_FOOTPRINTS_PER_ROUND = 500
+INCIDENCE_FIELDS = ("id", "title", "status", "occurrence_count", "users_affected", "last_seen")
+
+Event = Tuple[str, Any, Optional[int]]
+
+
+def encode(event: str, data: Any, event_id: Optional[int] = None) -> bytes:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append("data: " + json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":")))
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+class Subscriber:
+    """
+    One connection: its footprint filter and its bounded event queue.
+    """
+
+    def __init__(self, hub: "LiveHub", params, size: int):
+        self.hub = hub
+        self.params = params
+        self.key = tuple(sorted((name, tuple(values)) for name, values in params.lists()))
+        self.events: Deque[Event] = deque(maxlen=size)
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_ready: Optional[asyncio.Event] = None
+
+    def put(self, events: List[Event]) -> None:
+        with self._lock:
+            free = self.events.maxlen - len(self.events)
+            self.dropped += max(0, len(events) - free)
+            self.events.extend(events)
+
+        self._ready.set()
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._async_ready.set)
+            except RuntimeError:
+                # The connection's event loop is gone.
+                pass
+
+    def drain(self) -> List[Event]:
+        with self._lock:
+            events, dropped = list(self.events), self.dropped
+            self.events.clear()
+            self.dropped = 0
+            self._ready.clear()
+        if self._async_ready is not None:
+            self._async_ready.clear()
+
+        if dropped:
+            events.insert(0, ("overflow", {"dropped": dropped}, None))
+        return events
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+    def wait(self, timeout: float) -> None:
+        self._ready.wait(timeout)
+
+    async def wait_async(self, timeout: float) -> None:
+        if self._async_ready is None:
+            self._loop = asyncio.get_running_loop()
+            self._async_ready = asyncio.Event()
+            if self._ready.is_set():
+                self._async_ready.set()
+        try:
+            await asyncio.wait_for(self._async_ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+class LiveHub:
+    """
+    The subscribers of this process and the dispatch rounds feeding them.
+    Without `threaded`, rounds only run when `dispatch()` is called.
+    """
+
+    def __init__(self, threaded: bool = True):
+        self.threaded = threaded
+        self.subscribers: Set[Subscriber] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._cursor: Optional[int] = None
+        self._incidences_since = None
+        self._status_counts: Optional[Dict[str, int]] = None
+
+    def subscribe(self, params) -> Subscriber:
+        subscriber = Subscriber(self, params, insider_settings.LIVE_QUEUE_SIZE)
+        with self._lock:
+            if self._cursor is None:
+                self.reset()
+            self.subscribers.add(subscriber)
+            if self.threaded and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="insider-live", daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            self.subscribers.discard(subscriber)
+        self._wake.set()
+
+    def publish(self, scope: str = "data") -> None:
+        """
+        Watermark listener: new data in this process, dispatch now.
+        """
+
+        if scope == "data" and self.subscribers:
+            self._wake.set()
+
+    def reset(self) -> None:
+        """
+        Starts the tail at the newest footprint and the current time.
+        """
+
+        self._cursor = Footprint.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        self._incidences_since = timezone.now()
+        self._status_counts = self.status_counts()
+
+    def _run(self) -> None:
+        try:
+            while True:
+                with self._lock:
+                    if not self.subscribers:
+                        # The next subscriber starts a new thread from the newest footprint.
+                        self._thread, self._cursor = None, None
+                        return
+
+                self._wake.wait(insider_settings.LIVE_POLL_INTERVAL)
+                self._wake.clear()
+                # A long-lived thread: drop connections past CONN_MAX_AGE or broken since the last round.
+                close_old_connections()
+                try:
+                    if self.dispatch():
+                        self._wake.set()
+                except Exception as e:
+                    logger.warning(f"INSIDER: Live tail round failed: {e}")
+                time.sleep(MIN_ROUND_SECONDS)
+        finally:
+            connections.close_all()
+
+    def dispatch(self) -> bool:
+        """
+        One round. Returns True when footprints were left for the next one.
+        """
+
+        with self._lock:
+            subscribers = list(self.subscribers)
+        if not subscribers:
+            return False
+
+        ids = list(
+            Footprint.objects.filter(pk__gt=self._cursor).order_by("pk")
+            .values_list("pk", flat=True)[:MAX_FOOTPRINTS_PER_ROUND]
+        )
+        shared = self.incidence_events()
+
+        groups: Dict[tuple, List[Subscriber]] = {}
+        for subscriber in subscribers:
+            groups.setdefault(subscriber.key, []).append(subscriber)
+
+        for members in groups.values():
+            events = self.footprint_events(members[0].params, ids) + shared
+            if events:
+                for subscriber in members:
+                    subscriber.put(events)
+
+        if ids:
+            self._cursor = ids[-1]
+        return len(ids) == MAX_FOOTPRINTS_PER_ROUND
+
+    def footprint_events(self, params, ids: List[int]) -> List[Event]:
+        if not ids:
+            return []
+        footprints = FootprintFilter(params, queryset=Footprint.objects.filter(pk__in=ids)).qs.order_by("pk")
+        rows = FootprintListRows()
+        return [("footprint", data, data["id"]) for data in rows.to_representation(rows.values(footprints))]
+
+    def incidence_events(self) -> List[Event]:
+        events = []
+        changed = list(
+            Incidence.objects.filter(last_seen__gt=self._incidences_since).order_by("last_seen")
+            .values(*INCIDENCE_FIELDS)
+        )
+        if changed:
+            self._incidences_since = changed[-1]["last_seen"]
+            events += [("incidence", row, None) for row in changed]
+
+        counts = self.status_counts()
+        if counts != self._status_counts:
+            self._status_counts = counts
+            events.append(("incidences", counts, None))
+        return events
+
+    def status_counts(self) -> Dict[str, int]:
+        return status_counts.counts(insider_settings.DB_ALIAS)
+
+
+hub = LiveHub()
+watermark.listen(hub.publish)
+
+
+def stream(subscriber: Subscriber):
+    try:
+        yield b"retry: 5000\n\n"
+        while True:
+            subscriber.wait(KEEPALIVE_SECONDS)
+            events = subscriber.drain()
+            yield b"".join(encode(*event) for event in events) if events else b": keepalive\n\n"
+    finally:
+        subscriber.close()
+
+
+async def astream(subscriber: Subscriber):
+    try:
+        yield b"retry: 5000\n\n"
+        while True:
+            await subscriber.wait_async(KEEPALIVE_SECONDS)
+            events = subscriber.drain()
+            yield b"".join(encode(*event) for event in events) if events else b": keepalive\n\n"
+    finally:
+        subscriber.close()
+
+
+def stream_response(request, subscriber: Subscriber) -> StreamingHttpResponse:
+    """
+    An event stream for `subscriber`: an async iterator under ASGI, so open
+    dashboards don't hold a worker thread each, a plain one under WSGI.
+    """
+
+    events = astream(subscriber) if is_asgi(request) else stream(subscriber)
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
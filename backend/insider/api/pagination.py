@@ -0,0 +1,152 @@
+import json
+import base64
+from collections import OrderedDict
+
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from insider.services import status_counts
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination on (created_at, id), newest first.
+
+    The opaque cursor holds the (created_at, id) of the row a page ends (or
+    starts) at, so every page is one index range scan of `page_size + 1`
+    rows, however deep. No total is computed unless asked for with
+    `count=exact` (counted up to `count_cap` rows) or `count=estimate` (the
+    planner's row estimate on PostgreSQL, a capped count elsewhere).
+    """
+
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    count_cap = 10000
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        page = queryset.order_by(*(('created_at', 'id') if reverse else ('-created_at', '-id')))
+        if position is not None:
+            created_at, pk = position
+            if reverse:
+                page = page.filter(created_at__gte=created_at).exclude(created_at=created_at, id__lte=pk)
+            else:
+                page = page.filter(created_at__lte=created_at).exclude(created_at=created_at, id__gte=pk)
+
+        rows = list(page[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        # Coming back from a later page means there is one after this page, and vice versa.
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = has_more if reverse else position is not None
+        self.first, self.last = (rows[0], rows[-1]) if rows else (None, None)
+        self.count, self.count_exact = self.get_count(queryset, request.query_params.get(self.count_query_param))
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_count(self, queryset, mode):
+        if mode not in ('exact', 'estimate'):
+            return None, None
+
+        queryset = queryset.order_by()
+        if mode == 'estimate' and connections[queryset.db].vendor == 'postgresql':
+            plan = json.loads(queryset.explain(format='json'))
+            return int(plan[0]['Plan']['Plan Rows']), False
+
+        count = queryset[:self.count_cap + 1].count()
+        return min(count, self.count_cap), count <= self.count_cap
+
+    def get_paginated_response(self, data):
+        body = OrderedDict([('next', self.get_next_link()), ('previous', self.get_previous_link())])
+        if self.count is not None:
+            body['count'] = self.count
+            body['count_exact'] = self.count_exact
+        body['results'] = data
+        return Response(body)
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.last, False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.first, True))
+
+    def encode_cursor(self, row, reverse):
+        raw = f"{'p' if reverse else 'n'}|{row.created_at.isoformat()}|{row.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        """
+        Returns ((created_at, id) or None for the first page, reverse).
+        """
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            raw = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)).decode()
+            direction, created_at, pk = raw.split('|')
+            created_at, pk = parse_datetime(created_at), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if direction not in ('n', 'p') or created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return (created_at, pk), direction == 'p'
+
+
+class IncidencePagination(PageNumberPagination):
+    """
+    Page numbers over the incidences, each page carrying the per-status
+    counts. When the view only filtered by status (its `counted_statuses`),
+    the total is the sum of those counters instead of a COUNT(*).
+    """
+
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.status_counts = status_counts.counts(queryset.db)
+        statuses = getattr(view, 'counted_statuses', None)
+        self.known_count = None if statuses is None else sum(self.status_counts[status] for status in statuses)
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, object_list, per_page):
+        paginator = DjangoPaginator(object_list, per_page)
+        if self.known_count is not None:
+            paginator.count = self.known_count
+        return paginator
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['status_counts'] = self.status_counts
+        return response
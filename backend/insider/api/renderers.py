@@ -0,0 +1,92 @@
+import re
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+
+from .live import encode
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Floats orjson writes differently from json.dumps (1e-05 vs 1e-5). Loose on
+# purpose, so the scan stays cheap: a string ending a token the same way only
+# costs a fallback.
+EXPONENT_FLOAT = re.compile(rb'e-?[0-9]+(?:[,\]}]|\Z)')
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets `Accept: text/event-stream` (what EventSource sends) through content
+    negotiation. The stream itself is a StreamingHttpResponse; only errors
+    are rendered here, as a single "error" event.
+    """
+
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return encode('error', data)
+
+
+class DownloadRenderer(BaseRenderer):
+    """
+    Lets a download's media type through content negotiation. The file is a
+    StreamingHttpResponse; only errors are rendered here, as JSON.
+    """
+
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return JSONRenderer().render(data)
+
+
+class NDJSONRenderer(DownloadRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class CSVRenderer(DownloadRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class GzipRenderer(DownloadRenderer):
+    media_type = 'application/gzip'
+    format = 'gzip'
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer through orjson when it is installed, byte for byte the same
+    output. Whatever orjson would write differently still goes through
+    json.dumps: indented, ASCII-only or non-compact responses, non-string
+    keys, types orjson rejects, floats in exponent notation.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            # Datetimes go through the DRF encoder, like with json.dumps.
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if EXPONENT_FLOAT.search(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+def fast_json_renderers():
+    """
+    The default renderer classes, with FastJSONRenderer for JSONRenderer.
+    """
+
+    return [FastJSONRenderer if renderer is JSONRenderer else renderer for renderer in api_settings.DEFAULT_RENDERER_CLASSES]
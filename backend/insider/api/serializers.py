@@ -1,3 +1,5 @@
+from django.db.models import F, JSONField
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
 from insider.models import (
     Incidence, Footprint, InsiderSetting,
@@ -6,25 +8,44 @@ from insider.models import (
 from insider.settings import settings as insider_settings 
 
 
-class FootprintListSerializer(serializers.ModelSerializer):
+def slow_threshold():
+    """
+    SLOW_REQUEST_THRESHOLD (500 when unset) as a float, None if it isn't a number.
+    """
+
+    threshold = getattr(insider_settings, 'SLOW_REQUEST_THRESHOLD', None)
+    if threshold is None:
+        threshold = 500
+
+    try:
+        return float(threshold)
+    except (TypeError, ValueError):
+        return None
+
+
+class SparseFieldsMixin:
+    """
+    `fields=[...]` keeps only the named fields (every field when None).
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class FootprintListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Lightweight: For lists (Recent Occurrences, Breadcrumbs)."""
     is_slow = serializers.SerializerMethodField()
+    stack_trace = serializers.JSONField(read_only=True)
 
     def get_is_slow(self, obj):
-        threshold = getattr(insider_settings, 'SLOW_REQUEST_THRESHOLD', None)
-        if threshold is None:
-            threshold = 500
-
-        if obj.response_time is None:
+        threshold = slow_threshold()
+        if obj.response_time is None or threshold is None:
             return False
-        
-        try:
-            
-            return obj.response_time > float(threshold)
-        except (TypeError, ValueError):
-            return False
-        
-    
+        return obj.response_time > threshold
+
     class Meta:
         model = Footprint
         fields = [
@@ -33,21 +54,102 @@ class FootprintListSerializer(serializers.ModelSerializer):
             'stack_trace', 'is_slow', 'ip_address', 'user_agent'
         ]
 
+
+class FootprintListRows:
+    """
+    FootprintListSerializer's output for many footprints, without a
+    serializer per row: `values()` reads plain (named) tuples of only the
+    columns the requested fields need, and `to_representation()` maps them
+    to the very dicts the serializer returns, through converters picked
+    once from the serializer's own fields.
+    """
+
+    # DRF fields whose to_representation is this builtin.
+    CONVERTERS = {
+        serializers.IntegerField: int,
+        serializers.FloatField: float,
+        serializers.CharField: str,
+        serializers.IPAddressField: str,
+    }
+
+    def __init__(self, fields=None):
+        serializer = FootprintListSerializer(fields=fields)
+        # id and created_at are always read, for keyset cursors.
+        self.columns = ['id', 'created_at']
+        # (name, column index, converter or None to keep the value, what None becomes)
+        self.outputs = []
+
+        for name, field in serializer.fields.items():
+            if name == 'is_slow':
+                threshold = slow_threshold()
+                convert = (lambda value: False) if threshold is None else threshold.__lt__
+                self.outputs.append((name, self._column('response_time'), convert, False))
+            elif name == 'stack_trace':
+                self.outputs.append((name, self._column('stack_trace_json'), None, None))
+            else:
+                convert = self.CONVERTERS.get(type(field), field.to_representation)
+                self.outputs.append((name, self._column(field.source), convert, None))
+
+    def _column(self, name):
+        if name not in self.columns:
+            self.columns.append(name)
+        return self.columns.index(name)
+
+    def values(self, queryset):
+        if 'stack_trace_json' in self.columns:
+            queryset = queryset.annotate(stack_trace_json=Coalesce(
+                F('payload__stack_trace'), F('payload__stack_trace_blob__content'), output_field=JSONField()
+            ))
+        return queryset.values_list(*self.columns, named=True)
+
+    def to_representation(self, rows):
+        outputs = self.outputs
+        data = []
+        for row in rows:
+            item = {}
+            for name, index, convert, none in outputs:
+                value = row[index]
+                if value is None:
+                    item[name] = none
+                else:
+                    item[name] = value if convert is None else convert(value)
+            data.append(item)
+        return data
+
+
 class FootprintDetailSerializer(serializers.ModelSerializer):
     """Heavyweight: For the 'Forensics' Lab. Includes full bodies and logs."""
 
+    request_body = serializers.JSONField(read_only=True)
+    response_body = serializers.JSONField(read_only=True)
+    system_logs = serializers.JSONField(read_only=True)
+    stack_trace = serializers.JSONField(read_only=True)
+
     class Meta:
         model = Footprint
         fields = '__all__'
 
 
+class UsersAffectedField(serializers.ReadOnlyField):
+    """
+    The exact count when the view annotated one (EXACT_USERS_AFFECTED),
+    the stored HyperLogLog estimate otherwise.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return getattr(value, 'exact_users_affected', value.users_affected)
+
+
 class IncidenceListSerializer(serializers.ModelSerializer):
     """
     For the 'Incidence' table.
-    'users_affected' will be injected by the View's annotation (SQL count).
     """
 
-    users_affected = serializers.IntegerField(read_only=True)
+    users_affected = UsersAffectedField()
 
     class Meta:
         model = Incidence
@@ -60,11 +162,11 @@ class IncidenceListSerializer(serializers.ModelSerializer):
 class IncidenceDetailSerializer(serializers.ModelSerializer):
     """For the 'Deep Dive' view."""
     
-    users_affected = serializers.IntegerField(read_only=True)
+    users_affected = UsersAffectedField()
     
     class Meta:
         model = Incidence
-        fields = '__all__'
+        exclude = ['user_registers']
 
 
 class InsiderSettingSerializer(serializers.ModelSerializer):
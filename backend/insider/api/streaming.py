@@ -0,0 +1,25 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+_END = object()
+
+
+def is_asgi(request) -> bool:
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+async def aiterate(iterator):
+    """
+    Serves a synchronous iterator (e.g. one reading a database cursor) to
+    an ASGI StreamingHttpResponse one item at a time. Django would otherwise
+    read all of it into memory first. Every step runs in the same sync
+    thread, the one owning the connection.
+    """
+
+    iterator = iter(iterator)
+    step = sync_to_async(next, thread_sensitive=True)
+    while True:
+        item = await step(iterator, _END)
+        if item is _END:
+            return
+        yield item
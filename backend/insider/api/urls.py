@@ -2,8 +2,8 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     IncidenceViewSet, FootprintViewSet, 
-    DashboardStatsView, SettingsViewSet,
-    IntegrationViewSet
+    DashboardStatsView, LatencyView, TimeSeriesView, SettingsViewSet,
+    IntegrationViewSet, LiveView
 )
 
 router = DefaultRouter()
@@ -15,4 +15,7 @@ router.register(r'integrations', IntegrationViewSet, basename='integration')
 urlpatterns = [
     path('', include(router.urls)),
     path('dashboard/stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
+    path('dashboard/latency/', LatencyView.as_view(), name='dashboard-latency'),
+    path('dashboard/timeseries/', TimeSeriesView.as_view(), name='dashboard-timeseries'),
+    path('live/', LiveView.as_view(), name='live'),
 ]
\ No newline at end of file
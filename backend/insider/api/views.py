@@ -1,26 +1,78 @@
+import hashlib
 from datetime import timedelta
-from django.db.models import Count, Avg
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, permissions
+from rest_framework.exceptions import ValidationError
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import serializers
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+from . import live
 from .filters import FootprintFilter
+from .pagination import IncidencePagination, KeysetPagination
+from .renderers import CSVRenderer, EventStreamRenderer, GzipRenderer, NDJSONRenderer, fast_json_renderers
+from .streaming import aiterate, is_asgi
 
 from insider.models import (
-    Incidence, Footprint, InsiderSetting,
+    Incidence, Footprint, FootprintPayload, InsiderSetting,
     InsiderIntegration, InsiderIntegrationKey
 )
 from insider.settings import DEFAULTS, reload_settings
 from .serializers import (
     IncidenceListSerializer, IncidenceDetailSerializer,
-    FootprintListSerializer, FootprintDetailSerializer,
+    FootprintListSerializer, FootprintListRows, FootprintDetailSerializer,
     InsiderSettingSerializer, InsiderIntegrationSerializer
 )
 from insider.settings import settings as insider_settings
+from insider.services.incidence_cache import incidence_cache
+from insider.services import export, rollups, status_counts, watermark
+from insider.utils import series_window
+
+
+DATA_VERSIONS = {
+    # New footprints, seen from the database even when the cache isn't shared.
+    "footprints": lambda: (
+        watermark.current(),
+        Footprint.objects.order_by('-pk').values_list('pk', flat=True).first(),
+    ),
+    # New occurrences, deleted incidences and status changes.
+    "incidences": lambda: (
+        watermark.current(),
+        Incidence.objects.order_by('-last_seen').values_list('last_seen', flat=True).first(),
+        tuple(status_counts.counts(insider_settings.DB_ALIAS).items()),
+    ),
+    "settings": lambda: (
+        watermark.current("settings"),
+        *InsiderSetting.objects.aggregate(Max('updated_at'), Count('id')).values(),
+    ),
+    # Sliding windows ("last 24h") move every minute.
+    "minute": lambda: rollups.bucket_start(timezone.now()),
+}
+
+
+def etag_for(*scopes):
+    """
+    `condition()` ETag function: a hash of the request URL and the data
+    versions of `scopes`, a few indexed lookups instead of the view's
+    queries. A matching If-None-Match gets a 304 without running the view.
+    """
+
+    def etag(request, *args, **kwargs):
+        versions = [request.get_full_path(), *(DATA_VERSIONS[scope]() for scope in scopes)]
+        return hashlib.sha1(repr(versions).encode()).hexdigest()
+    return etag
+
+
+DASHBOARD_ETAG = etag_for("footprints", "incidences", "settings", "minute")
 
 
 class CustomPagination(PageNumberPagination):
@@ -29,6 +81,65 @@ class CustomPagination(PageNumberPagination):
     max_page_size = 100
  
 
+def sparse_fields(request, serializer_class=FootprintListSerializer):
+    """
+    The fields of `serializer_class` named by the `fields` query parameter
+    (comma-separated), all of them without one.
+    """
+
+    available = serializer_class.Meta.fields
+    value = request.query_params.get('fields') if request is not None else None
+    if not value:
+        return list(available)
+
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise ValidationError({'fields': f"Unknown fields: {', '.join(unknown)}. Choose from {', '.join(available)}."})
+    return fields
+
+
+def with_payload(queryset):
+    """
+    The whole payload, shared blobs included, in the same query.
+    """
+
+    return queryset.select_related('payload', *(f'payload__{blob}' for blob in FootprintPayload.BLOB_RELATIONS))
+
+
+def dashboard_metrics():
+    """
+    Where dashboard figures come from: the footprint rollups, or the
+    memory-mapped metrics store with DASHBOARD_BACKEND = "metrics". Both
+    offer window_totals, latency_percentiles, endpoint_latencies and
+    time_series.
+    """
+
+    if insider_settings.DASHBOARD_BACKEND == "metrics":
+        from insider.services.metrics_store import get_store
+        return get_store()
+    return rollups
+
+
+def with_users_affected(queryset):
+    """
+    `users_affected` is kept up to date during ingestion. With
+    EXACT_USERS_AFFECTED it is counted over the footprints instead, as
+    `exact_users_affected`: a subquery per returned row, so a page only
+    counts its own incidences.
+    """
+
+    queryset = queryset.defer('user_registers')
+    if insider_settings.EXACT_USERS_AFFECTED:
+        users = Footprint.objects.filter(incidence=OuterRef('pk')).order_by().values('incidence').annotate(
+            n=Count('request_user', distinct=True)
+        ).values('n')
+        queryset = queryset.annotate(
+            exact_users_affected=Coalesce(Subquery(users, output_field=IntegerField()), 0)
+        )
+    return queryset
+
+
 class IsStaff(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated and request.user.is_staff
@@ -37,28 +148,73 @@ class IsStaff(permissions.BasePermission):
 class IncidenceViewSet(viewsets.ReadOnlyModelViewSet):
     """
     Powers the 'Incidence' and 'Deep Dive' rooms.
+
+    The list is paginated when the request carries `page` (the whole list
+    otherwise), sorted by `ordering` (last_seen, occurrence_count or
+    users_affected, `-` for descending) and filtered by `status` and
+    `last_seen_after`/`last_seen_before`, each combination served by an
+    index. Pages carry the per-status counts. frontend/src always passes
+    `page`; the unpaginated default stays for the prebuilt bundle in
+    insider/static until it is rebuilt.
     """
     permission_classes = [IsStaff]
-    pagination_class = None
+    pagination_class = IncidencePagination
+    renderer_classes = fast_json_renderers()
+    ORDERINGS = ('last_seen', 'occurrence_count', 'users_affected')
+    DATETIME_FILTERS = {'last_seen_after': 'last_seen__gte', 'last_seen_before': 'last_seen__lte'}
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            paginated = self.request is not None and 'page' in self.request.query_params
+            self._paginator = self.pagination_class() if paginated else None
+        return self._paginator
 
     def get_queryset(self):
-        qs = Incidence.objects.annotate(
-            users_affected=Count('footprint__request_user', distinct=True)
-        ).order_by('-last_seen')
-
-        filter_type = self.request.query_params.get("filter")
+        qs = with_users_affected(Incidence.objects.all())
+        params = self.request.query_params
+
+        ordering = params.get('ordering', '-last_seen')
+        if ordering.lstrip('-') not in self.ORDERINGS:
+            raise ValidationError({'ordering': f"Must be one of {', '.join(self.ORDERINGS)}, optionally prefixed with '-'."})
+        qs = qs.order_by(ordering, '-id' if ordering.startswith('-') else 'id')
+
+        # Totals come from the status counters unless another filter narrows the list.
+        statuses = [status for status, _ in Incidence.STATUS_CHOICES]
+        if 'status' in params:
+            statuses = [status for status in params['status'].upper().split(',') if status]
+            if not set(statuses) <= {status for status, _ in Incidence.STATUS_CHOICES}:
+                raise ValidationError({'status': 'Unknown status.'})
+            qs = qs.filter(status__in=statuses)
+        self.counted_statuses = statuses
+
+        for param, lookup in self.DATETIME_FILTERS.items():
+            if param in params:
+                value = parse_datetime(params[param])
+                if value is None:
+                    raise ValidationError({param: 'Enter a valid date/time.'})
+                qs = qs.filter(**{lookup: value})
+                self.counted_statuses = None
+
+        filter_type = params.get("filter")
 
         # filter by incidences created in the last hour
         if filter_type == "new":
             one_hour_ago = timezone.now() - timedelta(hours=1)
             qs = qs.filter(created_at__gte=one_hour_ago)
+            self.counted_statuses = None
 
         # filter by incidences with high occurence counts.
         if filter_type == "regressions":
             qs = qs.filter(status='OPEN', occurrence_count__gt=1)
+            self.counted_statuses = None
         
         return qs 
 
+    @method_decorator(condition(etag_func=etag_for("incidences")))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return IncidenceDetailSerializer
@@ -75,7 +231,9 @@ class IncidenceViewSet(viewsets.ReadOnlyModelViewSet):
         if not ids:
             return Response({"error": "No IDs provided"}, status=400)
         
-        count = Incidence.objects.filter(id__in=ids).update(status='RESOLVED')
+        count = status_counts.move(Incidence.objects.filter(id__in=ids), 'RESOLVED', insider_settings.DB_ALIAS)
+        incidence_cache.invalidate_ids(ids)
+        watermark.bump()
         return Response({"message": f"Resolved {count} incidence"}, status=200)
     
 
@@ -90,10 +248,20 @@ class IncidenceViewSet(viewsets.ReadOnlyModelViewSet):
         if not ids:
             return Response({"error": "No IDs provided"}, status=400)
         
-        count = Incidence.objects.filter(id__in=ids).update(status='IGNORED')
+        count = status_counts.move(Incidence.objects.filter(id__in=ids), 'IGNORED', insider_settings.DB_ALIAS)
+        incidence_cache.invalidate_ids(ids)
+        watermark.bump()
         return Response({"message": f"Ignored {count} incidence"}, status=200)
 
 
+    @action(detail=False, methods=['get'])
+    def counts(self, request):
+        """
+        Incidences per status, from the counters.
+        """
+
+        return Response(status_counts.counts(insider_settings.DB_ALIAS))
+
     @action(detail=True, methods=['get'])
     def footprints(self, request, pk=None):
         """
@@ -102,9 +270,9 @@ class IncidenceViewSet(viewsets.ReadOnlyModelViewSet):
         """
 
         incidence = self.get_object()
-        recent_footprints = incidence.footprint_set.all().order_by('-created_at')[:20]
-        serializer = FootprintListSerializer(recent_footprints, many=True)
-        return Response(serializer.data)
+        rows = FootprintListRows(sparse_fields(request))
+        recent_footprints = rows.values(incidence.footprint_set.all()).order_by('-created_at')[:20]
+        return Response(rows.to_representation(recent_footprints))
 
 
 class FootprintViewSet(viewsets.ReadOnlyModelViewSet):
@@ -115,14 +283,75 @@ class FootprintViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Footprint.objects.all().order_by('-created_at')
     permission_classes = [IsStaff]
     pagination_class = CustomPagination
+    renderer_classes = fast_json_renderers()
     filter_backends = [DjangoFilterBackend]
     filterset_class = FootprintFilter
 
+    @property
+    def paginator(self):
+        """
+        Keyset pagination when the request carries `cursor` (empty for the
+        first page), page numbers otherwise.
+        """
+
+        if not hasattr(self, '_paginator'):
+            keyset = self.request is not None and 'cursor' in self.request.query_params
+            self._paginator = KeysetPagination() if keyset else self.pagination_class()
+        return self._paginator
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            return with_payload(queryset)
+        return queryset
+
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return FootprintDetailSerializer
         return FootprintListSerializer
 
+    def list(self, request, *args, **kwargs):
+        """
+        Pages of plain value tuples mapped by FootprintListRows: the same
+        output as FootprintListSerializer, without a serializer per row.
+        """
+
+        rows = FootprintListRows(sparse_fields(request))
+        queryset = rows.values(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rows.to_representation(page))
+        return Response(rows.to_representation(queryset))
+
+    @action(detail=False, methods=['get'],
+            renderer_classes=[*fast_json_renderers(), NDJSONRenderer, CSVRenderer, GzipRenderer])
+    def export(self, request):
+        """
+        Every footprint matching the filters, streamed as NDJSON or CSV
+        (`output=csv`, or `Accept: text/csv`). `fields` picks the columns,
+        payload fields included; `gzip=1` (or `Accept: application/gzip`)
+        compresses on the fly.
+        """
+
+        accepted = request.accepted_renderer.format
+        fmt = request.query_params.get('output') or (accepted if accepted in export.FORMATS else 'ndjson')
+        if fmt not in export.FORMATS:
+            raise ValidationError({'output': f"Must be one of {', '.join(export.FORMATS)}."})
+        try:
+            fields = export.parse_fields(request.query_params.get('fields'))
+        except ValueError as e:
+            raise ValidationError({'fields': str(e)})
+        compress = request.query_params.get('gzip') in ('1', 'true') or accepted == 'gzip'
+
+        chunks = export.export(self.filter_queryset(Footprint.objects.all()), fmt, fields, compress)
+        response = StreamingHttpResponse(
+            aiterate(chunks) if is_asgi(request) else chunks,
+            content_type='application/gzip' if compress else export.CONTENT_TYPES[fmt],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{export.filename(fmt, compress, timezone.now())}"'
+        return response
+
     @action(detail=True, methods=['get'])
     def breadcrumbs(self, request, pk=None):
         """
@@ -139,14 +368,14 @@ class FootprintViewSet(viewsets.ReadOnlyModelViewSet):
         # Look back 5 minutes max
         start_time = crash_time - timedelta(minutes=5)
 
-        breadcrumbs = Footprint.objects.filter(
+        rows = FootprintListRows(sparse_fields(request))
+        breadcrumbs = rows.values(Footprint.objects.filter(
             request_user=user,
             created_at__gte=start_time,
             created_at__lt=crash_time
-        ).order_by('-created_at')[:10]
+        )).order_by('-created_at')[:10]
 
-        serializer = FootprintListSerializer(breadcrumbs, many=True)
-        return Response(serializer.data)
+        return Response(rows.to_representation(breadcrumbs))
 
 
 class DashboardStatsView(APIView):
@@ -157,39 +386,131 @@ class DashboardStatsView(APIView):
     permission_classes = [IsStaff]
     pagination_class = None
 
+    @method_decorator(condition(etag_func=DASHBOARD_ETAG))
     def get(self, request):
-        now = timezone.now()
-        last_24h = now - timedelta(hours=24)
-        
-        recent_qs = Footprint.objects.filter(created_at__gte=last_24h)
+        since = rollups.bucket_start(timezone.now() - timedelta(hours=24))
 
-        # Velocity Metrics (Counts)
-        total_requests = recent_qs.count()
-        error_count_500 = recent_qs.filter(status_code__gte=500).count()
-        error_count_400 = recent_qs.filter(status_code__gte=400, status_code__lt=500).count()
+        # Shared by every open dashboard for up to DASHBOARD_CACHE_SECONDS, or until an incidence changes status.
+        return Response(watermark.cached(
+            "dashboard",
+            (insider_settings.DASHBOARD_BACKEND, insider_settings.EXACT_USERS_AFFECTED, since.isoformat()),
+            lambda: self.compute(since),
+        ))
 
-        # Health Card: Average Response Time
-        avg_response = recent_qs.aggregate(avg=Avg('response_time'))['avg'] or 0
+    def compute(self, last_24h):
+        # Velocity Metrics and Health Card, from the per-minute rollups (or the metrics store),
+        # each one conditional aggregate over the window
+        metrics = dashboard_metrics()
+        totals = metrics.window_totals(last_24h)
 
         # Impact Scoreboard: Top Offenders (Incidences affecting most users)
-        top_incidences = Incidence.objects.filter(status='OPEN').annotate(
-            users_affected=Count('footprint__request_user', distinct=True)
-        ).order_by('-users_affected')[:5]
-        
-        top_incidences_data = IncidenceListSerializer(top_incidences, many=True).data
+        top_incidences = with_users_affected(Incidence.objects.filter(status='OPEN')).order_by(
+            '-exact_users_affected' if insider_settings.EXACT_USERS_AFFECTED else '-users_affected'
+        )[:5]
 
-        return Response({
+        return {
             "velocity": {
-                "total_24h": total_requests,
-                "errors_500": error_count_500,
-                "errors_400": error_count_400,
+                "total_24h": totals["total"],
+                "errors_500": totals["errors_500"],
+                "errors_400": totals["errors_400"],
             },
             "health": {
-                "avg_response_time_ms": round(avg_response, 2)
+                "avg_response_time_ms": round(totals["avg_response_time"], 2),
+                **{f"{name}_response_time_ms": value for name, value in metrics.latency_percentiles(last_24h).items()},
             },
-            "top_offenders": top_incidences_data
+            "top_offenders": list(IncidenceListSerializer(top_incidences, many=True).data),
+        }
+
+
+class LatencyView(APIView):
+    """
+    Response time percentiles over the last `hours` (default 24), overall
+    and for the slowest endpoints. Optional `route` and `method` narrow the
+    overall figures to one endpoint.
+    """
+    permission_classes = [IsStaff]
+    pagination_class = None
+
+    @method_decorator(condition(etag_func=DASHBOARD_ETAG))
+    def get(self, request):
+        try:
+            hours = max(1, min(int(request.query_params.get("hours", 24)), 24 * 366))
+        except ValueError:
+            return Response({"error": "hours must be an integer"}, status=400)
+
+        since = timezone.now() - timedelta(hours=hours)
+        filters = {
+            key: request.query_params[key]
+            for key in ("route", "method")
+            if request.query_params.get(key)
+        }
+
+        metrics = dashboard_metrics()
+        return Response({
+            "window_hours": hours,
+            "overall": metrics.latency_percentiles(since, **filters),
+            "endpoints": metrics.endpoint_latencies(since),
         })
-    
+
+
+class TimeSeriesView(APIView):
+    """
+    Request, 4xx and 5xx counts and response time percentiles over the last
+    `hours` (default 24) in `bucket` second buckets (a multiple of 60,
+    picked from the range by default), as parallel arrays for the charts.
+    """
+    permission_classes = [IsStaff]
+    renderer_classes = fast_json_renderers()
+    pagination_class = None
+
+    BUCKETS = (60, 300, 900, 3600, 6 * 3600, 24 * 3600)
+    DEFAULT_POINTS = 288
+    MAX_POINTS = 2000
+
+    @method_decorator(condition(etag_func=DASHBOARD_ETAG))
+    def get(self, request):
+        try:
+            hours = max(1, min(int(request.query_params.get("hours", 24)), 24 * 366))
+            bucket = request.query_params.get("bucket")
+            bucket = int(bucket) if bucket else next(
+                (b for b in self.BUCKETS if hours * 3600 // b <= self.DEFAULT_POINTS), self.BUCKETS[-1]
+            )
+        except ValueError:
+            return Response({"error": "hours and bucket must be integers"}, status=400)
+
+        if bucket < 60 or bucket % 60:
+            return Response({"error": "bucket must be a positive multiple of 60 seconds"}, status=400)
+        if hours * 3600 // bucket > self.MAX_POINTS:
+            return Response({"error": f"At most {self.MAX_POINTS} buckets per series"}, status=400)
+
+        now = timezone.now()
+        start, _ = series_window(now - timedelta(hours=hours), now, bucket)
+        metrics = dashboard_metrics()
+        series = watermark.cached(
+            "timeseries",
+            (insider_settings.DASHBOARD_BACKEND, start, bucket),
+            lambda: metrics.time_series(now - timedelta(hours=hours), now, bucket_seconds=bucket),
+        )
+        return Response({"window_hours": hours, "bucket_seconds": bucket, **series})
+
+
+class LiveView(APIView):
+    """
+    Server-Sent Events: new footprints matching the FootprintFilter query
+    string, incidence occurrences and per-status incidence counts, as they
+    arrive. See insider.api.live.
+    """
+    permission_classes = [IsStaff]
+    renderer_classes = [EventStreamRenderer, JSONRenderer]
+
+    def get(self, request):
+        filterset = FootprintFilter(request.query_params, queryset=Footprint.objects.none())
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=400)
+
+        subscriber = live.hub.subscribe(request.query_params.copy())
+        return live.stream_response(request, subscriber)
+
 
 class SettingsViewSet(viewsets.ModelViewSet):
     """
@@ -210,6 +531,7 @@ class SettingsViewSet(viewsets.ModelViewSet):
 
         return InsiderSetting.objects.exclude(key='DB_ALIAS').order_by('key')
     
+    @method_decorator(condition(etag_func=etag_for("settings")))
     def list(self, request, *args, **kwargs):
         """
         Auto-Discovery: If settings table is empty, populate it with DEFAULTS.
@@ -272,6 +594,10 @@ class IntegrationViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         return InsiderIntegration.objects.all().order_by('order') # Waterfall order
 
+    @method_decorator(condition(etag_func=etag_for("settings")))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     @action(detail=True, methods=['patch'])
     def toggle(self, request, identifier=None):
         """Enable or Disable an integration."""
@@ -316,5 +642,6 @@ class IntegrationViewSet(viewsets.ReadOnlyModelViewSet):
         # Update each item's order field
         for index, identifier in enumerate(new_order):
             InsiderIntegration.objects.filter(identifier=identifier).update(order=index)
-            
+
+        watermark.bump("settings")
         return Response({'status': 'reordered'})
\ No newline at end of file
@@ -1,7 +1,7 @@
 import sys
 import logging
 from django.apps import AppConfig
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_delete, post_migrate, post_save
 from insider.utils import is_celery_available
 
 logger = logging.getLogger(__name__)
@@ -14,6 +14,24 @@ class InsiderConfig(AppConfig):
     def ready(self):
         post_migrate.connect(sync_integrations_callback, sender=self)
 
+        from insider.models import (
+            Footprint, FootprintPayload, Incidence, InsiderSetting, InsiderIntegration, InsiderIntegrationKey
+        )
+        from insider.services.blobs import release_deleted_payload
+        from insider.services.search import delete_footprint_document, forget_backend
+        post_migrate.connect(forget_backend, sender=self, dispatch_uid="insider_forget_search_backend")
+        post_delete.connect(release_deleted_payload, sender=FootprintPayload, dispatch_uid="insider_release_payload_blobs")
+        post_delete.connect(delete_footprint_document, sender=Footprint, dispatch_uid="insider_delete_search_document")
+
+        from insider.services.status_counts import count_created, count_deleted
+        post_save.connect(count_created, sender=Incidence, dispatch_uid="insider_count_created_incidence")
+        post_delete.connect(count_deleted, sender=Incidence, dispatch_uid="insider_count_deleted_incidence")
+
+        from insider.services.watermark import bump_settings
+        for model in (InsiderSetting, InsiderIntegration, InsiderIntegrationKey):
+            for signal in (post_save, post_delete):
+                signal.connect(bump_settings, sender=model, dispatch_uid=f"insider_settings_version_{model.__name__}")
+
         if any(cmd in sys.argv for cmd in ['makemigrations', 'migrate', 'help', 'test']):
             return
         
@@ -41,6 +59,13 @@ class InsiderConfig(AppConfig):
                         'schedule': crontab(hour=3, minute=0) # Run daily at 3:00 AM
                     }
                 })
+
+            current_app.conf.beat_schedule.update({
+                'insider-rollup-compaction': {
+                    'task': 'insider.tasks.compact_rollups',
+                    'schedule': crontab(minute=5) # Run hourly
+                }
+            })
         except ImportError:
             pass
 
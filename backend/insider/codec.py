@@ -0,0 +1,281 @@
+"""
+insider.codec
+-------------
+
+Compact binary encoding for footprint payloads in transit (Celery, spool,
+collector).
+
+Layout:
+
+    [1 byte version][1 byte flags][body]
+
+The body holds the values of FIELDS positionally, so field names are never
+repeated on the wire, followed by a dict of any keys the schema doesn't know.
+Each value starts with a one-byte tag. Bytes stay bytes, scalars are packed
+natively, aware datetimes as epoch microseconds and dicts/lists go through
+the C JSON encoder. Bodies larger than
+COMPRESS_THRESHOLD are compressed (zlib by default, lz4 on request when the
+package is installed on both ends) and kept uncompressed if that doesn't make
+them smaller.
+
+Bump VERSION (and keep decoding the old one) whenever FIELDS changes.
+"""
+
+import json
+import zlib
+import base64
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+
+VERSION = 2
+
+FIELDS_V1 = (
+    "request_id",
+    "request_user",
+    "request_path",
+    "request_method",
+    "request_body",
+    "status_code",
+    "response_time",
+    "db_query_count",
+    "ip_address",
+    "user_agent",
+    "response_body",
+    "system_logs",
+    "exception_name",
+    "stack_trace",
+    "__db_alias",
+)
+FIELDS = FIELDS_V1 + ("created_at",)
+SCHEMAS = {1: FIELDS_V1, 2: FIELDS}
+
+COMPRESS_THRESHOLD = 512  # bytes
+
+FLAG_ZLIB = 0x01
+FLAG_LZ4 = 0x02
+
+# Value tags
+T_ABSENT, T_NONE, T_FALSE, T_TRUE, T_INT, T_FLOAT, T_STR, T_BYTES, T_JSON, T_LIST, T_DICT, T_DATETIME = range(12)
+
+_DOUBLE = struct.Struct(">d")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class CodecError(ValueError):
+    pass
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _write_zigzag(out: bytearray, value: int) -> None:
+    _write_varint(out, (value << 1) if value >= 0 else ((-value << 1) - 1))
+
+
+def _read_zigzag(data: bytes, pos: int):
+    raw, pos = _read_varint(data, pos)
+    return (raw >> 1) if not raw & 1 else -((raw + 1) >> 1), pos
+
+
+def _write_value(out: bytearray, value: Any) -> None:
+    if value is None:
+        out.append(T_NONE)
+    elif value is True:
+        out.append(T_TRUE)
+    elif value is False:
+        out.append(T_FALSE)
+    elif isinstance(value, int):
+        out.append(T_INT)
+        _write_zigzag(out, value)
+    elif isinstance(value, float):
+        out.append(T_FLOAT)
+        out += _DOUBLE.pack(value)
+    elif isinstance(value, str):
+        raw = value.encode("utf-8")
+        out.append(T_STR)
+        _write_varint(out, len(raw))
+        out += raw
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        raw = bytes(value)
+        out.append(T_BYTES)
+        _write_varint(out, len(raw))
+        out += raw
+    elif isinstance(value, datetime) and value.tzinfo is not None:
+        out.append(T_DATETIME)
+        _write_zigzag(out, (value - _EPOCH) // timedelta(microseconds=1))
+    elif isinstance(value, (dict, list, tuple)):
+        try:
+            raw = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        except TypeError:
+            # Nested bytes (or similar) that JSON can't carry: encode item by item.
+            _write_container(out, value)
+            return
+        out.append(T_JSON)
+        _write_varint(out, len(raw))
+        out += raw
+    else:
+        _write_value(out, str(value))
+
+
+def _write_container(out: bytearray, value: Any) -> None:
+    if isinstance(value, dict):
+        out.append(T_DICT)
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            _write_value(out, str(key))
+            _write_value(out, item)
+    else:
+        out.append(T_LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _write_value(out, item)
+
+
+def _read_value(data: bytes, pos: int):
+    tag = data[pos]
+    pos += 1
+
+    if tag == T_NONE or tag == T_ABSENT:
+        return None, pos
+    if tag == T_TRUE:
+        return True, pos
+    if tag == T_FALSE:
+        return False, pos
+    if tag == T_INT:
+        return _read_zigzag(data, pos)
+    if tag == T_DATETIME:
+        micros, pos = _read_zigzag(data, pos)
+        return _EPOCH + timedelta(microseconds=micros), pos
+    if tag == T_FLOAT:
+        return _DOUBLE.unpack_from(data, pos)[0], pos + _DOUBLE.size
+    if tag in (T_STR, T_BYTES, T_JSON):
+        length, pos = _read_varint(data, pos)
+        raw = data[pos:pos + length]
+        pos += length
+        if tag == T_STR:
+            return raw.decode("utf-8"), pos
+        if tag == T_BYTES:
+            return bytes(raw), pos
+        return json.loads(raw.decode("utf-8")), pos
+    if tag == T_LIST:
+        count, pos = _read_varint(data, pos)
+        items = []
+        for _ in range(count):
+            item, pos = _read_value(data, pos)
+            items.append(item)
+        return items, pos
+    if tag == T_DICT:
+        count, pos = _read_varint(data, pos)
+        items = {}
+        for _ in range(count):
+            key, pos = _read_value(data, pos)
+            items[key], pos = _read_value(data, pos)
+        return items, pos
+
+    raise CodecError(f"Unknown value tag {tag} at offset {pos - 1}.")
+
+
+def encode(
+    footprint_data: Dict[str, Any],
+    compress_threshold: Optional[int] = COMPRESS_THRESHOLD,
+    compression: str = "zlib",
+) -> bytes:
+    """
+    Encodes a footprint dict into the compact binary form.
+    `compress_threshold=None` disables compression.
+    """
+
+    body = bytearray()
+    for name in FIELDS:
+        if name in footprint_data:
+            _write_value(body, footprint_data[name])
+        else:
+            body.append(T_ABSENT)
+
+    extras = {k: v for k, v in footprint_data.items() if k not in FIELDS}
+    _write_value(body, extras)
+
+    flags = 0
+    if compress_threshold is not None and len(body) > compress_threshold:
+        if compression == "lz4":
+            if lz4_frame is None:
+                raise CodecError("lz4 compression requested but the 'lz4' package is not installed.")
+            packed, flag = lz4_frame.compress(bytes(body)), FLAG_LZ4
+        else:
+            packed, flag = zlib.compress(bytes(body), 1), FLAG_ZLIB
+
+        if len(packed) < len(body):
+            body, flags = packed, flag
+
+    return bytes((VERSION, flags)) + bytes(body)
+
+
+def decode(payload: bytes) -> Dict[str, Any]:
+    """
+    Decodes bytes produced by `encode` back into the original dict.
+    """
+
+    if len(payload) < 2:
+        raise CodecError("Payload too short.")
+
+    version, flags = payload[0], payload[1]
+    fields = SCHEMAS.get(version)
+    if fields is None:
+        raise CodecError(f"Unsupported footprint payload version {version}.")
+
+    body = payload[2:]
+    if flags & FLAG_LZ4:
+        if lz4_frame is None:
+            raise CodecError("Payload is lz4-compressed but the 'lz4' package is not installed.")
+        body = lz4_frame.decompress(body)
+    elif flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+
+    data: Dict[str, Any] = {}
+    pos = 0
+    for name in fields:
+        present = body[pos] != T_ABSENT
+        value, pos = _read_value(body, pos)
+        if present:
+            data[name] = value
+
+    extras, pos = _read_value(body, pos)
+    data.update(extras)
+    return data
+
+
+def encode_text(footprint_data: Dict[str, Any]) -> str:
+    """
+    `encode`, as ASCII text for transports that only carry JSON (Celery's json serializer).
+    """
+
+    return base64.b64encode(encode(footprint_data)).decode("ascii")
+
+
+def decode_text(payload: str) -> Dict[str, Any]:
+    return decode(base64.b64decode(payload))
+
+
+__all__ = ["encode", "decode", "encode_text", "decode_text", "CodecError", "VERSION", "FIELDS"]
@@ -1,17 +1,32 @@
 from threading import Thread
 from insider.services.footprint import save_footprint
+from insider.services.collector import get_collector_client
 from insider.utils import is_celery_available
+from insider import codec
 
 
 def dispatch_save_footprint(footprint_data: dict):
     """
-    Makes use of celery to save, otherwise defaults to thread.
+    Hands the footprint to the host collector if one is configured,
+    otherwise makes use of celery to save, otherwise defaults to thread.
+    """
+
+    collector = get_collector_client()
+    if collector is not None and collector.send(footprint_data):
+        return
+
+    dispatch_locally(footprint_data)
+
+
+def dispatch_locally(footprint_data: dict):
+    """
+    Celery if available, otherwise a thread.
     """
 
     if is_celery_available():
         try:
             from insider.tasks import save_footprint_task
-            save_footprint_task.delay(footprint_data)
+            save_footprint_task.delay(codec.encode_text(footprint_data))
             return
         except Exception:
             pass
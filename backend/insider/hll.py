@@ -0,0 +1,83 @@
+"""
+insider.hll
+-----------
+
+HyperLogLog counter for the number of distinct users behind an incidence.
+
+Each value is hashed to 64 bits: the first PRECISION bits pick one of
+NUM_REGISTERS registers, and the register keeps the longest run of leading
+zeros (+1) seen in the remaining bits. The distinct count is estimated from
+the registers alone, with linear counting while most registers are still
+empty, so small counts come out (nearly) exact. The standard error is
+1.04 / sqrt(NUM_REGISTERS), about 1.6%.
+
+Registers are stored as one byte each. Adding a value only ever raises a
+register, so two counters merge by taking the per-register maximum.
+"""
+
+import math
+import hashlib
+from typing import Iterable, Optional, Tuple
+
+PRECISION = 12
+NUM_REGISTERS = 1 << PRECISION
+
+_VALUE_BITS = 64 - PRECISION
+_ALPHA = 0.7213 / (1 + 1.079 / NUM_REGISTERS)
+
+
+def position(value: str) -> Tuple[int, int]:
+    """
+    Returns (register index, rank) of a value.
+    """
+
+    digest = int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "big")
+    index = digest >> _VALUE_BITS
+    rest = digest & ((1 << _VALUE_BITS) - 1)
+    return index, _VALUE_BITS - rest.bit_length() + 1
+
+
+class HyperLogLog:
+    __slots__ = ("registers",)
+
+    def __init__(self, registers: Optional[bytes] = None):
+        if registers is not None and len(registers) != NUM_REGISTERS:
+            raise ValueError(f"Expected {NUM_REGISTERS} registers, got {len(registers)}.")
+        self.registers = bytearray(registers) if registers is not None else bytearray(NUM_REGISTERS)
+
+    @classmethod
+    def of(cls, values: Iterable[str]) -> "HyperLogLog":
+        counter = cls()
+        for value in values:
+            counter.add(value)
+        return counter
+
+    def add(self, value: str) -> bool:
+        """
+        Counts a value. Returns whether any register changed.
+        """
+
+        return self.add_position(*position(value))
+
+    def add_position(self, index: int, rank: int) -> bool:
+        if self.registers[index] >= rank:
+            return False
+        self.registers[index] = rank
+        return True
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        zeros = self.registers.count(0)
+        if zeros == NUM_REGISTERS:
+            return 0
+
+        estimate = _ALPHA * NUM_REGISTERS * NUM_REGISTERS / math.fsum(2.0 ** -r for r in self.registers)
+        if estimate <= 2.5 * NUM_REGISTERS and zeros:
+            estimate = NUM_REGISTERS * math.log(NUM_REGISTERS / zeros)
+        return round(estimate)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
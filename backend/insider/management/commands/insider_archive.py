@@ -0,0 +1,49 @@
+import json
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from insider.services import archive
+from insider.settings import settings as insider_settings
+from insider.sinks.ndjson import FootprintJSONEncoder
+
+
+class Command(BaseCommand):
+    help = 'Archives footprints past their retention cutoff, or queries the archive (--query).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', type=str, help='Target database alias')
+        parser.add_argument('--directory', type=str, help='Archive directory (defaults to INSIDER ARCHIVE_DIR)')
+        parser.add_argument('--format', choices=archive.FORMATS, help='parquet (requires pyarrow) or ndjson')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows fetched per query and per row group')
+
+        parser.add_argument('--query', action='store_true', help='Print matching archived footprints as NDJSON')
+        parser.add_argument('--since', type=datetime.fromisoformat, help='ISO timestamp, inclusive')
+        parser.add_argument('--until', type=datetime.fromisoformat, help='ISO timestamp, exclusive')
+        parser.add_argument('--route', type=str, help='Request path or normalized route')
+        parser.add_argument('--status-min', type=int)
+        parser.add_argument('--status-max', type=int)
+        parser.add_argument('--limit', type=int)
+
+    def handle(self, *args, **options):
+        directory = options['directory'] or insider_settings.ARCHIVE_DIR
+        if not directory:
+            raise CommandError("No archive directory: set INSIDER['ARCHIVE_DIR'] or pass --directory.")
+
+        if options['query']:
+            rows = archive.query_archive(
+                since=options['since'], until=options['until'], route=options['route'],
+                status_min=options['status_min'], status_max=options['status_max'],
+                directory=directory, limit=options['limit'],
+            )
+            for row in rows:
+                self.stdout.write(json.dumps(row, cls=FootprintJSONEncoder))
+            return
+
+        db_alias = options['database'] or insider_settings.DB_ALIAS
+        try:
+            archived = archive.archive_expired(
+                db_alias, directory=directory, fmt=options['format'], chunk_size=options['chunk_size']
+            )
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} expiring footprints to {directory}."))
@@ -0,0 +1,59 @@
+import signal
+import logging
+from django.core.management.base import BaseCommand, CommandError
+from django.db.utils import InterfaceError, OperationalError
+from insider.services.collector import Collector
+from insider.services.footprint import save_footprint_batch, spool_footprint
+from insider.settings import settings as insider_settings
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Runs the per-host footprint collector that web workers send to over COLLECTOR_SOCKET.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--socket', type=str, help='Socket path (defaults to INSIDER COLLECTOR_SOCKET)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Footprints written per batch')
+        parser.add_argument('--flush-interval', type=float, default=1.0, help='Max seconds a footprint waits before being written')
+
+    def handle(self, *args, **options):
+        path = options['socket'] or insider_settings.COLLECTOR_SOCKET
+        if not path:
+            raise CommandError("No socket configured. Set INSIDER['COLLECTOR_SOCKET'] or pass --socket.")
+
+        batch_size = max(1, options['batch_size'])
+        collector = Collector(
+            path,
+            flush=lambda batch: self._flush(batch, batch_size),
+            batch_size=batch_size,
+            flush_interval=options['flush_interval'],
+        )
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: collector.stop())
+
+        collector.bind()
+        self.stdout.write(self.style.SUCCESS(f"Collecting footprints on '{path}' (Ctrl+C to stop)."))
+        collector.serve_forever()
+        self.stdout.write("Collector stopped.")
+
+    def _flush(self, batch, batch_size):
+        try:
+            save_footprint_batch(batch, batch_size=batch_size)
+
+        except (OperationalError, InterfaceError) as e:
+            # Replay re-applies the configured ORM sink filters, so spooling the whole batch is safe.
+            spooled = 0
+            for footprint_data in batch:
+                footprint_data = dict(footprint_data)
+                db_alias = footprint_data.pop('__db_alias', None) or 'default'
+                spooled += spool_footprint(footprint_data, db_alias)
+
+            if spooled < len(batch):
+                logger.error(f"INSIDER: Collector lost {len(batch) - spooled} footprints: {e}")
+
+        except Exception as e:
+            # Sinks already skip the footprints they fail on and commit the rest, so
+            # resending the batch would only count and notify the written ones twice.
+            logger.error(f"INSIDER: Collector batch of {len(batch)} footprints failed: {e}", exc_info=True)
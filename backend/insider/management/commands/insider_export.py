@@ -0,0 +1,55 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+from insider.api.filters import FootprintFilter
+from insider.models import Footprint
+from insider.services import export
+from insider.settings import settings as insider_settings
+
+
+class Command(BaseCommand):
+    help = 'Streams the footprints matching Forensics filters to a file (or stdout) as NDJSON or CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', type=str, help='Target database alias')
+        parser.add_argument('--format', choices=export.FORMATS, default='ndjson')
+        parser.add_argument(
+            '--fields', type=str,
+            help=f"Comma-separated columns (default: every footprint column, no payloads). Choose from {', '.join(export.FIELDS)}"
+        )
+        parser.add_argument(
+            '--filter', action='append', default=[], metavar='NAME=VALUE',
+            help='A footprint filter, as in the API (e.g. status_code__in=500,502 or created_after=2026-01-01). Repeatable.'
+        )
+        parser.add_argument('--gzip', action='store_true', help='Compress the output')
+        parser.add_argument('--output', type=str, help='File to write (defaults to stdout)')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows fetched per database round trip')
+
+    def handle(self, *args, **options):
+        db_alias = options['database'] or insider_settings.DB_ALIAS
+
+        params = QueryDict(mutable=True)
+        for item in options['filter']:
+            name, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f"Filters are NAME=VALUE, got '{item}'.")
+            params.appendlist(name, value)
+
+        filterset = FootprintFilter(params, queryset=Footprint.objects.using(db_alias))
+        if not filterset.is_valid():
+            raise CommandError(f"Invalid filters: {filterset.errors.as_json()}")
+
+        try:
+            fields = export.parse_fields(options['fields'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        chunks = export.export(filterset.qs, options['format'], fields, options['gzip'], options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'wb') as handle:
+                written = sum(handle.write(chunk) for chunk in chunks)
+            self.stderr.write(self.style.SUCCESS(f"Exported {written} bytes to {options['output']}."))
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from insider.services import partitions
+from insider.settings import settings as insider_settings
+
+
+class Command(BaseCommand):
+    help = 'Creates upcoming footprint partitions (PostgreSQL), optionally converting the table first.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', type=str, help='Target database alias')
+        parser.add_argument('--interval', choices=partitions.INTERVALS, help='Partition size (defaults to INSIDER PARTITION_INTERVAL)')
+        parser.add_argument('--ahead', type=int, help='Future partitions to create (defaults to INSIDER PARTITION_PREMAKE)')
+        parser.add_argument(
+            '--convert', action='store_true',
+            help='Convert the existing footprint table into a partitioned one (one-off, keeps existing rows)'
+        )
+
+    def handle(self, *args, **options):
+        db_alias = options['database'] or insider_settings.DB_ALIAS
+        connection = connections[db_alias]
+        interval = options['interval'] or insider_settings.PARTITION_INTERVAL
+
+        if not partitions.supports_partitioning(connection):
+            raise CommandError(f"Database '{db_alias}' is {connection.vendor}; footprint partitioning requires PostgreSQL.")
+
+        if not interval:
+            raise CommandError("No interval configured. Set INSIDER['PARTITION_INTERVAL'] or pass --interval.")
+
+        if not partitions.is_partitioned(connection):
+            if not options['convert']:
+                raise CommandError("The footprint table is not partitioned yet. Re-run with --convert.")
+
+            self.stdout.write(f"Converting footprint table on '{db_alias}' to {interval} partitions...")
+            partitions.convert_to_partitioned(connection, interval=interval)
+
+        created = partitions.create_partitions(connection, interval=interval, ahead=options['ahead'])
+        for name in created:
+            self.stdout.write(f"   [Created] {name}")
+
+        self.stdout.write(self.style.SUCCESS(f"Footprint partitions ready ({len(created)} created)."))
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+from insider.services.footprint import save_footprint_batch
+from insider.services.spool import Spool, get_spool
+from insider.sinks import get_sinks
+from insider.sinks.orm import ORMSink
+
+
+class Command(BaseCommand):
+    help = 'Loads footprints spooled to disk during a database outage back into the database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--spool-dir', type=str, help='Spool directory (defaults to INSIDER SPOOL_DIR)')
+        parser.add_argument('--database', type=str, help='Override the target database alias of every record')
+        parser.add_argument('--batch-size', type=int, default=500, help='Records written per transaction')
+
+    def handle(self, *args, **options):
+        spool = Spool(options['spool_dir']) if options['spool_dir'] else get_spool()
+        if spool is None:
+            raise CommandError("No spool configured. Set INSIDER['SPOOL_DIR'] or pass --spool-dir.")
+
+        batch_size = max(1, options['batch_size'])
+        db_override = options['database']
+
+        # Only database writes are ever spooled, so other sinks already have these footprints.
+        sinks = [sink for sink in get_sinks() if isinstance(sink, ORMSink)] or [ORMSink()]
+
+        segments = spool.segments()
+        self.stdout.write(f"Replaying {len(segments)} spool segment(s) from '{spool.directory}'...")
+
+        total = 0
+        for segment in segments:
+            offset = spool.get_offset(segment)
+            batch, batch_end = [], offset
+
+            try:
+                for record, next_offset in spool.read(segment, offset):
+                    if db_override:
+                        record['__db_alias'] = db_override
+
+                    batch.append(record)
+                    batch_end = next_offset
+
+                    if len(batch) >= batch_size:
+                        total += save_footprint_batch(batch, batch_size=batch_size, sinks=sinks)
+                        spool.commit_offset(segment, batch_end)
+                        batch = []
+
+                if batch:
+                    total += save_footprint_batch(batch, batch_size=batch_size, sinks=sinks)
+                    spool.commit_offset(segment, batch_end)
+
+            except Exception as e:
+                raise CommandError(
+                    f"Replay stopped in {segment} after {total} footprints: {e}. "
+                    "Re-run the command to resume from the last committed batch."
+                )
+
+            if spool.is_active(segment):
+                self.stdout.write(f"   [Live] {segment} (a writer still holds it, offset saved)")
+            else:
+                spool.remove(segment)
+                self.stdout.write(f"   [Done] {segment}")
+
+        self.stdout.write(self.style.SUCCESS(f"Successfully replayed {total} footprints."))
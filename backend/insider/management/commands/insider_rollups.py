@@ -0,0 +1,30 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from insider.services import rollups
+from insider.settings import settings as insider_settings
+
+
+class Command(BaseCommand):
+    help = 'Compacts footprint rollups, or rebuilds them from the raw footprints.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', type=str, help='Target database alias')
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Recompute rollups from raw footprints (e.g. after upgrading with existing data)'
+        )
+        parser.add_argument('--days', type=int, help='Days to rebuild (defaults to INSIDER DATA_RETENTION_DAYS)')
+
+    def handle(self, *args, **options):
+        db_alias = options['database'] or insider_settings.DB_ALIAS
+
+        if options['rebuild']:
+            days = options['days'] or insider_settings.DATA_RETENTION_DAYS or 30
+            self.stdout.write(f"Rebuilding rollups for the last {days} days on '{db_alias}'...")
+            rows = rollups.rebuild_rollups(db_alias, since=timezone.now() - timedelta(days=days))
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} minute rollups (older ones compacted)."))
+            return
+
+        rows = rollups.compact_rollups(db_alias)
+        self.stdout.write(self.style.SUCCESS(f"Compacted rollups into {rows} coarser rows."))
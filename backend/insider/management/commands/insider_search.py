@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from insider.services import search
+from insider.settings import settings as insider_settings
+
+
+class Command(BaseCommand):
+    help = 'Shows the global search index in use, or rebuilds it from the stored footprints.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', type=str, help='Target database alias')
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Index every stored footprint (e.g. after upgrading with existing data)'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Footprints indexed per batch')
+
+    def handle(self, *args, **options):
+        db_alias = options['database'] or insider_settings.DB_ALIAS
+        backend = search.backend(db_alias)
+
+        if backend is None:
+            raise CommandError(f"No search index on '{db_alias}': global search scans the payloads.")
+        if not insider_settings.SEARCH_INDEX:
+            raise CommandError("INSIDER['SEARCH_INDEX'] is off: global search scans the payloads.")
+
+        if not options['rebuild']:
+            self.stdout.write(f"Global search on '{db_alias}' uses the {backend} full-text index.")
+            return
+
+        self.stdout.write(f"Rebuilding the search index on '{db_alias}'...")
+        indexed = search.rebuild(db_alias, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} footprints."))
@@ -8,6 +8,7 @@ import traceback
 from typing import Dict, Any, Optional
 
 from django.db import connection
+from django.utils import timezone
 from django.utils.deprecation import MiddlewareMixin
 
 from insider.settings import settings as insider_settings 
@@ -197,7 +198,8 @@ class FootprintMiddleware(MiddlewareMixin):
 
         resp_content = None
         
-        if insider_settings.CAPTURE_RESPONSE:
+        # Streamed responses (exports, live tail) have no content to keep.
+        if insider_settings.CAPTURE_RESPONSE and not response.streaming:
             # Respect EXCLUDE_CONTENT_TYPES
             ct = response.get("Content-Type", "").lower()
             if any(excluded in ct for excluded in insider_settings.EXCLUDE_CONTENT_TYPES):
@@ -259,6 +261,8 @@ class FootprintMiddleware(MiddlewareMixin):
             'system_logs': system_logs,
             'exception_name': exception_name,
             'stack_trace': stack_trace,
+            # Stamped here, so footprints written late (spool replay, collector) keep their time.
+            'created_at': timezone.now(),
         }
         
         db_alias_to_use = insider_settings.DB_ALIAS
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:18
+
+from django.db import migrations, models
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """
+    CREATE INDEX CONCURRENTLY on PostgreSQL, so building the indexes doesn't
+    block footprint writes on a large table; a plain AddIndex elsewhere.
+    Without importing django.contrib.postgres, which needs psycopg.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.add_index(model, self.index, concurrently=True)
+        else:
+            schema_editor.add_index(model, self.index)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.remove_index(model, self.index, concurrently=True)
+        else:
+            schema_editor.remove_index(model, self.index)
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('insider', '0007_refresh_integrations'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='footprint',
+            index=models.Index(fields=['created_at', 'status_code', 'response_time'], name='insider_fp_created_stat_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='footprint',
+            index=models.Index(condition=models.Q(('status_code__gte', 400)), fields=['created_at', 'status_code'], name='insider_fp_errors_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='footprint',
+            index=models.Index(fields=['incidence', 'created_at'], name='insider_fp_incidence_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='footprint',
+            index=models.Index(fields=['request_user', 'created_at'], name='insider_fp_user_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='footprint',
+            index=models.Index(fields=['status_code', 'created_at'], name='insider_fp_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='footprint',
+            index=models.Index(fields=['response_time'], name='insider_fp_latency_idx'),
+        ),
+        # insider_fp_incidence_idx leads with incidence_id, so the FK's own index is redundant.
+        migrations.AlterField(
+            model_name='footprint',
+            name='incidence',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=models.deletion.CASCADE, to='insider.incidence'),
+        ),
+    ]
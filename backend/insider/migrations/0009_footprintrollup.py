@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insider', '0008_footprint_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FootprintRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour'), ('day', 'Day')], default='minute', max_length=6)),
+                ('bucket', models.DateTimeField(help_text='Start of the bucket (UTC).')),
+                ('route', models.CharField(help_text='Request path with numeric IDs replaced by {id}.', max_length=255)),
+                ('method', models.CharField(blank=True, default='', max_length=20)),
+                ('status_class', models.PositiveSmallIntegerField()),
+                ('count', models.BigIntegerField(default=0)),
+                ('error_count', models.BigIntegerField(default=0)),
+                ('latency_sum', models.FloatField(default=0.0)),
+                ('latency_min', models.FloatField(default=0.0)),
+                ('latency_max', models.FloatField(default=0.0)),
+                ('db_query_sum', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Footprint Rollup',
+                'verbose_name_plural': 'Footprint Rollups',
+                'indexes': [models.Index(fields=['bucket'], name='insider_rollup_bucket_idx')],
+                'constraints': [models.UniqueConstraint(fields=('resolution', 'bucket', 'route', 'method', 'status_class'), name='insider_rollup_key')],
+            },
+        ),
+    ]
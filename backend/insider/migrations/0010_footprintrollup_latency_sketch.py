@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insider', '0009_footprintrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='footprintrollup',
+            name='latency_sketch',
+            field=models.BinaryField(blank=True, help_text="Serialized insider.sketch.LatencySketch of the bucket's response times.", null=True),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+PAYLOAD_COLUMNS = ('request_body', 'response_body', 'system_logs', 'stack_trace')
+
+
+def copy_payloads(apps, schema_editor):
+    """
+    Moves the JSON blobs into the payload table with one INSERT ... SELECT,
+    skipping footprints that have none of them.
+    """
+
+    qn = schema_editor.quote_name
+    columns = ', '.join(qn(c) for c in PAYLOAD_COLUMNS)
+    has_payload = ' OR '.join(f"{qn(c)} IS NOT NULL" for c in PAYLOAD_COLUMNS)
+    schema_editor.execute(
+        f"INSERT INTO {qn('insider_footprintpayload')} ({qn('footprint_id')}, {columns}) "
+        f"SELECT {qn('id')}, {columns} FROM {qn('insider_footprint')} WHERE {has_payload}"
+    )
+
+
+def restore_payloads(apps, schema_editor):
+    qn = schema_editor.quote_name
+    for column in PAYLOAD_COLUMNS:
+        schema_editor.execute(
+            f"UPDATE {qn('insider_footprint')} SET {qn(column)} = ("
+            f"SELECT p.{qn(column)} FROM {qn('insider_footprintpayload')} p "
+            f"WHERE p.{qn('footprint_id')} = {qn('insider_footprint')}.{qn('id')})"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insider', '0010_footprintrollup_latency_sketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FootprintPayload',
+            fields=[
+                ('footprint', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='payload', serialize=False, to='insider.footprint')),
+                ('request_body', models.JSONField(blank=True, help_text='Parsed request body (e.g., POST/JSON data).', null=True)),
+                ('response_body', models.JSONField(blank=True, null=True)),
+                ('system_logs', models.JSONField(blank=True, help_text='Captured system logs (list of strings).', null=True)),
+                ('stack_trace', models.JSONField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Footprint Payload',
+                'verbose_name_plural': 'Footprint Payloads',
+            },
+        ),
+        migrations.RunPython(copy_payloads, restore_payloads),
+        migrations.RemoveField(
+            model_name='footprint',
+            name='request_body',
+        ),
+        migrations.RemoveField(
+            model_name='footprint',
+            name='response_body',
+        ),
+        migrations.RemoveField(
+            model_name='footprint',
+            name='stack_trace',
+        ),
+        migrations.RemoveField(
+            model_name='footprint',
+            name='system_logs',
+        ),
+    ]
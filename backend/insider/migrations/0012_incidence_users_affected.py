@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:41
+
+from django.db import migrations, models
+
+
+def count_users(apps, schema_editor):
+    """
+    Builds the distinct-user registers of existing incidences from their footprints.
+    """
+
+    from insider.hll import HyperLogLog
+
+    Incidence = apps.get_model('insider', 'Incidence')
+    Footprint = apps.get_model('insider', 'Footprint')
+    db_alias = schema_editor.connection.alias
+
+    counters = {}
+    pairs = Footprint.objects.using(db_alias).filter(incidence__isnull=False).values_list(
+        'incidence_id', 'request_user'
+    ).distinct()
+    for incidence_id, user in pairs.iterator():
+        if user:
+            counters.setdefault(incidence_id, HyperLogLog()).add(user)
+
+    for incidence_id, counter in counters.items():
+        Incidence.objects.using(db_alias).filter(id=incidence_id).update(
+            user_registers=counter.to_bytes(), users_affected=counter.count()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insider', '0011_footprintpayload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incidence',
+            name='user_registers',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='incidence',
+            name='users_affected',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_users, migrations.RunPython.noop),
+    ]
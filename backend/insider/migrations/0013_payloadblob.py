@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insider', '0012_incidence_users_affected'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayloadBlob',
+            fields=[
+                ('hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('content', models.JSONField()),
+                ('size', models.PositiveIntegerField(help_text='Bytes of canonical JSON.')),
+                ('refcount', models.IntegerField(default=0, help_text='Payload fields referencing this blob.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Payload Blob',
+                'verbose_name_plural': 'Payload Blobs',
+                'indexes': [models.Index(condition=models.Q(('refcount__lte', 0)), fields=['hash'], name='insider_blob_unref_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='footprintpayload',
+            name='request_body_blob',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='insider.payloadblob'),
+        ),
+        migrations.AddField(
+            model_name='footprintpayload',
+            name='response_body_blob',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='insider.payloadblob'),
+        ),
+        migrations.AddField(
+            model_name='footprintpayload',
+            name='stack_trace_blob',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='insider.payloadblob'),
+        ),
+        migrations.AddField(
+            model_name='footprintpayload',
+            name='system_logs_blob',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='insider.payloadblob'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+TABLE = 'insider_footprintsearch'
+
+
+def create_search_index(apps, schema_editor):
+    """
+    The global search index (see insider.services.search). Databases other
+    than PostgreSQL and SQLite with FTS5 go without one.
+    """
+
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f"CREATE TABLE {TABLE} (footprint_id bigint PRIMARY KEY, document tsvector NOT NULL)"
+        )
+        schema_editor.execute(f"CREATE INDEX insider_search_gin_idx ON {TABLE} USING gin (document)")
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                return
+        schema_editor.execute(f"CREATE VIRTUAL TABLE {TABLE} USING fts5(document)")
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insider', '0013_payloadblob'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
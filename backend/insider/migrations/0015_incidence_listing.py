@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:14
+
+from django.db import migrations, models
+
+
+def count_statuses(apps, schema_editor):
+    """
+    Starts the per-status counters from the existing incidences.
+    """
+
+    from django.db.models import Count
+
+    Incidence = apps.get_model('insider', 'Incidence')
+    IncidenceStatusCount = apps.get_model('insider', 'IncidenceStatusCount')
+    db_alias = schema_editor.connection.alias
+
+    rows = Incidence.objects.using(db_alias).order_by().values_list('status').annotate(n=Count('id'))
+    IncidenceStatusCount.objects.using(db_alias).bulk_create(
+        [IncidenceStatusCount(status=status, count=n) for status, n in rows]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insider', '0014_footprintsearch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncidenceStatusCount',
+            fields=[
+                ('status', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Incidence Status Count',
+                'verbose_name_plural': 'Incidence Status Counts',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='incidence',
+            index=models.Index(fields=['status', '-last_seen', '-id'], name='insider_inc_status_seen_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incidence',
+            index=models.Index(fields=['status', '-occurrence_count', '-id'], name='insider_inc_status_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incidence',
+            index=models.Index(fields=['status', '-users_affected', '-id'], name='insider_inc_status_users_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incidence',
+            index=models.Index(fields=['-last_seen', '-id'], name='insider_inc_seen_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incidence',
+            index=models.Index(fields=['created_at'], name='insider_inc_created_idx'),
+        ),
+        migrations.RunPython(count_statuses, migrations.RunPython.noop),
+    ]
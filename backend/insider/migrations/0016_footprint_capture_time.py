@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insider', '0015_incidence_listing'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='footprint',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:02
+
+from django.db import migrations
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Rolls up the last MINUTE_RETENTION of existing footprints, so the
+    dashboard doesn't start from zero after upgrading. Older history can be
+    rebuilt with `manage.py insider_rollups --rebuild`.
+    """
+
+    from django.utils import timezone
+    from insider.services.rollups import MINUTE_RETENTION, aggregate_rows
+
+    Footprint = apps.get_model('insider', 'Footprint')
+    FootprintRollup = apps.get_model('insider', 'FootprintRollup')
+    db_alias = schema_editor.connection.alias
+
+    if FootprintRollup.objects.using(db_alias).exists():
+        return
+
+    rows = (
+        Footprint.objects.using(db_alias)
+        .filter(created_at__gte=timezone.now() - MINUTE_RETENTION)
+        .values_list('created_at', 'request_path', 'request_method', 'status_code', 'response_time', 'db_query_count')
+    )
+    aggregates = aggregate_rows(rows.iterator(chunk_size=5000))
+
+    FootprintRollup.objects.using(db_alias).bulk_create(
+        [
+            FootprintRollup(
+                resolution='minute', bucket=bucket, route=route, method=method, status_class=status_class,
+                count=count, error_count=errors, latency_sum=lat_sum, latency_min=lat_min, latency_max=lat_max,
+                db_query_sum=queries, latency_sketch=sketch.to_bytes(),
+            )
+            for (bucket, route, method, status_class), (count, errors, lat_sum, lat_min, lat_max, queries, sketch)
+            in sorted(aggregates.items())
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insider', '0016_footprint_capture_time'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
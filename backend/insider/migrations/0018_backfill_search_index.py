@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:12
+
+from django.db import migrations
+
+
+def backfill_search_index(apps, schema_editor):
+    """
+    Indexes the footprints stored before the search index existed, in
+    primary-key batches, so global search finds them right after upgrading.
+    Skipped when there is no index (see insider.services.search) or it
+    already has documents; `manage.py insider_search --rebuild` redoes it.
+    """
+
+    from django.db.models import F, JSONField
+    from django.db.models.functions import Coalesce
+    from insider.services import search
+
+    Footprint = apps.get_model('insider', 'Footprint')
+    db_alias = schema_editor.connection.alias
+
+    search.forget_backend(sender=None, using=db_alias)
+    if not search.enabled(db_alias):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT 1 FROM {search.TABLE} LIMIT 1")
+        if cursor.fetchone():
+            return
+
+    payload = {
+        name: Coalesce(F(f'payload__{name}'), F(f'payload__{name}_blob__content'), output_field=JSONField())
+        for name in search.PAYLOAD_FIELDS
+    }
+    footprints = Footprint.objects.using(db_alias).order_by('pk').values('pk', 'exception_name', **payload)
+
+    last = 0
+    while True:
+        batch = list(footprints.filter(pk__gt=last)[:1000])
+        if not batch:
+            return
+        search.index_footprints(
+            [(row['pk'], row['exception_name'], {name: row[name] for name in search.PAYLOAD_FIELDS}) for row in batch],
+            db_alias,
+        )
+        last = batch[-1]['pk']
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insider', '0017_backfill_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.utils import timezone
 from django.forms import JSONField
 
 
@@ -38,10 +39,51 @@ class Incidence(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Distinct request_user values seen, kept up to date during ingestion from
+    # the HyperLogLog registers below (see insider.hll).
+    users_affected = models.PositiveIntegerField(default=0)
+    user_registers = models.BinaryField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Incidence tabs: one status, sorted by any of the list's sort keys.
+            models.Index(fields=['status', '-last_seen', '-id'], name='insider_inc_status_seen_idx'),
+            models.Index(fields=['status', '-occurrence_count', '-id'], name='insider_inc_status_count_idx'),
+            models.Index(fields=['status', '-users_affected', '-id'], name='insider_inc_status_users_idx'),
+            # Unfiltered listing, last_seen windows and the live tail.
+            models.Index(fields=['-last_seen', '-id'], name='insider_inc_seen_idx'),
+            # "New" incidences.
+            models.Index(fields=['created_at'], name='insider_inc_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} ({self.occurrence_count})"
 
+
+class IncidenceStatusCount(models.Model):
+    """
+    Number of incidences per status, maintained as incidences are created,
+    deleted or change status (see insider.services.status_counts).
+    """
+
+    status = models.CharField(max_length=20, primary_key=True)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Incidence Status Count"
+        verbose_name_plural = "Incidence Status Counts"
+
+    def __str__(self):
+        return f"{self.status}: {self.count}"
+
     
+def _payload_property(name):
+    return property(
+        lambda self: self._get_payload_value(name),
+        lambda self, value: self._set_payload_value(name, value),
+    )
+
+
 class Footprint(models.Model):
     """
     Stores a detailed record of each HTTP request/response cycle captured by
@@ -55,8 +97,21 @@ class Footprint(models.Model):
 
     A `Footprint` instance essentially represents a complete snapshot of how
     Django handled a specific request.
+
+    The row itself only holds the small, frequently scanned columns. The
+    bulky JSON (bodies, logs, stack trace) lives in `FootprintPayload` and is
+    exposed through same-named attributes, so `Footprint(request_body=...)`,
+    `footprint.stack_trace` and `save()` work as if they were columns. Use
+    `select_related('payload')` when reading them for many rows.
     """
 
+    PAYLOAD_FIELDS = ("request_body", "response_body", "system_logs", "stack_trace")
+
+    request_body = _payload_property("request_body")
+    response_body = _payload_property("response_body")
+    system_logs = _payload_property("system_logs")
+    stack_trace = _payload_property("stack_trace")
+
     METHOD_CHOICES = (
         ("get", "Get"),
         ("post", "Post"),
@@ -69,7 +124,8 @@ class Footprint(models.Model):
         Incidence, 
         on_delete=models.CASCADE, 
         null=True, 
-        blank=True
+        blank=True,
+        db_index=False,  # covered by insider_fp_incidence_idx (incidence, created_at)
     )
 
     request_id = models.CharField(
@@ -87,11 +143,6 @@ class Footprint(models.Model):
         help_text="Authenticated user ID or 'anonymous'."
     )
     request_path = models.CharField(max_length=255)
-    request_body = models.JSONField(
-        null=True, 
-        blank=True,
-        help_text="Parsed request body (e.g., POST/JSON data)."
-    )
     request_method = models.CharField(
         max_length=20, 
         choices=METHOD_CHOICES, 
@@ -99,18 +150,11 @@ class Footprint(models.Model):
         null=True
     )
     
-    response_body = models.JSONField(null=True, blank=True)
     response_time = models.FloatField(
         default=0.0, 
         help_text="Total request to response duration in milliseconds (ms)"
     )
     status_code = models.IntegerField(default=200)
-    system_logs = models.JSONField(
-        null=True, 
-        blank=True,
-        help_text="Captured system logs (list of strings)."
-
-    )
     ip_address = models.GenericIPAddressField(blank=True, null=True)
     user_agent = models.CharField(max_length=512, null=True, blank=True)
     
@@ -118,23 +162,237 @@ class Footprint(models.Model):
         default=0, 
         help_text="Total database connection queries."
     )
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set at capture time by the middleware; the default covers footprints created directly.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     exception_name = models.CharField(
         max_length=255,
         null=True,
         blank=True
     )
-    stack_trace = models.JSONField(null=True, blank=True)
 
     class Meta:
         verbose_name = "Footprint"
         verbose_name_plural = "Footprints"
+        indexes = [
+            # Dashboard window (count, status split and avg latency from the index alone)
+            # and retention cleanup (created_at < cutoff).
+            models.Index(fields=['created_at', 'status_code', 'response_time'], name='insider_fp_created_stat_idx'),
+            # Error-only scans: error counts, status_code__in filters on errors.
+            models.Index(
+                fields=['created_at', 'status_code'],
+                name='insider_fp_errors_idx',
+                condition=models.Q(status_code__gte=400),
+            ),
+            # Incidence 'Recent Occurrences' (incidence_id = X ORDER BY created_at DESC).
+            models.Index(fields=['incidence', 'created_at'], name='insider_fp_incidence_idx'),
+            # Breadcrumbs (request_user = X AND created_at in a window).
+            models.Index(fields=['request_user', 'created_at'], name='insider_fp_user_idx'),
+            # Forensics filters on a status code or a latency floor.
+            models.Index(fields=['status_code', 'created_at'], name='insider_fp_status_idx'),
+            models.Index(fields=['response_time'], name='insider_fp_latency_idx'),
+        ]
 
 
     def __str__(self):
         return f"[{self.request_id}] {self.request_method.upper()} {self.request_path} -> {self.status_code}"    
 
+    def _get_payload_value(self, name):
+        pending = self.__dict__.get("_pending_payload")
+        if pending is not None and name in pending:
+            return pending[name]
+        if self.pk is None:
+            return None
+
+        try:
+            return self.payload.value(name)
+        except FootprintPayload.DoesNotExist:
+            return None
+
+    def _set_payload_value(self, name, value):
+        self.__dict__.setdefault("_pending_payload", {})[name] = value
+
+    def pop_pending_payload(self):
+        """
+        Payload values assigned since the last save, as FootprintPayload kwargs.
+        """
+
+        return self.__dict__.pop("_pending_payload", None)
+
+    def save(self, *args, **kwargs):
+        pending = self.__dict__.get("_pending_payload")
+        if not pending:
+            return super().save(*args, **kwargs)
+
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        adding = self._state.adding
+
+        from insider.services import blobs, search
+
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+            pending = self.pop_pending_payload()
+
+            if adding:
+                if any(value is not None for value in pending.values()):
+                    blobs.store_payloads([(self.pk, pending)], using)
+            else:
+                blobs.update_payload(self.pk, pending, using)
+
+            # Drop a payload cached before the save so the new values are read back.
+            if "payload" in self._state.fields_cache:
+                del self._state.fields_cache["payload"]
+
+            if not adding:
+                pending = {name: self._get_payload_value(name) for name in FootprintPayload.VALUE_FIELDS}
+            search.index_footprints([(self.pk, self.exception_name, pending)], using)
+
+
+class PayloadBlob(models.Model):
+    """
+    A large payload value stored once, keyed by the SHA-256 of its canonical
+    JSON and shared by every payload field with the same content (see
+    insider.services.blobs).
+    """
+
+    hash = models.CharField(max_length=64, primary_key=True)
+    content = models.JSONField()
+    size = models.PositiveIntegerField(help_text="Bytes of canonical JSON.")
+    refcount = models.IntegerField(default=0, help_text="Payload fields referencing this blob.")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Payload Blob"
+        verbose_name_plural = "Payload Blobs"
+        indexes = [
+            # Garbage collection only looks for unreferenced blobs.
+            models.Index(fields=['hash'], condition=models.Q(refcount__lte=0), name='insider_blob_unref_idx'),
+        ]
+
+    def __str__(self):
+        return f"Blob {self.hash[:12]} ({self.refcount} refs)"
+
+
+def _blob_field():
+    return models.ForeignKey(
+        PayloadBlob,
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True,
+        related_name="+",
+        db_constraint=False,
+        db_index=False,
+    )
+
+
+class FootprintPayload(models.Model):
+    """
+    The heavy, rarely read half of a footprint, one row per footprint that
+    has any of them. Only loaded for detail views, integrations and search.
+
+    Each value is either stored inline or, when large, as a reference to a
+    shared PayloadBlob (`<field>_blob`); `value(name)` returns it either way.
+
+    No database-level foreign key: a partitioned footprint table (see
+    insider.services.partitions) can't be referenced by `id` alone. Deletes
+    go through the ORM cascade or the retention cleanup, which removes
+    payloads together with their footprints.
+    """
+
+    VALUE_FIELDS = ("request_body", "response_body", "system_logs", "stack_trace")
+    BLOB_RELATIONS = tuple(f"{name}_blob" for name in VALUE_FIELDS)
+
+    footprint = models.OneToOneField(
+        Footprint,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="payload",
+        db_constraint=False,
+    )
+    request_body = models.JSONField(
+        null=True, 
+        blank=True,
+        help_text="Parsed request body (e.g., POST/JSON data)."
+    )
+    response_body = models.JSONField(null=True, blank=True)
+    system_logs = models.JSONField(
+        null=True, 
+        blank=True,
+        help_text="Captured system logs (list of strings)."
+    )
+    stack_trace = models.JSONField(null=True, blank=True)
+
+    request_body_blob = _blob_field()
+    response_body_blob = _blob_field()
+    system_logs_blob = _blob_field()
+    stack_trace_blob = _blob_field()
+
+    class Meta:
+        verbose_name = "Footprint Payload"
+        verbose_name_plural = "Footprint Payloads"
+
+    def __str__(self):
+        return f"Payload of footprint {self.footprint_id}"
+
+    def value(self, name):
+        if getattr(self, f"{name}_blob_id") is None:
+            return getattr(self, name)
+
+        try:
+            return getattr(self, f"{name}_blob").content
+        except PayloadBlob.DoesNotExist:
+            return None
+
+
+class FootprintRollup(models.Model):
+    """
+    Pre-aggregated traffic per time bucket, route, method and status class
+    (2 for 2xx, 5 for 5xx...). Minute rows are upserted additively at
+    ingestion and compacted into hour and then day rows by a periodic task,
+    so every footprint is counted in exactly one row.
+    """
+
+    RESOLUTION_CHOICES = (
+        ("minute", "Minute"),
+        ("hour", "Hour"),
+        ("day", "Day"),
+    )
+
+    resolution = models.CharField(max_length=6, choices=RESOLUTION_CHOICES, default="minute")
+    bucket = models.DateTimeField(help_text="Start of the bucket (UTC).")
+    route = models.CharField(max_length=255, help_text="Request path with numeric IDs replaced by {id}.")
+    method = models.CharField(max_length=20, blank=True, default="")
+    status_class = models.PositiveSmallIntegerField()
+
+    count = models.BigIntegerField(default=0)
+    error_count = models.BigIntegerField(default=0)
+    latency_sum = models.FloatField(default=0.0)
+    latency_min = models.FloatField(default=0.0)
+    latency_max = models.FloatField(default=0.0)
+    db_query_sum = models.BigIntegerField(default=0)
+    latency_sketch = models.BinaryField(
+        null=True,
+        blank=True,
+        help_text="Serialized insider.sketch.LatencySketch of the bucket's response times."
+    )
+
+    class Meta:
+        verbose_name = "Footprint Rollup"
+        verbose_name_plural = "Footprint Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['resolution', 'bucket', 'route', 'method', 'status_class'],
+                name='insider_rollup_key',
+            ),
+        ]
+        indexes = [
+            # Dashboard/trend windows read every resolution by bucket.
+            models.Index(fields=['bucket'], name='insider_rollup_bucket_idx'),
+        ]
+
+    def __str__(self):
+        return f"[{self.resolution} {self.bucket}] {self.method.upper()} {self.route} {self.status_class}xx -> {self.count}"
+
 
 
 
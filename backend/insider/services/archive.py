@@ -0,0 +1,465 @@
+"""
+insider.services.archive
+------------------------
+
+Compressed, day-partitioned archive of footprints about to expire.
+
+With ARCHIVE_DIR set, the cleanup task streams every footprint past its
+retention cutoff (see insider.services.retention) into files before
+deleting it:
+
+    ARCHIVE_DIR/
+        manifest.json
+        date=2026-01-31/footprints-<tier>-<run>.parquet       (pyarrow installed)
+        date=2026-01-31/footprints-<tier>-<run>.ndjson.gz     (fallback)
+
+Parquet files hold one row group per chunk and are zstd compressed. The
+manifest lists every file with its row count, time range, status range and
+routes, plus a per-tier watermark (created_at, pk) of the last archived
+row, so a cleanup that fails after archiving never archives a row twice.
+
+`query_archive` reads the archive back. Time, status and route predicates
+skip whole files using the manifest, and are pushed down to parquet row
+groups and rows.
+
+Footprints deleted together with their incidence (incidence retention)
+are archived by `archive_footprints` in the same batch, under the
+"incidences" tier.
+"""
+
+import os
+import json
+import gzip
+import time
+import uuid
+import logging
+from contextlib import contextmanager
+from datetime import date, datetime, timezone as dt_timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from django.db.models import F, JSONField, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from insider.settings import settings as insider_settings
+from insider.services import retention
+from insider.sinks.ndjson import FootprintJSONEncoder
+from insider.utils import normalize_route
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+LOCK_FILE = ".lock"
+MANIFEST_VERSION = 1
+FORMATS = ("parquet", "ndjson")
+MAX_MANIFEST_ROUTES = 200  # beyond that a file's routes aren't listed and it is always scanned
+
+COLUMNS = (
+    "id", "request_id", "created_at", "incidence_id", "request_user", "request_path", "route",
+    "request_method", "status_code", "response_time", "db_query_count", "ip_address",
+    "user_agent", "exception_name",
+)
+PAYLOAD_COLUMNS = ("request_body", "response_body", "system_logs", "stack_trace")
+
+
+def default_format() -> str:
+    return "parquet" if pq is not None else "ndjson"
+
+
+def _schema():
+    string_columns = (
+        "request_id", "request_user", "request_path", "route", "request_method",
+        "ip_address", "user_agent", "exception_name",
+    ) + PAYLOAD_COLUMNS
+    types = {
+        "id": pa.int64(),
+        "created_at": pa.timestamp("us", tz="UTC"),
+        "incidence_id": pa.int64(),
+        "status_code": pa.int32(),
+        "response_time": pa.float64(),
+        "db_query_count": pa.int32(),
+    }
+    types.update((name, pa.string()) for name in string_columns)
+    return pa.schema([(name, types[name]) for name in COLUMNS + PAYLOAD_COLUMNS])
+
+
+# Manifest
+
+def _manifest_path(directory: str) -> str:
+    return os.path.join(directory, MANIFEST)
+
+
+def load_manifest(directory: Optional[str] = None) -> Dict[str, Any]:
+    directory = directory or insider_settings.ARCHIVE_DIR
+    try:
+        with open(_manifest_path(directory), "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return {"version": MANIFEST_VERSION, "watermarks": {}, "files": []}
+
+
+def _save_manifest(directory: str, manifest: Dict[str, Any]) -> None:
+    path = _manifest_path(directory)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=1)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def _locked(directory: str):
+    """
+    Keeps two archivers (e.g. the task and the command) off the same directory.
+    """
+
+    with open(os.path.join(directory, LOCK_FILE), "a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+# Writing
+
+class _FileStats:
+    def __init__(self):
+        self.rows = 0
+        self.min_at = self.max_at = None
+        self.min_status = self.max_status = None
+        self.routes = set()
+
+    def add(self, row: Dict[str, Any]) -> None:
+        self.rows += 1
+        self.min_at = row["created_at"] if self.min_at is None else min(self.min_at, row["created_at"])
+        self.max_at = row["created_at"] if self.max_at is None else max(self.max_at, row["created_at"])
+        status = row["status_code"]
+        self.min_status = status if self.min_status is None else min(self.min_status, status)
+        self.max_status = status if self.max_status is None else max(self.max_status, status)
+        if self.routes is not None:
+            self.routes.add(row["route"])
+            if len(self.routes) > MAX_MANIFEST_ROUTES:
+                self.routes = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "min_created_at": self.min_at.isoformat(),
+            "max_created_at": self.max_at.isoformat(),
+            "min_status": self.min_status,
+            "max_status": self.max_status,
+            "routes": sorted(self.routes) if self.routes is not None else None,
+        }
+
+
+class _ParquetWriter:
+    extension = ".parquet"
+
+    def __init__(self, path: str):
+        self._writer = pq.ParquetWriter(path, _schema(), compression="zstd")
+        self._rows: List[Dict[str, Any]] = []
+
+    def write(self, row: Dict[str, Any]) -> None:
+        row = dict(row)
+        for column in PAYLOAD_COLUMNS:
+            if row[column] is not None:
+                row[column] = json.dumps(row[column], cls=FootprintJSONEncoder)
+        self._rows.append(row)
+
+    def flush(self) -> None:
+        if self._rows:
+            self._writer.write_table(pa.Table.from_pylist(self._rows, schema=self._writer.schema))
+            self._rows = []
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+
+
+class _NDJSONWriter:
+    extension = ".ndjson.gz"
+
+    def __init__(self, path: str):
+        self._handle = gzip.open(path, "wt", encoding="utf-8")
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._handle.write(json.dumps(row, cls=FootprintJSONEncoder, separators=(",", ":")))
+        self._handle.write("\n")
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+_WRITERS = {"parquet": _ParquetWriter, "ndjson": _NDJSONWriter}
+
+
+class _DayFile:
+    """
+    One archive file being written; renamed into place when closed.
+    """
+
+    def __init__(self, directory: str, day: date, tier: str, run: str, fmt: str):
+        writer_class = _WRITERS[fmt]
+        self.relative_path = os.path.join(f"date={day.isoformat()}", f"footprints-{tier}-{run}{writer_class.extension}")
+        self.path = os.path.join(directory, self.relative_path)
+        self.tmp_path = f"{self.path}.tmp"
+        self.format = fmt
+        self.day = day
+        self.stats = _FileStats()
+        self.last_key = None
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.writer = writer_class(self.tmp_path)
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self.writer.write(row)
+        self.stats.add(row)
+        self.last_key = (row["created_at"], row["id"])
+
+    def close(self) -> Dict[str, Any]:
+        self.writer.close()
+        os.replace(self.tmp_path, self.path)
+        return dict(path=self.relative_path, format=self.format, date=self.day.isoformat(), **self.stats.as_dict())
+
+
+def _expiring_rows(footprints, cutoff: datetime, db_alias: str, watermark: Optional[Dict[str, Any]], chunk_size: int):
+    rows = footprints.using(db_alias).filter(created_at__lt=cutoff)
+    if watermark:
+        last_at = datetime.fromisoformat(watermark["created_at"])
+        rows = rows.filter(Q(created_at__gt=last_at) | Q(created_at=last_at, pk__gt=watermark["pk"]))
+    return _rows(rows, chunk_size)
+
+
+def _rows(footprints, chunk_size: int):
+    columns = [c for c in COLUMNS if c != "route"]
+    payload = {
+        column: Coalesce(F(f"payload__{column}"), F(f"payload__{column}_blob__content"), output_field=JSONField())
+        for column in PAYLOAD_COLUMNS
+    }
+    for row in footprints.order_by("created_at", "pk").values(*columns, **payload).iterator(chunk_size=chunk_size):
+        row["created_at"] = row["created_at"].astimezone(dt_timezone.utc)
+        row["route"] = normalize_route(row["request_path"])
+        yield row
+
+
+def _write_rows(directory: str, manifest: Dict[str, Any], rows, tier: str, run: str, fmt: str,
+               chunk_size: int, watermark: bool = True) -> int:
+    """
+    Writes `rows` (oldest first) into one file per day. Each file joins the
+    manifest as soon as it is complete, moving the tier's watermark unless
+    `watermark` is False. Returns the number of rows written.
+    """
+
+    current = None
+    written = 0
+
+    def finish(current: _DayFile) -> None:
+        manifest["files"].append(current.close())
+        if watermark:
+            last_at, last_pk = current.last_key
+            manifest["watermarks"][tier] = {"created_at": last_at.isoformat(), "pk": last_pk}
+        _save_manifest(directory, manifest)
+
+    try:
+        for row in rows:
+            day = row["created_at"].date()
+            if current is not None and current.day != day:
+                finish(current)
+                current = None
+            if current is None:
+                current = _DayFile(directory, day, tier, run, fmt)
+
+            current.write(row)
+            written += 1
+            if current.stats.rows % chunk_size == 0:
+                current.writer.flush()
+
+        if current is not None:
+            finish(current)
+    except BaseException:
+        if current is not None:
+            current.writer.close()
+            os.remove(current.tmp_path)
+        raise
+
+    return written
+
+
+def archive_expired(db_alias: Optional[str] = None, now: Optional[datetime] = None, directory: Optional[str] = None,
+                    fmt: Optional[str] = None, chunk_size: int = 5000) -> int:
+    """
+    Streams every footprint past its retention cutoff into the archive.
+    Returns the number of rows archived.
+    """
+
+    db_alias = db_alias or insider_settings.DB_ALIAS
+    directory = directory or insider_settings.ARCHIVE_DIR
+    fmt = fmt or default_format()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported archive format: {fmt!r}")
+    if fmt == "parquet" and pq is None:
+        raise RuntimeError("Parquet archives require pyarrow (pip install pyarrow).")
+
+    os.makedirs(directory, exist_ok=True)
+    run = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    archived = 0
+
+    with _locked(directory):
+        manifest = load_manifest(directory)
+        for tier, footprints, cutoff in retention.footprint_tiers(now or timezone.now()):
+            rows = _expiring_rows(footprints, cutoff, db_alias, manifest["watermarks"].get(tier), chunk_size)
+            archived += _write_rows(directory, manifest, rows, tier, run, fmt, chunk_size)
+
+    if archived:
+        logger.info(f"INSIDER: Archived {archived} expiring footprints to {directory}.")
+    return archived
+
+
+def archive_footprints(footprints, db_alias: Optional[str] = None, directory: Optional[str] = None,
+                       fmt: Optional[str] = None, chunk_size: int = 5000) -> int:
+    """
+    Archives the footprints of a queryset as they are, outside the tiers'
+    watermarks, e.g. the ones incidence retention deletes with their
+    incidence. Returns the number of rows archived.
+    """
+
+    db_alias = db_alias or insider_settings.DB_ALIAS
+    directory = directory or insider_settings.ARCHIVE_DIR
+    fmt = fmt or default_format()
+    if fmt == "parquet" and pq is None:
+        raise RuntimeError("Parquet archives require pyarrow (pip install pyarrow).")
+
+    os.makedirs(directory, exist_ok=True)
+    # Called once per retention batch, so several runs can share a second.
+    run = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{uuid.uuid4().hex[:8]}"
+
+    with _locked(directory):
+        manifest = load_manifest(directory)
+        return _write_rows(
+            directory, manifest, _rows(footprints.using(db_alias), chunk_size), "incidences", run, fmt,
+            chunk_size, watermark=False,
+        )
+
+
+# Reading
+
+def _aware(moment: Optional[datetime]) -> Optional[datetime]:
+    if moment is not None and timezone.is_naive(moment):
+        return timezone.make_aware(moment, dt_timezone.utc)
+    return moment
+
+
+def _file_matches(entry: Dict[str, Any], since, until, route, status_min, status_max) -> bool:
+    if since is not None and datetime.fromisoformat(entry["max_created_at"]) < since:
+        return False
+    if until is not None and datetime.fromisoformat(entry["min_created_at"]) >= until:
+        return False
+    if status_min is not None and entry["max_status"] < status_min:
+        return False
+    if status_max is not None and entry["min_status"] > status_max:
+        return False
+    if route is not None and entry["routes"] is not None and normalize_route(route) not in entry["routes"]:
+        return False
+    return True
+
+
+def _row_matches(row: Dict[str, Any], since, until, route, status_min, status_max) -> bool:
+    if since is not None and row["created_at"] < since:
+        return False
+    if until is not None and row["created_at"] >= until:
+        return False
+    if status_min is not None and row["status_code"] < status_min:
+        return False
+    if status_max is not None and row["status_code"] > status_max:
+        return False
+    if route is not None and route not in (row["route"], row["request_path"]):
+        return False
+    return True
+
+
+def _read_parquet(path: str, since, until, route, status_min, status_max) -> Iterator[Dict[str, Any]]:
+    filters = []
+    if since is not None:
+        filters.append(("created_at", ">=", since))
+    if until is not None:
+        filters.append(("created_at", "<", until))
+    if status_min is not None:
+        filters.append(("status_code", ">=", status_min))
+    if status_max is not None:
+        filters.append(("status_code", "<=", status_max))
+    if route is not None:
+        # A route matches the normalized route or the raw path (see _row_matches): OR of two conjunctions.
+        filters = [filters + [("route", "==", route)], filters + [("request_path", "==", route)]]
+
+    table = pq.read_table(path, filters=filters or None)
+    for batch in table.to_batches():
+        for row in batch.to_pylist():
+            for column in PAYLOAD_COLUMNS:
+                if row[column] is not None:
+                    row[column] = json.loads(row[column])
+            yield row
+
+
+def _read_ndjson(path: str) -> Iterator[Dict[str, Any]]:
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            row = json.loads(line)
+            row["created_at"] = datetime.fromisoformat(row["created_at"].replace("Z", "+00:00"))
+            yield row
+
+
+def query_archive(since: Optional[datetime] = None, until: Optional[datetime] = None, route: Optional[str] = None,
+                  status_min: Optional[int] = None, status_max: Optional[int] = None,
+                  directory: Optional[str] = None, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yields archived footprints created in [since, until), optionally for one
+    route (a path or its normalized route) and a status range, oldest first
+    within each file.
+    """
+
+    directory = directory or insider_settings.ARCHIVE_DIR
+    if not directory:
+        return
+
+    since = _aware(since)
+    until = _aware(until)
+    predicates = (since, until, route, status_min, status_max)
+    returned = 0
+
+    for entry in load_manifest(directory)["files"]:
+        if not _file_matches(entry, *predicates):
+            continue
+
+        path = os.path.join(directory, entry["path"])
+        if entry["format"] == "parquet":
+            if pq is None:
+                raise RuntimeError(f"{entry['path']} is a parquet archive; reading it requires pyarrow.")
+            rows = _read_parquet(path, *predicates)
+        else:
+            rows = _read_ndjson(path)
+
+        for row in rows:
+            if not _row_matches(row, *predicates):
+                continue
+            yield row
+            returned += 1
+            if limit is not None and returned >= limit:
+                return
@@ -0,0 +1,183 @@
+"""
+insider.services.blobs
+----------------------
+
+Content-addressed storage for large footprint payload values.
+
+A request/response body, log list or stack trace whose canonical JSON is
+at least PAYLOAD_DEDUP_MIN_BYTES long is stored once in `PayloadBlob`,
+keyed by the SHA-256 of that JSON. The payload row only keeps the hash (in
+`<field>_blob`). Smaller values stay inline, and so does everything when
+the setting is None. Repeated error traffic (the same error JSON, the same
+stack trace) then costs one blob plus a 64 character key per footprint.
+
+Every blob counts the payload fields pointing at it. Writers take their
+references before the payload rows are inserted, and every delete path
+gives them back: the retention batches, the partition orphan sweep and the
+ORM cascade (through a post_delete receiver). `collect_garbage` deletes
+blobs whose count dropped to zero, re-checking the count in the DELETE
+itself, so a writer that takes a new reference at the same time keeps the
+blob alive.
+"""
+
+import json
+import hashlib
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from insider.models import FootprintPayload, PayloadBlob
+from insider.settings import settings as insider_settings
+from insider.sinks.ndjson import FootprintJSONEncoder
+
+BLOB_FIELDS = tuple(f"{name}_blob_id" for name in FootprintPayload.VALUE_FIELDS)
+
+
+def canonical(value: Any) -> bytes:
+    return json.dumps(
+        value, cls=FootprintJSONEncoder, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+def split_payload(values: Dict[str, Any], blobs: Dict[str, Tuple[Any, int]]) -> Dict[str, Any]:
+    """
+    FootprintPayload field values for `values`: large ones become blob
+    hashes, collected into `blobs` (hash -> (content, size)).
+    """
+
+    min_bytes = insider_settings.PAYLOAD_DEDUP_MIN_BYTES
+    fields = {}
+    for name, value in values.items():
+        fields[name], fields[f"{name}_blob_id"] = value, None
+        if value is None or min_bytes is None:
+            continue
+
+        data = canonical(value)
+        if len(data) >= min_bytes:
+            digest = hashlib.sha256(data).hexdigest()
+            blobs[digest] = (value, len(data))
+            fields[name], fields[f"{name}_blob_id"] = None, digest
+    return fields
+
+
+def references(fields: Iterable[Dict[str, Any]]) -> Counter:
+    return Counter(row[f] for row in fields for f in BLOB_FIELDS if row.get(f))
+
+
+def acquire(refs: Counter, blobs: Dict[str, Tuple[Any, int]], db_alias: str) -> None:
+    """
+    Adds `refs` (hash -> count) to the blobs' reference counts, creating the
+    blobs seen for the first time.
+    """
+
+    manager = PayloadBlob.objects.using(db_alias)
+    for digest, count in refs.items():
+        if manager.filter(pk=digest).update(refcount=F("refcount") + count):
+            continue
+
+        content, size = blobs[digest]
+        try:
+            with transaction.atomic(using=db_alias):
+                manager.create(hash=digest, content=content, size=size, refcount=count)
+        except IntegrityError:
+            # Created by a concurrent writer in the meantime.
+            manager.filter(pk=digest).update(refcount=F("refcount") + count)
+
+
+def release(refs: Counter, db_alias: str) -> None:
+    """
+    Gives back references; blobs left at zero wait for `collect_garbage`.
+    """
+
+    by_count: Dict[int, List[str]] = {}
+    for digest, count in refs.items():
+        by_count.setdefault(count, []).append(digest)
+
+    for count, digests in by_count.items():
+        PayloadBlob.objects.using(db_alias).filter(pk__in=digests).update(refcount=F("refcount") - count)
+
+
+def release_payloads(payloads, db_alias: str) -> None:
+    """
+    Releases the blob references of a FootprintPayload queryset about to be deleted.
+    """
+
+    refs = Counter()
+    for row in payloads.using(db_alias).values_list(*BLOB_FIELDS).iterator():
+        refs.update(digest for digest in row if digest)
+    if refs:
+        release(refs, db_alias)
+
+
+def store_payloads(payloads: List[Tuple[int, Dict[str, Any]]], db_alias: str, batch_size: Optional[int] = None) -> None:
+    """
+    Inserts FootprintPayload rows for (footprint id, values) pairs, skipping
+    footprints that already have one.
+    """
+
+    existing = set(
+        FootprintPayload.objects.using(db_alias).filter(pk__in=[pk for pk, _ in payloads]).values_list("pk", flat=True)
+    )
+    blobs: Dict[str, Tuple[Any, int]] = {}
+    rows = [(pk, split_payload(values, blobs)) for pk, values in payloads if pk not in existing]
+    if not rows:
+        return
+
+    with transaction.atomic(using=db_alias):
+        acquire(references(fields for _, fields in rows), blobs, db_alias)
+        FootprintPayload.objects.using(db_alias).bulk_create(
+            [FootprintPayload(footprint_id=pk, **fields) for pk, fields in rows], batch_size=batch_size
+        )
+
+
+def update_payload(footprint_id: int, values: Dict[str, Any], db_alias: str) -> None:
+    """
+    Creates or updates the given payload fields of one footprint, moving
+    blob references from the old values to the new ones.
+    """
+
+    blobs: Dict[str, Tuple[Any, int]] = {}
+    fields = split_payload(values, blobs)
+
+    with transaction.atomic(using=db_alias):
+        payloads = FootprintPayload.objects.using(db_alias).filter(pk=footprint_id)
+        old = payloads.select_for_update().values(*BLOB_FIELDS).first()
+
+        acquire(references([fields]), blobs, db_alias)
+        if old is None:
+            FootprintPayload.objects.using(db_alias).create(footprint_id=footprint_id, **fields)
+            return
+
+        payloads.update(**fields)
+        release(references([{f: old[f] for f in fields if f in old}]), db_alias)
+
+
+def collect_garbage(db_alias: str, batch_size: Optional[int] = None) -> int:
+    """
+    Deletes blobs no payload references anymore. Returns how many.
+    """
+
+    batch_size = batch_size or insider_settings.CLEANUP_BATCH_SIZE
+    unreferenced = PayloadBlob.objects.using(db_alias).filter(refcount__lte=0)
+    deleted = 0
+    while True:
+        digests = list(unreferenced.values_list("pk", flat=True)[:batch_size])
+        if not digests:
+            return deleted
+        # The refcount condition is evaluated again by the DELETE itself.
+        deleted += unreferenced.filter(pk__in=digests).delete()[0]
+        if len(digests) < batch_size:
+            return deleted
+
+
+def release_deleted_payload(sender, instance, using, **kwargs):
+    """
+    post_delete receiver: ORM deletes (e.g. a footprint cascade) give their
+    references back too.
+    """
+
+    refs = references([{f: getattr(instance, f) for f in BLOB_FIELDS}])
+    if refs:
+        release(refs, using)
@@ -0,0 +1,203 @@
+"""
+insider.services.collector
+--------------------------
+
+Per-host footprint collector for multi-worker deployments.
+
+Web workers send each footprint as one datagram to a Unix socket
+(COLLECTOR_SOCKET) instead of opening their own DB connection or Celery
+message. A single `manage.py insider_collector` process drains the socket,
+writes footprints in batches and runs incidence aggregation, so a host needs
+one insider DB connection instead of one per worker.
+
+Sends never block the request: the footprint is queued for a sender thread
+in the worker, which encodes it off the request path. If the collector is
+down, its buffer is full or a footprint is too large for a datagram, the
+sender thread falls back to the regular dispatch path.
+"""
+
+import os
+import time
+import queue
+import socket
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from insider import codec
+from insider.settings import settings as insider_settings
+
+logger = logging.getLogger(__name__)
+
+RECEIVE_BUFFER_BYTES = 8 * 1024 * 1024
+MAX_DATAGRAM_BYTES = 208 * 1024
+SEND_QUEUE_SIZE = 10000  # footprints waiting for a worker's sender thread
+
+
+class CollectorClient:
+    """
+    Fire-and-forget sender used by web workers. One socket and one sender
+    thread per process: the request thread only queues the footprint, the
+    sender thread encodes and sends it. Footprints the collector can't take
+    (down, behind, too large for a datagram) are handed to `fallback`, by
+    default the regular dispatch path.
+    """
+
+    def __init__(self, path: str, fallback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 queue_size: int = SEND_QUEUE_SIZE):
+        self.path = path
+        self.fallback = fallback or _dispatch_locally
+        self.queue_size = queue_size
+        self._sock = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._pending: Optional[queue.Queue] = None
+        self._sender_pid = None
+
+    def _socket(self):
+        if self._sock is None or self._pid != os.getpid():
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.setblocking(False)
+            self._sock, self._pid = sock, os.getpid()
+        return self._sock
+
+    def send(self, footprint_data: Dict[str, Any]) -> bool:
+        """
+        Queues a footprint for the sender thread. Returns False when the
+        queue is full, in which case the caller dispatches it itself.
+        """
+
+        try:
+            self._queue().put_nowait(footprint_data)
+            return True
+        except queue.Full:
+            return False
+
+    def send_now(self, footprint_data: Dict[str, Any]) -> bool:
+        message = codec.encode(footprint_data)
+        if len(message) > MAX_DATAGRAM_BYTES:
+            return False
+
+        try:
+            self._socket().sendto(message, self.path)
+            return True
+        except OSError:
+            # ENOENT/ECONNREFUSED: collector not running, EAGAIN: collector is behind.
+            return False
+
+    def _queue(self) -> queue.Queue:
+        with self._lock:
+            # A forked worker doesn't inherit the parent's sender thread.
+            if self._pending is None or self._sender_pid != os.getpid():
+                self._pending, self._sender_pid = queue.Queue(self.queue_size), os.getpid()
+                threading.Thread(
+                    target=self._run, args=(self._pending,), name="insider-collector-client", daemon=True
+                ).start()
+            return self._pending
+
+    def _run(self, pending: queue.Queue) -> None:
+        while True:
+            footprint_data = pending.get()
+            try:
+                if not self.send_now(footprint_data):
+                    self.fallback(footprint_data)
+            except Exception as e:
+                logger.error(f"INSIDER: Could not send footprint {footprint_data.get('request_id')}: {e}")
+
+
+def _dispatch_locally(footprint_data: Dict[str, Any]) -> None:
+    # Imported here: insider.dispatch imports this module.
+    from insider.dispatch import dispatch_locally
+    dispatch_locally(footprint_data)
+
+
+_clients: Dict[str, CollectorClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_collector_client() -> Optional[CollectorClient]:
+    path = insider_settings.COLLECTOR_SOCKET
+    if not path:
+        return None
+
+    with _clients_lock:
+        client = _clients.get(path)
+        if client is None:
+            client = _clients[path] = CollectorClient(path)
+        return client
+
+
+class Collector:
+    """
+    Receiving side. Accumulates footprints and hands them to `flush` once
+    `batch_size` is reached or `flush_interval` seconds have passed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush: Callable[[List[Dict[str, Any]]], None],
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+    ):
+        self.path = path
+        self.flush = flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._sock = None
+        self._running = False
+
+    def bind(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER_BYTES)
+        sock.bind(self.path)
+        os.chmod(self.path, 0o660)
+        self._sock = sock
+
+    def stop(self):
+        self._running = False
+
+    def serve_forever(self):
+        if self._sock is None:
+            self.bind()
+
+        self._running = True
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+
+        try:
+            while self._running:
+                self._sock.settimeout(max(0.0, deadline - time.monotonic()) or 0.001)
+
+                try:
+                    message = self._sock.recv(MAX_DATAGRAM_BYTES)
+                except socket.timeout:
+                    message = None
+
+                if message:
+                    try:
+                        batch.append(codec.decode(message))
+                    except Exception as e:
+                        logger.warning(f"INSIDER: Collector dropped an undecodable message: {e}")
+
+                if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                    if batch:
+                        self.flush(batch)
+                        batch = []
+                    deadline = time.monotonic() + self.flush_interval
+        finally:
+            if batch:
+                self.flush(batch)
+            self.close()
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,133 @@
+"""
+insider.services.export
+-----------------------
+
+Bulk export of footprints as NDJSON or CSV for offline analysis, behind
+`footprints/export/` and `manage.py insider_export`.
+
+Rows are read with `values_list(...).iterator(chunk_size=...)` (a
+server-side cursor on PostgreSQL) and encoded into chunks of about
+CHUNK_BYTES, gzip-compressed on the fly if asked, so memory stays
+constant whatever the size of the export. Only the footprint columns are
+exported by default; payload fields (bodies, logs, stack trace) are joined
+in when listed in `fields`.
+"""
+
+import io
+import csv
+import zlib
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+from django.db.models import F, JSONField
+from django.db.models.functions import Coalesce
+
+from insider.services.archive import PAYLOAD_COLUMNS
+from insider.sinks.ndjson import FootprintJSONEncoder
+
+FORMATS = ("ndjson", "csv")
+COLUMNS = (
+    "id", "request_id", "created_at", "incidence_id", "request_user", "request_path", "request_method",
+    "status_code", "response_time", "db_query_count", "ip_address", "user_agent", "exception_name",
+)
+FIELDS = COLUMNS + PAYLOAD_COLUMNS
+CHUNK_BYTES = 64 * 1024
+CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def parse_fields(value: Optional[str]) -> List[str]:
+    """
+    The fields of a comma-separated `fields` parameter, in the given order;
+    every footprint column when empty. Raises ValueError for unknown ones.
+    """
+
+    if not value:
+        return list(COLUMNS)
+
+    fields = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in fields if name not in FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Choose from {', '.join(FIELDS)}.")
+    return list(dict.fromkeys(fields))
+
+
+def rows(footprints, fields: Sequence[str], chunk_size: int = 2000) -> Iterator[tuple]:
+    """
+    Value tuples of `fields` for a Footprint queryset, oldest first.
+    """
+
+    columns = [
+        Coalesce(F(f"payload__{name}"), F(f"payload__{name}_blob__content"), output_field=JSONField())
+        if name in PAYLOAD_COLUMNS else name
+        for name in fields
+    ]
+    return footprints.order_by("created_at", "pk").values_list(*columns).iterator(chunk_size=chunk_size)
+
+
+def _chunked(pieces: Iterable[str]) -> Iterator[bytes]:
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= CHUNK_BYTES:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def encode_ndjson(fields: Sequence[str], values: Iterable[tuple]) -> Iterator[bytes]:
+    encoder = FootprintJSONEncoder(separators=(",", ":"))
+    return _chunked(encoder.encode(dict(zip(fields, row))) + "\n" for row in values)
+
+
+def encode_csv(fields: Sequence[str], values: Iterable[tuple]) -> Iterator[bytes]:
+    """
+    One header line, then one line per footprint. Payload fields are
+    written as JSON, datetimes in ISO format.
+    """
+
+    encoder = FootprintJSONEncoder(separators=(",", ":"))
+    payload = [name in PAYLOAD_COLUMNS for name in fields]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(row) -> str:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+        return buffer.getvalue()
+
+    def lines():
+        yield line(fields)
+        for row in values:
+            yield line([
+                encoder.encode(value) if is_payload and value is not None
+                else value.isoformat() if hasattr(value, "isoformat") else value
+                for value, is_payload in zip(row, payload)
+            ])
+    return _chunked(lines())
+
+
+def gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export(footprints, fmt: str = "ndjson", fields: Optional[Sequence[str]] = None, compress: bool = False,
+           chunk_size: int = 2000) -> Iterator[bytes]:
+    """
+    The encoded footprints of a queryset, as a stream of byte chunks.
+    """
+
+    fields = list(fields or COLUMNS)
+    encode = encode_csv if fmt == "csv" else encode_ndjson
+    chunks = encode(fields, rows(footprints, fields, chunk_size))
+    return gzipped(chunks) if compress else chunks
+
+
+def filename(fmt: str, compress: bool, stamp: Any) -> str:
+    return f"footprints-{stamp:%Y%m%d-%H%M%S}.{fmt}{'.gz' if compress else ''}"
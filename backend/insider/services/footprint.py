@@ -1,11 +1,19 @@
 import logging
 from datetime import timedelta
-from django.db import models
+from typing import List, Optional
+from django.db import models, transaction
+from django.db.models.functions import Greatest
+from django.db.utils import InterfaceError, OperationalError
 from django.utils import timezone
+from insider.hll import HyperLogLog, position
 from insider.models import Footprint, Incidence
 from insider.utils import generate_fingerprint
 from insider.registry import get_active_integrations, INTEGRATION_REGISTRY
 from insider.settings import settings as insider_settings
+from insider.services.incidence_cache import incidence_cache, CachedIncidence
+from insider.services.spool import get_spool
+from insider.services import status_counts, watermark
+from insider.sinks import get_sinks
 
 logger = logging.getLogger(__name__)
 
@@ -14,84 +22,283 @@ def save_footprint(footprint_data: dict):
     """
     Saves the collected footprint data in a background Celery task,
     respecting the configured DB_ALIAS.
+
+    The footprint is handed to every configured sink (see insider.sinks) that
+    accepts it. If the database is unreachable the footprint is written to
+    the local spool (when SPOOL_DIR is configured) instead of being dropped.
+    """
+
+    if not footprint_data.get('__db_alias'):
+        footprint_data['__db_alias'] = 'default'
+
+    for sink in get_sinks():
+        if not sink.accepts(footprint_data):
+            continue
+
+        try:
+            sink.write(footprint_data)
+
+        except (OperationalError, InterfaceError) as e:
+            data = dict(footprint_data)
+            db_alias = data.pop('__db_alias')
+            if not spool_footprint(data, db_alias):
+                logger.error(f"INSIDER: Critical error in save_footprint_task: {e}", exc_info=True)
+
+        except Exception as e:
+            logger.error(f"INSIDER: Critical error in save_footprint_task ({sink} sink): {e}", exc_info=True)
+
+    watermark.notify()
+
+
+def write_footprint(footprint_data: dict, db_alias: str) -> Footprint:
+    """
+    Stores one footprint and aggregates it into an Incidence if it is an error.
+    Unlike save_footprint, database errors are raised to the caller.
+
+    Both happen in one transaction: a footprint that fails to insert (and
+    gets spooled or retried) hasn't been counted into its incidence yet.
+    """
+
+    incidence_id = None
+    should_notify = False
+    is_error = footprint_data.get("status_code", 200) >= 400
+
+    try:
+        with transaction.atomic(using=db_alias):
+            if is_error:
+                incidence_id, should_notify = aggregate_incidence(footprint_data, db_alias)
+
+            footprint = Footprint.objects.using(db_alias).create(
+                incidence_id=incidence_id, **footprint_data
+            )
+    except Exception:
+        if is_error:
+            # The cache may hold an incidence (or a notification claim) that was rolled back.
+            incidence_cache.invalidate(generate_fingerprint(footprint_data))
+        raise
+
+    if should_notify:
+        notify_integrations(footprint)
+
+    return footprint
+
+
+def save_footprint_batch(batch: List[dict], batch_size: int = 500, sinks=None) -> int:
+    """
+    Bulk path for replaying spooled (or collected) footprints.
+
+    Each sink receives the footprints it accepts through its `write_batch`.
+    A sink failing doesn't stop the remaining ones. Database errors are
+    raised once every sink has run, so the caller can spool or retry the
+    batch; other failures are logged. Returns the number of footprints
+    written across sinks.
+    """
+
+    written = 0
+    db_error = None
+
+    for sink in (get_sinks() if sinks is None else sinks):
+        accepted = [item for item in batch if sink.accepts(item)]
+        if not accepted:
+            continue
+
+        try:
+            written += sink.write_batch(accepted, batch_size=batch_size)
+        except (OperationalError, InterfaceError) as e:
+            db_error = db_error or e
+        except Exception as e:
+            logger.error(f"INSIDER: {sink} sink failed on a batch of {len(accepted)} footprints: {e}", exc_info=True)
+
+    if written:
+        watermark.notify()
+    if db_error is not None:
+        raise db_error
+
+    return written
+
+
+def spool_footprint(footprint_data: dict, db_alias: str) -> bool:
     """
+    Appends a footprint that could not be saved to the local spool.
+    Returns False if spooling is disabled or failed.
+    """
+
+    spool = get_spool()
+    if spool is None:
+        return False
 
-    db_alias = footprint_data.pop('__db_alias', None)
-    if not db_alias:
-        db_alias = 'default'
+    record = dict(footprint_data)
+    record['__db_alias'] = db_alias
 
     try:
-        footprint = Footprint.objects.using(db_alias).create(**footprint_data)
+        spool.append(record)
+    except Exception as e:
+        logger.error(f"INSIDER: Could not write footprint to spool '{spool.directory}': {e}")
+        return False
+
+    logger.warning(
+        f"INSIDER: Database '{db_alias}' unavailable, footprint {footprint_data.get('request_id')} spooled to disk."
+    )
+    return True
 
-        if footprint.status_code >= 400:
-            fingerprint_hash = generate_fingerprint(footprint_data)
 
-            if footprint_data.get("exception_name"):
-                title = f"{footprint_data['exception_name']} at {footprint_data['request_path']}"
-            else:
-                title = f"Error {footprint.status_code} at {footprint.request_path}"
+def aggregate_incidence(footprint_data: dict, db_alias: str):
+    """
+    Groups an error footprint into its Incidence.
+    Returns (incidence_id, should_notify).
+
+    Repeat fingerprints are served from the per-process incidence cache: the
+    occurrence is counted with a single UPDATE that is conditional on the
+    cached status, so a status changed elsewhere (resolved, ignored, deleted)
+    simply misses and falls back to the full lookup below.
+    """
+
+    fingerprint_hash = generate_fingerprint(footprint_data)
+    now = timezone.now()
+    # A footprint written late (spool replay, collector) must not move last_seen past later ones.
+    last_seen = Greatest(models.F('last_seen'), footprint_data.get('created_at') or now)
+    cooldown = timedelta(hours=insider_settings.COOLDOWN_HOURS)
+
+    cached = incidence_cache.get(fingerprint_hash)
+    if cached is not None:
+        updated = Incidence.objects.using(db_alias).filter(
+            id=cached.id, status=cached.status
+        ).update(
+            occurrence_count=models.F('occurrence_count') + 1,
+            last_seen=last_seen
+        )
 
-            # Aggregate
-            incidence, created = Incidence.objects.using(db_alias).get_or_create(
-                fingerprint=fingerprint_hash,
-                defaults={'title': title}
+        if updated:
+            registers = count_affected_user(
+                cached.id, footprint_data.get("request_user"), db_alias, cached.user_registers
             )
+            if registers is not cached.user_registers:
+                cached = cached._replace(user_registers=registers)
+                incidence_cache.set(fingerprint_hash, cached)
+
+            if cached.last_notified is None or now - cached.last_notified <= cooldown:
+                return cached.id, False
+
+            # Cooldown has passed. Claim the notification so concurrent workers
+            # holding the same cache entry don't notify twice.
+            claimed = Incidence.objects.using(db_alias).filter(
+                id=cached.id, last_notified=cached.last_notified
+            ).update(last_notified=now)
+
+            if claimed:
+                incidence_cache.set(fingerprint_hash, cached._replace(last_notified=now))
+                return cached.id, True
+
+            incidence_cache.invalidate(fingerprint_hash)
+            return cached.id, False
 
-            footprint.incidence = incidence
-            footprint.save(update_fields=['incidence'])
+        incidence_cache.invalidate(fingerprint_hash)
 
-            # update count and last seen for this incidence instance
-            if not created:
-                Incidence.objects.using(db_alias).filter(id=incidence.id).update(
-                    occurrence_count=models.F('occurrence_count') + 1,
-                    last_seen=timezone.now()
-                )
+    if footprint_data.get("exception_name"):
+        title = f"{footprint_data['exception_name']} at {footprint_data['request_path']}"
+    else:
+        title = f"Error {footprint_data.get('status_code')} at {footprint_data.get('request_path')}"
 
-                incidence.refresh_from_db()
+    # Aggregate
+    incidence, created = Incidence.objects.using(db_alias).get_or_create(
+        fingerprint=fingerprint_hash,
+        defaults={'title': title}
+    )
 
-            should_notify = False
+    # update count and last seen for this incidence instance
+    if not created:
+        Incidence.objects.using(db_alias).filter(id=incidence.id).update(
+            occurrence_count=models.F('occurrence_count') + 1,
+            last_seen=last_seen
+        )
 
-            if created:
+        incidence.refresh_from_db()
+
+    should_notify = False
+
+    if created:
+        should_notify = True
+
+    # Recurring Incidence
+    else:
+        # Notify if incidence was already marked resolved.
+        if incidence.status == 'RESOLVED':
+            status_counts.move(
+                Incidence.objects.filter(id=incidence.id, status='RESOLVED'), 'OPEN', db_alias
+            )
+            incidence.status = 'OPEN'
+            should_notify = True
+
+        # Notify if the cooldown has passed.
+        else:
+            time_since_notification = now - incidence.last_notified
+            if time_since_notification > cooldown:
                 should_notify = True
 
-            # Recurring Incidence
-            else:
-                # Notify if incidence was already marked resolved.
-                if incidence.status == 'RESOLVED':
-                    incidence.status = 'OPEN'
-                    incidence.save(using=db_alias, update_fields=['status'])
-                    should_notify = True
-
-                # Notify if the cooldown has passed.
-                else:
-                    time_since_notification = timezone.now() - incidence.last_notified
-                    if time_since_notification > timedelta(hours=insider_settings.COOLDOWN_HOURS):
-                        should_notify = True
-
-            if should_notify:
-                incidence.last_notified = timezone.now()
-                incidence.save(using=db_alias, update_fields=["last_notified"])
-
-                shared_context = {}
-
-                active_integrations = get_active_integrations()
-                
-                for integration in active_integrations:
-                    try:
-                        IntegrationClass = INTEGRATION_REGISTRY.get(integration.identifier)
-                        
-                        if not IntegrationClass:
-                            logger.warning(f"INSIDER: Found active integration '{integration.identifier}' in DB but no code class found.")
-                            continue
-
-                        integration_instance = IntegrationClass(db_instance=integration)
-                        result = integration_instance.run(footprint, shared_context)
-                        
-                        if result and isinstance(result, dict):
-                            shared_context.update(result)
-                                
-                    except Exception as e:
-                        logger.error(f"INSIDER: Integration '{integration.identifier}' failed: {e}")
-            
-    except Exception as e:
-        logger.error(f"INSIDER: Critical error in save_footprint_task: {e}", exc_info=True)
+    if should_notify:
+        incidence.last_notified = now
+        incidence.save(using=db_alias, update_fields=["last_notified"])
+
+    incidence_cache.set(fingerprint_hash, CachedIncidence(
+        id=incidence.id,
+        status=incidence.status,
+        last_notified=incidence.last_notified,
+        user_registers=count_affected_user(incidence.id, footprint_data.get("request_user"), db_alias),
+    ))
+
+    return incidence.id, should_notify
+
+
+def count_affected_user(incidence_id: int, user: Optional[str], db_alias: str,
+                        registers: Optional[bytes] = None) -> Optional[bytes]:
+    """
+    Adds `user` to the incidence's distinct-user counter and refreshes its
+    `users_affected`. `registers` are the caller's last known HyperLogLog
+    registers: a user who can't raise them (almost every repeat user) costs
+    no query. Returns the registers as they are now.
+    """
+
+    if not user:
+        return registers
+
+    index, rank = position(user)
+    if registers is not None and registers[index] >= rank:
+        return registers
+
+    incidences = Incidence.objects.using(db_alias).filter(id=incidence_id)
+    with transaction.atomic(using=db_alias):
+        row = incidences.select_for_update().values('user_registers').first()
+        if row is None:
+            return registers
+
+        counter = HyperLogLog(row['user_registers'])
+        if counter.add_position(index, rank):
+            incidences.update(user_registers=counter.to_bytes(), users_affected=counter.count())
+        return counter.to_bytes()
+
+
+def notify_integrations(footprint: Footprint):
+    """
+    Runs the active integrations (Waterfall) for a footprint.
+    """
+
+    shared_context = {}
+
+    active_integrations = get_active_integrations()
+
+    for integration in active_integrations:
+        try:
+            IntegrationClass = INTEGRATION_REGISTRY.get(integration.identifier)
+
+            if not IntegrationClass:
+                logger.warning(f"INSIDER: Found active integration '{integration.identifier}' in DB but no code class found.")
+                continue
+
+            integration_instance = IntegrationClass(db_instance=integration)
+            result = integration_instance.run(footprint, shared_context)
+
+            if result and isinstance(result, dict):
+                shared_context.update(result)
+
+        except Exception as e:
+            logger.error(f"INSIDER: Integration '{integration.identifier}' failed: {e}")
@@ -0,0 +1,113 @@
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Iterable, NamedTuple, Optional
+
+from insider.settings import settings as insider_settings
+
+
+class CachedIncidence(NamedTuple):
+    """
+    What the ingestion worker needs to know about an incidence to aggregate
+    a repeat occurrence without reading the row again.
+    """
+
+    id: int
+    status: str
+    last_notified: Optional[datetime]
+    user_registers: Optional[bytes] = None
+
+
+class IncidenceCache:
+    """
+    Bounded, per-process LRU cache mapping fingerprint -> CachedIncidence.
+
+    Entries expire after `ttl` seconds so a worker never trusts a stale
+    status for long, and the least recently used fingerprint is evicted once
+    `max_size` is reached. A `max_size` of 0 disables caching entirely.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, ttl: Optional[int] = None):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries = OrderedDict()  # fingerprint -> (CachedIncidence, expires_at)
+        self._fingerprints_by_id = {}
+        self._lock = threading.Lock()
+
+    @property
+    def max_size(self) -> int:
+        if self._max_size is not None:
+            return self._max_size
+        return insider_settings.INCIDENCE_CACHE_SIZE
+
+    @property
+    def ttl(self) -> int:
+        if self._ttl is not None:
+            return self._ttl
+        return insider_settings.INCIDENCE_CACHE_TTL
+
+    def get(self, fingerprint: str) -> Optional[CachedIncidence]:
+        with self._lock:
+            item = self._entries.get(fingerprint)
+            if item is None:
+                return None
+
+            entry, expires_at = item
+            if expires_at <= time.monotonic():
+                self._pop(fingerprint)
+                return None
+
+            self._entries.move_to_end(fingerprint)
+            return entry
+
+    def set(self, fingerprint: str, entry: CachedIncidence) -> None:
+        max_size = self.max_size
+        if max_size <= 0:
+            return
+
+        with self._lock:
+            self._pop(fingerprint)
+            self._entries[fingerprint] = (entry, time.monotonic() + self.ttl)
+            self._fingerprints_by_id[entry.id] = fingerprint
+
+            while len(self._entries) > max_size:
+                oldest = next(iter(self._entries))
+                self._pop(oldest)
+
+    def invalidate(self, fingerprint: str) -> None:
+        with self._lock:
+            self._pop(fingerprint)
+
+    def invalidate_ids(self, incidence_ids: Iterable) -> None:
+        """
+        Drops entries by incidence primary key, e.g. after a bulk status change.
+        """
+
+        with self._lock:
+            for incidence_id in incidence_ids:
+                try:
+                    incidence_id = int(incidence_id)
+                except (TypeError, ValueError):
+                    continue
+
+                fingerprint = self._fingerprints_by_id.get(incidence_id)
+                if fingerprint is not None:
+                    self._pop(fingerprint)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._fingerprints_by_id.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _pop(self, fingerprint: str) -> None:
+        item = self._entries.pop(fingerprint, None)
+        if item is not None:
+            self._fingerprints_by_id.pop(item[0].id, None)
+
+
+# Shared by every save_footprint call in this process.
+incidence_cache = IncidenceCache()
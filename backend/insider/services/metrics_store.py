@@ -0,0 +1,487 @@
+"""
+insider.services.metrics_store
+------------------------------
+
+Optional embedded columnar store for the numeric side of footprints,
+memory-mapped with NumPy.
+
+The `metrics` sink appends one row per request to typed arrays:
+
+    ts        int64    epoch milliseconds, non-decreasing within a segment
+    route     uint32   id in the segment's route dictionary
+    status    uint16
+    latency   float32  ms
+    queries   uint32
+
+Each ingestion process writes its own segments, so writers never share a
+file:
+
+    METRICS_DIR/
+        <epoch ms>-<pid>-<seq>/
+            ts.int64, route.uint32, ...   one preallocated memmap per column
+            rows                          committed row count (int64)
+            routes                        one JSON [route, method] per line; line n is id n
+
+Column files are preallocated to METRICS_SEGMENT_ROWS rows. A row becomes
+visible to readers once `rows` is bumped past it, after its values (and any
+new route) are written. Because timestamps are sorted within a segment, a
+time window is two binary searches, and every aggregation (counts,
+percentiles, time buckets, per-endpoint figures) is a handful of vectorized
+NumPy operations over the window's slices.
+
+With DASHBOARD_BACKEND = "metrics" the dashboard reads this store instead
+of the footprint rollups. The store needs numpy and is off unless
+METRICS_DIR is set. Whole segments are dropped by the cleanup task once
+their newest row is past DATA_RETENTION_DAYS.
+"""
+
+import os
+import json
+import math
+import time
+import shutil
+import logging
+import threading
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from insider import sketch
+from insider.settings import settings as insider_settings
+from insider.utils import normalize_route, series_window
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = (
+    ("ts", "int64"),
+    ("route", "uint32"),
+    ("status", "uint16"),
+    ("latency", "float32"),
+    ("queries", "uint32"),
+)
+ROWS_FILE = "rows"
+ROUTES_FILE = "routes"
+# Rows older than the segment's newest by more than this (a replayed spool, a
+# collector backlog) start a new segment instead of being raised to its time.
+LATE_ROWS_MS = 60 * 1000
+
+RouteKey = Tuple[str, str]
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("The metrics store requires numpy (pip install numpy).")
+
+
+def _to_ms(moment: Optional[datetime]) -> Optional[int]:
+    return None if moment is None else int(moment.timestamp() * 1000)
+
+
+def route_key(path: Optional[str], method: Optional[str]) -> RouteKey:
+    return normalize_route(path)[:255], (method or "")[:20]
+
+
+def sketch_buckets(latency):
+    """
+    Vectorized insider.sketch.bucket_index, so store percentiles use the same
+    buckets as the rollup sketches.
+    """
+
+    scaled = np.maximum(latency.astype(np.float64), sketch.MIN_VALUE) / sketch.MIN_VALUE
+    buckets = np.ceil(np.log(scaled) / math.log(sketch.GAMMA))
+    return np.clip(buckets, 0, sketch.NUM_BUCKETS - 1).astype(np.int64)
+
+
+class Segment:
+    """
+    One segment directory. Opened read-write by the process that owns it and
+    read-only by everyone else.
+    """
+
+    def __init__(self, path: str, capacity: Optional[int] = None):
+        self.path = path
+        self.name = os.path.basename(path)
+        writable = capacity is not None
+        mode = "w+" if writable else "r"
+
+        if writable:
+            os.makedirs(path)
+        else:
+            capacity = os.path.getsize(os.path.join(path, "ts.int64")) // 8
+
+        self.capacity = capacity
+        self.columns = {
+            name: np.memmap(os.path.join(path, f"{name}.{dtype}"), dtype=dtype, mode=mode, shape=(capacity,))
+            for name, dtype in COLUMNS
+        }
+        self._rows = np.memmap(os.path.join(path, ROWS_FILE), dtype="int64", mode=mode, shape=(1,))
+
+        self.routes: List[RouteKey] = []
+        self._route_ids: Dict[RouteKey, int] = {}
+        self._routes_path = os.path.join(path, ROUTES_FILE)
+        self._routes_offset = 0
+        self._routes_handle = open(self._routes_path, "ab") if writable else None
+        if not writable:
+            self.refresh()
+
+    @property
+    def rows(self) -> int:
+        return int(self._rows[0])
+
+    def refresh(self) -> None:
+        """
+        Picks up routes the owning process added since the last call.
+        """
+
+        with open(self._routes_path, "rb") as handle:
+            handle.seek(self._routes_offset)
+            data = handle.read()
+
+        # A trailing partial line is a route still being written; no committed row uses it yet.
+        complete = data[:data.rfind(b"\n") + 1]
+        self._routes_offset += len(complete)
+        for line in complete.splitlines():
+            self._add_route(tuple(json.loads(line)))
+
+    def _add_route(self, key: RouteKey) -> int:
+        self._route_ids[key] = len(self.routes)
+        self.routes.append(key)
+        return self._route_ids[key]
+
+    def route_ids(self, keys: Sequence[RouteKey]):
+        ids = np.empty(len(keys), dtype=np.uint32)
+        for position, key in enumerate(keys):
+            route_id = self._route_ids.get(key)
+            if route_id is None:
+                self._routes_handle.write(json.dumps(list(key)).encode("utf-8") + b"\n")
+                self._routes_handle.flush()
+                route_id = self._add_route(key)
+            ids[position] = route_id
+        return ids
+
+    def extend(self, values: Dict[str, Any]) -> None:
+        start = self.rows
+        end = start + len(values["ts"])
+        for name, _ in COLUMNS:
+            self.columns[name][start:end] = values[name]
+        self._rows[0] = end
+
+    def window(self, since_ms: Optional[int], until_ms: Optional[int]) -> Tuple[int, int]:
+        rows = self.rows
+        ts = self.columns["ts"][:rows]
+        lo = 0 if since_ms is None else int(np.searchsorted(ts, since_ms, side="left"))
+        hi = rows if until_ms is None else int(np.searchsorted(ts, until_ms, side="left"))
+        return lo, hi
+
+    def newest(self) -> Optional[int]:
+        rows = self.rows
+        return int(self.columns["ts"][rows - 1]) if rows else None
+
+    def flush(self) -> None:
+        for column in self.columns.values():
+            column.flush()
+        self._rows.flush()
+
+    def close(self) -> None:
+        if self._routes_handle is not None:
+            self._routes_handle.close()
+
+
+class MetricsStore:
+    """
+    A METRICS_DIR. Thread-safe; each process appends to its own segment.
+    """
+
+    def __init__(self, directory: str, segment_rows: Optional[int] = None):
+        _require_numpy()
+        self.directory = directory
+        self.segment_rows = segment_rows or insider_settings.METRICS_SEGMENT_ROWS
+        self._lock = threading.Lock()
+        self._writer: Optional[Segment] = None
+        self._pid = None
+        self._seq = 0
+        self._last_ts = 0
+        self._readers: Dict[str, Segment] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    # Writing
+
+    def _writable(self, needed: int, oldest: int) -> Segment:
+        if self._pid != os.getpid():
+            # Forked: the parent's segment belongs to the parent.
+            self._writer, self._pid, self._seq = None, os.getpid(), 0
+
+        if self._writer is not None and (
+            self._writer.rows + needed > self._writer.capacity or oldest < self._last_ts - LATE_ROWS_MS
+        ):
+            self._writer.flush()
+            self._writer.close()
+            self._writer = None
+
+        if self._writer is None:
+            self._seq += 1
+            name = f"{int(time.time() * 1000)}-{self._pid}-{self._seq}"
+            self._writer = Segment(os.path.join(self.directory, name), capacity=max(self.segment_rows, needed))
+            self._last_ts = 0
+        return self._writer
+
+    def append(self, footprints: Iterable[Dict[str, Any]]) -> int:
+        """
+        Appends footprint dicts, timestamped with their `created_at` (capture
+        time) or now.
+        """
+
+        footprints = list(footprints)
+        if not footprints:
+            return 0
+
+        now = int(time.time() * 1000)
+        stamps = [f.get("created_at") for f in footprints]
+
+        keys = [route_key(f.get("request_path"), f.get("request_method")) for f in footprints]
+        unique = list(dict.fromkeys(keys))
+        index = {key: n for n, key in enumerate(unique)}
+
+        return self.append_columns({
+            "ts": np.fromiter((int(t.timestamp() * 1000) if t else now for t in stamps), dtype=np.int64,
+                              count=len(stamps)),
+            "route": np.fromiter((index[key] for key in keys), dtype=np.uint32, count=len(keys)),
+            "status": [int(f.get("status_code") or 0) for f in footprints],
+            "latency": [float(f.get("response_time") or 0.0) for f in footprints],
+            "queries": [int(f.get("db_query_count") or 0) for f in footprints],
+        }, unique)
+
+    def append_columns(self, values: Dict[str, Any], routes: Sequence[RouteKey]) -> int:
+        """
+        Appends rows given as whole columns; `values["route"]` indexes into
+        `routes`. Rows are sorted by time; rows slightly older than the
+        segment's newest are raised to it, much older ones go to a new
+        segment (LATE_ROWS_MS).
+        """
+
+        count = len(values["ts"])
+        ts = np.asarray(values["ts"], dtype=np.int64)
+        order = np.argsort(ts, kind="stable")
+        column = lambda name: np.asarray(values[name])[order]  # noqa: E731
+
+        with self._lock:
+            segment = self._writable(count, int(ts[order[0]]))
+            ts = np.maximum.accumulate(np.maximum(ts[order], self._last_ts))
+            self._last_ts = int(ts[-1])
+
+            segment.extend({
+                "ts": ts,
+                "route": segment.route_ids(routes)[column("route").astype(np.int64)],
+                "status": np.clip(column("status"), 0, np.iinfo(np.uint16).max),
+                "latency": column("latency"),
+                "queries": np.clip(column("queries"), 0, np.iinfo(np.uint32).max),
+            })
+        return count
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._writer is not None and self._pid == os.getpid():
+                self._writer.flush()
+
+    # Reading
+
+    def segments(self) -> List[Segment]:
+        names = sorted(
+            name for name in os.listdir(self.directory)
+            if os.path.isfile(os.path.join(self.directory, name, ROUTES_FILE))
+        )
+        for name in set(self._readers) - set(names):
+            self._readers.pop(name).close()
+
+        segments = []
+        for name in names:
+            reader = self._readers.get(name)
+            if reader is None:
+                try:
+                    reader = self._readers[name] = Segment(os.path.join(self.directory, name))
+                except (FileNotFoundError, ValueError):
+                    continue  # being created or removed
+            segments.append(reader)
+        return segments
+
+    def _slices(self, since: Optional[datetime], until: Optional[datetime]) -> Iterator[Tuple[Segment, Dict[str, Any]]]:
+        since_ms, until_ms = _to_ms(since), _to_ms(until)
+        for segment in self.segments():
+            lo, hi = segment.window(since_ms, until_ms)
+            # Routes after rows: the owner writes a route before any row using it,
+            # so every route id in [lo, hi) is known once this returns.
+            segment.refresh()
+            if hi > lo:
+                yield segment, {name: column[lo:hi] for name, column in segment.columns.items()}
+
+    @staticmethod
+    def _route_mask(segment: Segment, route_ids, route: Optional[str], method: Optional[str]):
+        if route is None and method is None:
+            return None
+        wanted = [
+            n for n, (r, m) in enumerate(segment.routes)
+            if (route is None or r == route) and (method is None or m == method)
+        ]
+        return np.isin(route_ids, wanted)
+
+    def window_totals(self, since: datetime, until: Optional[datetime] = None) -> Dict[str, float]:
+        total = errors_500 = errors_400 = 0
+        latency_sum = 0.0
+        for _, columns in self._slices(since, until):
+            status = columns["status"]
+            total += len(status)
+            errors_500 += int(np.count_nonzero(status >= 500))
+            errors_400 += int(np.count_nonzero((status >= 400) & (status < 500)))
+            latency_sum += float(columns["latency"].sum(dtype=np.float64))
+
+        return {
+            "total": total,
+            "errors_500": errors_500,
+            "errors_400": errors_400,
+            "avg_response_time": latency_sum / total if total else 0.0,
+        }
+
+    def latency_percentiles(self, since: datetime, until: Optional[datetime] = None,
+                            route: Optional[str] = None, method: Optional[str] = None) -> Dict[str, Optional[float]]:
+        dense = np.zeros(sketch.NUM_BUCKETS, dtype=np.int64)
+        lowest = highest = None
+        for segment, columns in self._slices(since, until):
+            latency = columns["latency"]
+            mask = self._route_mask(segment, columns["route"], route, method)
+            if mask is not None:
+                latency = latency[mask]
+            if not len(latency):
+                continue
+
+            dense += np.bincount(sketch_buckets(latency), minlength=sketch.NUM_BUCKETS)
+            low, high = float(latency.min()), float(latency.max())
+            lowest = low if lowest is None else min(lowest, low)
+            highest = high if highest is None else max(highest, high)
+
+        return sketch.dense_percentiles(dense, lowest, highest)
+
+    def endpoint_latencies(self, since: datetime, until: Optional[datetime] = None, limit: int = 20) -> List[Dict]:
+        groups: Dict[RouteKey, list] = {}
+        for segment, columns in self._slices(since, until):
+            route_ids = columns["route"].astype(np.int64)
+            latency = columns["latency"]
+            routes = max(len(segment.routes), int(route_ids.max()) + 1)
+
+            dense = np.bincount(
+                route_ids * sketch.NUM_BUCKETS + sketch_buckets(latency), minlength=routes * sketch.NUM_BUCKETS
+            ).reshape(routes, sketch.NUM_BUCKETS)
+            counts = dense.sum(axis=1)
+            lows = np.full(routes, np.inf)
+            highs = np.full(routes, -np.inf)
+            np.minimum.at(lows, route_ids, latency)
+            np.maximum.at(highs, route_ids, latency)
+
+            for route_id in np.flatnonzero(counts):
+                if route_id >= len(segment.routes):
+                    continue  # its route line isn't complete yet
+                group = groups.setdefault(segment.routes[route_id], [0, math.inf, -math.inf, 0])
+                group[0] += int(counts[route_id])
+                group[1] = min(group[1], float(lows[route_id]))
+                group[2] = max(group[2], float(highs[route_id]))
+                group[3] = group[3] + dense[route_id]
+
+        endpoints = [
+            {"route": route, "method": method, "count": count, **sketch.dense_percentiles(dense, low, high)}
+            for (route, method), (count, low, high, dense) in groups.items()
+        ]
+        endpoints.sort(key=lambda e: e["p95"] or 0.0, reverse=True)
+        return endpoints[:limit]
+
+    def time_series(self, since: datetime, until: Optional[datetime] = None,
+                    bucket_seconds: int = 3600) -> Dict[str, list]:
+        """
+        Same parallel lists as rollups.time_series, one bincount per
+        column and slice.
+        """
+
+        until = until or datetime.now(dt_timezone.utc)
+        start, size = series_window(since, until, bucket_seconds)
+        totals = np.zeros(size, dtype=np.int64)
+        errors_500 = np.zeros(size, dtype=np.int64)
+        errors_400 = np.zeros(size, dtype=np.int64)
+        latency_sums = np.zeros(size, dtype=np.float64)
+        dense = np.zeros((size, sketch.NUM_BUCKETS), dtype=np.int64)
+        lows, highs = np.full(size, np.inf), np.full(size, -np.inf)
+
+        for _, columns in self._slices(datetime.fromtimestamp(start, dt_timezone.utc), until):
+            index = (columns["ts"] - start * 1000) // (bucket_seconds * 1000)
+            status, latency = columns["status"], columns["latency"]
+            totals += np.bincount(index, minlength=size)
+            errors_500 += np.bincount(index[status >= 500], minlength=size)
+            errors_400 += np.bincount(index[(status >= 400) & (status < 500)], minlength=size)
+            latency_sums += np.bincount(index, weights=latency, minlength=size)
+            dense += np.bincount(
+                index * sketch.NUM_BUCKETS + sketch_buckets(latency), minlength=size * sketch.NUM_BUCKETS
+            ).reshape(size, sketch.NUM_BUCKETS)
+            # Rows are in time order, so each bucket is one run (or a few): reduce per run first.
+            runs = np.flatnonzero(np.diff(index)) + 1
+            starts = np.concatenate(([0], runs))
+            np.minimum.at(lows, index[starts], np.minimum.reduceat(latency, starts))
+            np.maximum.at(highs, index[starts], np.maximum.reduceat(latency, starts))
+
+        averages = np.divide(latency_sums, totals, out=np.zeros(size), where=totals > 0)
+        series = {
+            "time": list(range(start, start + size * bucket_seconds, bucket_seconds)),
+            "total": totals.tolist(),
+            "errors_400": errors_400.tolist(),
+            "errors_500": errors_500.tolist(),
+            "avg_response_time_ms": np.round(averages, 2).tolist(),
+        }
+        percentiles = [
+            sketch.dense_percentiles(dense[n], float(lows[n]), float(highs[n])) if totals[n] else
+            dict.fromkeys(sketch.QUANTILES)
+            for n in range(size)
+        ]
+        for name in sketch.QUANTILES:
+            series[f"{name}_response_time_ms"] = [p[name] for p in percentiles]
+        return series
+
+    # Retention
+
+    def drop_before(self, cutoff: datetime) -> List[str]:
+        """
+        Removes segments whose newest row is older than `cutoff`.
+        """
+
+        cutoff_ms = _to_ms(cutoff)
+        dropped = []
+        with self._lock:
+            for segment in self.segments():
+                if self._writer is not None and self._writer.name == segment.name:
+                    continue  # still being written by this process
+                newest = segment.newest()
+                if newest is not None and newest < cutoff_ms:
+                    self._readers.pop(segment.name).close()
+                    shutil.rmtree(segment.path, ignore_errors=True)
+                    dropped.append(segment.name)
+                    logger.info(f"INSIDER: Dropped metrics segment {segment.name}.")
+        return dropped
+
+
+_stores: Dict[str, MetricsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(directory: Optional[str] = None) -> MetricsStore:
+    """
+    The process-wide store of `directory` (defaults to METRICS_DIR).
+    """
+
+    directory = directory or insider_settings.METRICS_DIR
+    if not directory:
+        raise RuntimeError("The metrics store is disabled: set INSIDER['METRICS_DIR'].")
+
+    with _stores_lock:
+        store = _stores.get(directory)
+        if store is None:
+            store = _stores[directory] = MetricsStore(directory)
+        return store
@@ -0,0 +1,241 @@
+"""
+insider.services.partitions
+---------------------------
+
+Optional time-partitioned storage for the footprint table (PostgreSQL only).
+
+With PARTITION_INTERVAL set to "day" or "week", `manage.py insider_partitions
+--convert` turns `insider_footprint` into a table range-partitioned on
+`created_at`. The existing rows become one `insider_footprint_legacy`
+partition. From then on:
+
+- partitions are created ahead of time (PARTITION_PREMAKE intervals) by the
+  command and by the daily cleanup task, with a default partition as a
+  safety net for out-of-range rows;
+- retention detaches and drops whole partitions older than
+  DATA_RETENTION_DAYS instead of deleting rows one by one; the payload
+  rows of dropped footprints are swept afterwards by the cleanup task.
+
+Caveats of a partitioned footprint table: the primary key becomes
+(id, created_at) and `request_id` is only unique together with `created_at`,
+since PostgreSQL can't enforce uniqueness without the partition key. A
+footprint keeps its capture time when it is replayed, so a replay still
+conflicts with the stored copy; the ORM sink also skips stored request_ids
+before inserting.
+"""
+
+import re
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import List, Optional, Tuple
+
+from insider.settings import settings as insider_settings
+
+logger = logging.getLogger(__name__)
+
+TABLE = "insider_footprint"
+LEGACY_PARTITION = f"{TABLE}_legacy"
+DEFAULT_PARTITION = f"{TABLE}_default"
+SEQUENCE = f"{TABLE}_pid_seq"
+INTERVALS = ("day", "week")
+
+_BOUND_RE = re.compile(r"TO \('([^']+)'\)")
+
+
+def supports_partitioning(connection) -> bool:
+    return connection.vendor == "postgresql"
+
+
+def is_partitioned(connection) -> bool:
+    if not supports_partitioning(connection):
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def period_start(moment: datetime, interval: str) -> datetime:
+    """
+    Start (UTC midnight, Monday for weeks) of the partition containing `moment`.
+    """
+
+    if interval not in INTERVALS:
+        raise ValueError(f"Unsupported partition interval: {interval!r}")
+
+    moment = moment.astimezone(dt_timezone.utc) if moment.tzinfo else moment.replace(tzinfo=dt_timezone.utc)
+    start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "week":
+        start -= timedelta(days=start.weekday())
+    return start
+
+
+def period_step(interval: str) -> timedelta:
+    return timedelta(days=7 if interval == "week" else 1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{TABLE}_p{start:%Y%m%d}"
+
+
+def partition_upper_bound(bound_expr: str) -> Optional[datetime]:
+    """
+    Parses the upper bound out of pg_get_expr(relpartbound), e.g.
+    "FOR VALUES FROM ('2026-01-01 00:00:00+00') TO ('2026-01-02 00:00:00+00')".
+    Returns None for the default partition or unbounded ranges.
+    """
+
+    match = _BOUND_RE.search(bound_expr or "")
+    if not match:
+        return None
+
+    value = match.group(1)
+    if re.search(r"[+-]\d\d$", value):
+        value += ":00"
+    return datetime.fromisoformat(value)
+
+
+def list_partitions(connection) -> List[Tuple[str, Optional[datetime]]]:
+    """
+    Returns (partition name, upper bound) for each partition of the footprint table.
+    """
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s AND pg_table_is_visible(p.oid)",
+            [TABLE],
+        )
+        return [(name, partition_upper_bound(bound)) for name, bound in cursor.fetchall()]
+
+
+def create_partitions(connection, interval: Optional[str] = None, ahead: Optional[int] = None, now: Optional[datetime] = None) -> List[str]:
+    """
+    Creates the current partition plus `ahead` future ones. Idempotent.
+    Returns the names of partitions that did not exist yet.
+    """
+
+    interval = interval or insider_settings.PARTITION_INTERVAL or "day"
+    ahead = insider_settings.PARTITION_PREMAKE if ahead is None else ahead
+    qn = connection.ops.quote_name
+
+    existing = {name for name, _ in list_partitions(connection)}
+    start = period_start(now or datetime.now(dt_timezone.utc), interval)
+    step = period_step(interval)
+    created = []
+
+    with connection.cursor() as cursor:
+        for _ in range(ahead + 1):
+            end = start + step
+            name = partition_name(start)
+
+            if name not in existing:
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {qn(name)} PARTITION OF {qn(TABLE)} "
+                    f"FOR VALUES FROM (%s) TO (%s)",
+                    [start, end],
+                )
+                created.append(name)
+            start = end
+
+        if DEFAULT_PARTITION not in existing:
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {qn(DEFAULT_PARTITION)} PARTITION OF {qn(TABLE)} DEFAULT")
+
+    return created
+
+
+def drop_expired_partitions(connection, cutoff: datetime) -> List[str]:
+    """
+    Detaches and drops every partition whose rows are all older than `cutoff`.
+    """
+
+    qn = connection.ops.quote_name
+    dropped = []
+
+    for name, upper in sorted(list_partitions(connection), key=lambda p: p[1] or datetime.max.replace(tzinfo=dt_timezone.utc)):
+        if upper is None or upper > cutoff:
+            continue
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {qn(TABLE)} DETACH PARTITION {qn(name)}")
+            cursor.execute(f"DROP TABLE {qn(name)}")
+        dropped.append(name)
+        logger.info(f"INSIDER: Dropped footprint partition {name} (rows before {upper}).")
+
+    return dropped
+
+
+def convert_to_partitioned(connection, interval: Optional[str] = None) -> None:
+    """
+    One-off conversion of the plain footprint table into a partitioned one.
+    Existing rows are kept as the legacy partition (attaching it validates the
+    range with one scan); new rows go to the premade partitions.
+    Runs in a single transaction.
+    """
+
+    if not supports_partitioning(connection):
+        raise RuntimeError("Footprint partitioning requires PostgreSQL.")
+    if is_partitioned(connection):
+        return
+
+    from django.db import transaction
+    from insider.models import Footprint
+
+    interval = interval or insider_settings.PARTITION_INTERVAL or "day"
+    boundary = period_start(datetime.now(dt_timezone.utc), interval)
+    qn = connection.ops.quote_name
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        # Free up the names the new parent table and its indexes will use.
+        cursor.execute(f"ALTER TABLE {qn(TABLE)} RENAME TO {qn(LEGACY_PARTITION)}")
+        cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = %s", [LEGACY_PARTITION])
+        for (index_name,) in cursor.fetchall():
+            cursor.execute(f"ALTER INDEX {qn(index_name)} RENAME TO {qn(index_name[:56] + '_legacy')}")
+
+        cursor.execute(
+            f"CREATE TABLE {qn(TABLE)} (LIKE {qn(LEGACY_PARTITION)} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE (created_at)"
+        )
+        cursor.execute(f"ALTER TABLE {qn(TABLE)} ADD PRIMARY KEY (id, created_at)")
+
+        # Own id sequence, continuing after the legacy rows.
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {qn(LEGACY_PARTITION)}")
+        next_id = cursor.fetchone()[0]
+        cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {qn(SEQUENCE)} START WITH {int(next_id)}")
+        cursor.execute(f"ALTER TABLE {qn(TABLE)} ALTER COLUMN id SET DEFAULT nextval('{SEQUENCE}')")
+        cursor.execute(f"ALTER SEQUENCE {qn(SEQUENCE)} OWNED BY {qn(TABLE)}.id")
+        cursor.execute(f"ALTER TABLE {qn(LEGACY_PARTITION)} ALTER COLUMN id DROP IDENTITY IF EXISTS")
+        cursor.execute(f"ALTER TABLE {qn(LEGACY_PARTITION)} ALTER COLUMN id DROP DEFAULT")
+
+        cursor.execute(
+            f"ALTER TABLE {qn(TABLE)} ADD CONSTRAINT insider_footprint_incidence_fk "
+            f"FOREIGN KEY (incidence_id) REFERENCES insider_incidence (id) DEFERRABLE INITIALLY DEFERRED"
+        )
+
+        # Recreate the model's indexes on the parent; matching legacy indexes get attached.
+        with connection.schema_editor(atomic=False) as schema_editor:
+            for field in Footprint._meta.local_fields:
+                if field.db_index and not field.unique and not field.primary_key:
+                    schema_editor.execute(schema_editor._create_index_sql(Footprint, fields=[field]))
+            for index in Footprint._meta.indexes:
+                schema_editor.execute(index.create_sql(Footprint, schema_editor))
+
+        cursor.execute(
+            f"ALTER TABLE {qn(TABLE)} ADD CONSTRAINT insider_footprint_request_id_uniq UNIQUE (request_id, created_at)"
+        )
+
+        cursor.execute(
+            f"ALTER TABLE {qn(TABLE)} ATTACH PARTITION {qn(LEGACY_PARTITION)} "
+            f"FOR VALUES FROM (MINVALUE) TO (%s)",
+            [boundary],
+        )
+
+        create_partitions(connection, interval=interval)
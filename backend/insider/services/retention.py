@@ -0,0 +1,288 @@
+"""
+insider.services.retention
+--------------------------
+
+Chunked, low-lock retention cleanup.
+
+Expired rows are deleted in primary-key batches with plain `DELETE ... WHERE
+id IN (...)` statements, each in its own short transaction, instead of one
+ORM `.delete()` that loads every object for cascade handling. Retention is
+tiered:
+
+- healthy footprints are kept DATA_RETENTION_DAYS;
+- errors (status >= 400) and slow requests (SLOW_REQUEST_THRESHOLD) are
+  kept ERROR_RETENTION_DAYS;
+- incidences are deleted once resolved or ignored and quiet (last_seen)
+  for INCIDENCE_RETENTION_DAYS, DATA_RETENTION_DAYS by default, and only
+  when every footprint they still have is past its own tier. Those
+  footprints go with them, like the ORM cascade (archived first when
+  ARCHIVE_DIR is set); open incidences stay.
+
+Footprint payloads (FootprintPayload) are deleted in the same batch as
+their footprints, giving back their blob references (insider.services.blobs).
+
+Progress is checkpointed in the Django cache after every batch, so a run
+that gets killed resumes from the same cutoff and position on the next run.
+"""
+
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from django.utils import timezone
+
+from insider.models import Footprint, FootprintPayload, Incidence
+from insider.settings import settings as insider_settings
+from insider.services import blobs, search, status_counts
+from insider.services.incidence_cache import incidence_cache
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_KEY = "insider:retention:{tier}"
+CHECKPOINT_TIMEOUT = 2 * 24 * 60 * 60
+
+
+def error_retention_days() -> int:
+    days = insider_settings.ERROR_RETENTION_DAYS
+    return insider_settings.DATA_RETENTION_DAYS if days is None else days
+
+
+def footprint_retention_cutoff(now: Optional[datetime] = None) -> datetime:
+    """
+    Oldest moment any footprint may still be kept (the longest footprint tier).
+    """
+
+    days = max(insider_settings.DATA_RETENTION_DAYS, error_retention_days())
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+def _kept_longer() -> Q:
+    """
+    Footprints that fall in the error/slow tier.
+    """
+
+    condition = Q(status_code__gte=400)
+    threshold = insider_settings.SLOW_REQUEST_THRESHOLD
+    if threshold is not None:
+        condition |= Q(response_time__gte=threshold)
+    return condition
+
+
+def _unexpired(now: datetime) -> Q:
+    """
+    Footprints no tier has expired yet (see footprint_tiers).
+    """
+
+    days, error_days = insider_settings.DATA_RETENTION_DAYS, error_retention_days()
+    recent = Q(created_at__gte=now - timedelta(days=days))
+    if error_days == days:
+        return recent
+
+    kept_longer = _kept_longer()
+    if error_days > 0:
+        return (recent & ~kept_longer) | (kept_longer & Q(created_at__gte=now - timedelta(days=error_days)))
+    return (recent & ~kept_longer) | kept_longer
+
+
+def _load_checkpoint(tier: str, cutoff: datetime):
+    """
+    Returns (cutoff, last key). An unfinished run's cutoff wins over the new
+    one, so the rows it already walked past stay consistent with its key.
+    """
+
+    saved = cache.get(CHECKPOINT_KEY.format(tier=tier))
+    if saved:
+        last_key = (datetime.fromisoformat(saved["last_at"]), saved["last_pk"]) if saved["last_at"] else None
+        return datetime.fromisoformat(saved["cutoff"]), last_key
+    return cutoff, None
+
+
+def _save_checkpoint(tier: str, cutoff: datetime, last_at: datetime, last_pk: int) -> None:
+    cache.set(
+        CHECKPOINT_KEY.format(tier=tier),
+        {"cutoff": cutoff.isoformat(), "last_at": last_at.isoformat(), "last_pk": last_pk},
+        CHECKPOINT_TIMEOUT,
+    )
+
+
+def _raw_delete(model, ids: List[int], db_alias: str, column: Optional[str] = None) -> int:
+    connection = connections[db_alias]
+    qn = connection.ops.quote_name
+    column = column or model._meta.pk.column
+    placeholders = ", ".join(["%s"] * len(ids))
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {qn(model._meta.db_table)} WHERE {qn(column)} IN ({placeholders})",
+            ids,
+        )
+        return cursor.rowcount
+
+
+def _delete_payloads(ids: List[int], db_alias: str, by_incidence: bool = False) -> None:
+    """
+    Deletes the payloads of the footprints `ids`, or with `by_incidence`,
+    of every footprint of the incidences `ids`, releasing their blobs and
+    dropping their search documents.
+    """
+
+    payloads = FootprintPayload.objects.filter(**{"footprint__incidence_id__in" if by_incidence else "pk__in": ids})
+    blobs.release_payloads(payloads, db_alias)
+    search.delete(ids, db_alias, by_incidence=by_incidence)
+
+    connection = connections[db_alias]
+    qn = connection.ops.quote_name
+    placeholders = ", ".join(["%s"] * len(ids))
+    if by_incidence:
+        placeholders = (
+            f"SELECT {qn(Footprint._meta.pk.column)} FROM {qn(Footprint._meta.db_table)} "
+            f"WHERE {qn(Footprint._meta.get_field('incidence').column)} IN ({placeholders})"
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {qn(FootprintPayload._meta.db_table)} "
+            f"WHERE {qn(FootprintPayload._meta.pk.column)} IN ({placeholders})",
+            ids,
+        )
+
+
+def delete_in_batches(tier: str, queryset, cutoff: datetime, db_alias: str,
+                      batch_size: Optional[int] = None, pause: Optional[float] = None,
+                      cutoff_field: str = "created_at", on_batch=None) -> int:
+    """
+    Deletes the rows of `queryset` older than `cutoff`, walking
+    (cutoff_field, pk) in order with one short transaction per batch.
+    Keyset paging means rows a tier keeps are skipped once, not rescanned
+    for every batch. `on_batch(ids)` runs inside the batch transaction
+    before the rows themselves are deleted, and may return the ids that
+    are still to be deleted.
+    """
+
+    batch_size = batch_size or insider_settings.CLEANUP_BATCH_SIZE
+    pause = insider_settings.CLEANUP_BATCH_PAUSE if pause is None else pause
+
+    cutoff, last_key = _load_checkpoint(tier, cutoff)
+    expired = queryset.using(db_alias).filter(**{f"{cutoff_field}__lt": cutoff}).order_by(cutoff_field, "pk")
+
+    deleted = 0
+    while True:
+        page = expired
+        if last_key is not None:
+            last_at, last_pk = last_key
+            page = page.filter(
+                Q(**{f"{cutoff_field}__gt": last_at}) | Q(**{cutoff_field: last_at, "pk__gt": last_pk})
+            )
+
+        rows = list(page.values_list(cutoff_field, "pk")[:batch_size])
+        if not rows:
+            break
+
+        ids = [pk for _, pk in rows]
+        with transaction.atomic(using=db_alias):
+            if on_batch is not None:
+                remaining = on_batch(ids)
+                ids = ids if remaining is None else remaining
+            if ids:
+                deleted += _raw_delete(queryset.model, ids, db_alias)
+
+        last_key = rows[-1]
+        _save_checkpoint(tier, cutoff, *last_key)
+
+        if len(rows) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    cache.delete(CHECKPOINT_KEY.format(tier=tier))
+    return deleted
+
+
+def footprint_tiers(now: Optional[datetime] = None) -> List[Tuple[str, QuerySet, datetime]]:
+    """
+    Returns (tier, footprints, cutoff) for each footprint retention tier.
+    """
+
+    now = now or timezone.now()
+    days = insider_settings.DATA_RETENTION_DAYS
+    error_days = error_retention_days()
+    footprints = Footprint.objects.all()
+
+    if error_days == days:
+        return [("footprints", footprints, now - timedelta(days=days))]
+
+    kept_longer = _kept_longer()
+    tiers = [("footprints", footprints.exclude(kept_longer), now - timedelta(days=days))]
+    if error_days > 0:
+        tiers.append(("footprints_errors", footprints.filter(kept_longer), now - timedelta(days=error_days)))
+    return tiers
+
+
+def cleanup_footprints(db_alias: str, now: Optional[datetime] = None, **options) -> int:
+    options.setdefault("on_batch", lambda ids: _delete_payloads(ids, db_alias))
+
+    return sum(
+        delete_in_batches(tier, footprints, cutoff, db_alias, **options)
+        for tier, footprints, cutoff in footprint_tiers(now)
+    )
+
+
+def delete_orphan_payloads(db_alias: str, batch_size: Optional[int] = None) -> int:
+    """
+    Removes payloads (and search documents) whose footprints went away
+    without the ORM, i.e. with a dropped partition. Those are always older
+    than the oldest footprint left, so this is a primary-key range delete.
+    """
+
+    oldest = Footprint.objects.using(db_alias).order_by("pk").values_list("pk", flat=True).first()
+    search.delete_before(oldest, db_alias)
+    orphans = FootprintPayload.objects.using(db_alias).order_by("pk")
+    if oldest is not None:
+        orphans = orphans.filter(pk__lt=oldest)
+
+    batch_size = batch_size or insider_settings.CLEANUP_BATCH_SIZE
+    deleted = 0
+    while True:
+        ids = list(orphans.values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        with transaction.atomic(using=db_alias):
+            blobs.release_payloads(FootprintPayload.objects.filter(pk__in=ids), db_alias)
+            deleted += _raw_delete(FootprintPayload, ids, db_alias)
+
+
+def cleanup_incidences(db_alias: str, now: Optional[datetime] = None, **options) -> int:
+    now = now or timezone.now()
+    days = insider_settings.INCIDENCE_RETENTION_DAYS
+    cutoff = now - timedelta(days=insider_settings.DATA_RETENTION_DAYS if days is None else days)
+
+    # Errors kept longer than their incidence keep it around until they expire too.
+    queryset = Incidence.objects.filter(status__in=("RESOLVED", "IGNORED")).exclude(
+        Exists(Footprint.objects.filter(_unexpired(now), incidence=OuterRef("pk")))
+    )
+
+    def delete_footprints(ids: Iterable[int]) -> List[int]:
+        # Checked again under lock: the incidence may have reopened or got footprints since.
+        ids = list(
+            queryset.using(db_alias).filter(pk__in=list(ids), last_seen__lt=cutoff)
+            .select_for_update().values_list("pk", flat=True)
+        )
+        if ids:
+            if insider_settings.ARCHIVE_DIR:
+                from insider.services import archive
+                archive.archive_footprints(Footprint.objects.filter(incidence_id__in=ids), db_alias)
+            status_counts.release(ids, db_alias)
+            _delete_payloads(ids, db_alias, by_incidence=True)
+            _raw_delete(Footprint, ids, db_alias, column=Footprint._meta.get_field("incidence").column)
+        return ids
+
+    deleted = delete_in_batches(
+        "incidences", queryset, cutoff, db_alias, cutoff_field="last_seen", on_batch=delete_footprints, **options
+    )
+    if deleted:
+        incidence_cache.clear()
+    return deleted
@@ -0,0 +1,499 @@
+"""
+insider.services.rollups
+------------------------
+
+Per-minute traffic rollups (see `FootprintRollup`), so the dashboard and
+trend queries read a few thousand pre-aggregated rows instead of every raw
+footprint in the window.
+
+- The ORM sink feeds stored footprints into a per-process buffer, flushed
+  as one additive upsert (`INSERT ... ON CONFLICT DO UPDATE SET count =
+  count + excluded.count`) at most every ROLLUP_FLUSH_INTERVAL seconds.
+  Bulk writes (collector, spool replay) are upserted right away.
+- `compact_rollups` (hourly task) folds minute rows older than
+  MINUTE_RETENTION into hour rows and hour rows older than HOUR_RETENTION
+  into day rows, moving counts so nothing is counted twice.
+- `rebuild_rollups` recomputes a range from raw footprints, e.g. after
+  upgrading with existing data (`manage.py insider_rollups --rebuild`);
+  migration 0017 already backfills the last MINUTE_RETENTION.
+- `expire_rollups` (daily cleanup task) drops rows past the longest
+  footprint retention tier.
+
+Each row also carries a latency sketch (insider.sketch). Sketches can't be
+added in SQL, so they are merged in Python right after the upsert, inside
+the same transaction that holds the row locks. `latency_percentiles` and
+`endpoint_latencies` merge the sketches of a window into p50/p95/p99, and
+`time_series` does the same per chart bucket.
+"""
+
+import os
+import logging
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import connections, transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from insider.models import Footprint, FootprintRollup
+from insider.sketch import QUANTILES, LatencySketch, dense_percentiles, merge_bytes
+from insider.settings import settings as insider_settings
+from insider.utils import normalize_route, series_window
+
+logger = logging.getLogger(__name__)
+
+RESOLUTIONS = ("minute", "hour", "day")
+MINUTE_RETENTION = timedelta(hours=48)
+HOUR_RETENTION = timedelta(days=14)
+
+KEY_FIELDS = ("resolution", "bucket", "route", "method", "status_class")
+ADDITIVE_FIELDS = ("count", "error_count", "latency_sum", "db_query_sum")
+
+# key (bucket, route, method, status_class) -> [count, errors, latency sum, min, max, db queries, sketch]
+Aggregates = Dict[Tuple[datetime, str, str, int], List[float]]
+
+
+def bucket_start(moment: datetime, resolution: str = "minute") -> datetime:
+    moment = moment.astimezone(dt_timezone.utc) if moment.tzinfo else moment.replace(tzinfo=dt_timezone.utc)
+    if resolution == "minute":
+        return moment.replace(second=0, microsecond=0)
+    if resolution == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if resolution == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unsupported rollup resolution: {resolution!r}")
+
+
+def _merge(aggregates: Aggregates, key, values: list) -> None:
+    row = aggregates.get(key)
+    if row is None:
+        aggregates[key] = values
+        return
+
+    row[0] += values[0]
+    row[1] += values[1]
+    row[2] += values[2]
+    row[3] = min(row[3], values[3])
+    row[4] = max(row[4], values[4])
+    row[5] += values[5]
+    row[6].merge(values[6])
+
+
+def _add(aggregates: Aggregates, created_at, path, method, status_code, response_time, db_query_count) -> None:
+    key = (
+        bucket_start(created_at or timezone.now()),
+        normalize_route(path)[:255],
+        (method or "")[:20],
+        int(status_code or 0) // 100,
+    )
+    latency = float(response_time or 0.0)
+    sketch = LatencySketch()
+    sketch.add(latency)
+    _merge(aggregates, key, [1, int((status_code or 0) >= 400), latency, latency, latency, db_query_count or 0, sketch])
+
+
+def aggregate_rows(rows: Iterable[tuple]) -> Aggregates:
+    """
+    Minute aggregates of (created_at, path, method, status_code,
+    response_time, db_query_count) rows.
+    """
+
+    aggregates: Aggregates = {}
+    for row in rows:
+        _add(aggregates, *row)
+    return aggregates
+
+
+def add_footprint(aggregates: Aggregates, footprint: Footprint) -> None:
+    _add(
+        aggregates, footprint.created_at, footprint.request_path, footprint.request_method,
+        footprint.status_code, footprint.response_time, footprint.db_query_count,
+    )
+
+
+def upsert_rollups(aggregates: Aggregates, db_alias: str, resolution: str = "minute") -> int:
+    """
+    Adds `aggregates` onto the stored rollup rows, creating missing ones.
+    Rows are written in key order so concurrent writers lock them in the
+    same order. Returns the number of rows upserted.
+    """
+
+    if not aggregates:
+        return 0
+
+    connection = connections[db_alias]
+    rows = sorted(aggregates.items())
+
+    if connection.vendor in ("postgresql", "sqlite", "mysql"):
+        fields = [FootprintRollup._meta.get_field(name) for name in KEY_FIELDS + ADDITIVE_FIELDS + ("latency_min", "latency_max")]
+        chunk = max(1, min(1000, connection.ops.bulk_batch_size(fields, rows)))
+
+        with transaction.atomic(using=db_alias):
+            for start in range(0, len(rows), chunk):
+                _upsert_sql(connection, rows[start:start + chunk], resolution)
+                _merge_sketches(db_alias, rows[start:start + chunk], resolution)
+    else:
+        with transaction.atomic(using=db_alias):
+            for key, values in rows:
+                _upsert_orm(db_alias, key, values, resolution)
+            _merge_sketches(db_alias, rows, resolution)
+
+    return len(rows)
+
+
+def _merge_sketches(db_alias: str, rows, resolution: str) -> None:
+    """
+    Folds the incoming sketches into the rows just upserted. Runs in the
+    upsert's transaction, which already holds the rows' locks.
+    """
+
+    incoming = {key: values[6] for key, values in rows if values[6] is not None}
+    if not incoming:
+        return
+
+    stored = (
+        FootprintRollup.objects.using(db_alias)
+        .select_for_update()
+        .filter(
+            resolution=resolution,
+            bucket__in={key[0] for key in incoming},
+            route__in={key[1] for key in incoming},
+        )
+        .values_list("pk", "bucket", "route", "method", "status_class", "latency_sketch")
+    )
+
+    updates = []
+    for pk, bucket, route, method, status_class, blob in stored:
+        sketch = incoming.get((bucket_start(bucket), route, method, status_class))
+        if sketch is None:
+            continue
+        if blob:
+            sketch = LatencySketch.from_bytes(blob).merge(sketch)
+        updates.append(FootprintRollup(pk=pk, latency_sketch=sketch.to_bytes()))
+
+    FootprintRollup.objects.using(db_alias).bulk_update(updates, ["latency_sketch"], batch_size=500)
+
+
+def _upsert_sql(connection, rows, resolution: str) -> None:
+    qn = connection.ops.quote_name
+    table = qn(FootprintRollup._meta.db_table)
+    columns = KEY_FIELDS + ("count", "error_count", "latency_sum", "latency_min", "latency_max", "db_query_sum")
+
+    params = []
+    for (bucket, route, method, status_class), (count, errors, lat_sum, lat_min, lat_max, queries, _) in rows:
+        params.extend([
+            resolution, connection.ops.adapt_datetimefield_value(bucket), route, method, status_class,
+            int(count), int(errors), lat_sum, lat_min, lat_max, int(queries),
+        ])
+
+    placeholders = ", ".join(["(" + ", ".join(["%s"] * len(columns)) + ")"] * len(rows))
+    insert = f"INSERT INTO {table} ({', '.join(qn(c) for c in columns)}) VALUES {placeholders}"
+
+    if connection.vendor == "mysql":
+        current = lambda c: qn(c)
+        incoming = lambda c: f"VALUES({qn(c)})"
+        least, greatest = "LEAST", "GREATEST"
+        conflict = "ON DUPLICATE KEY UPDATE"
+    else:
+        current = lambda c: f"{table}.{qn(c)}"
+        incoming = lambda c: f"EXCLUDED.{qn(c)}"
+        least, greatest = ("MIN", "MAX") if connection.vendor == "sqlite" else ("LEAST", "GREATEST")
+        conflict = f"ON CONFLICT ({', '.join(qn(c) for c in KEY_FIELDS)}) DO UPDATE SET"
+
+    updates = [f"{qn(c)} = {current(c)} + {incoming(c)}" for c in ADDITIVE_FIELDS]
+    updates.append(f"{qn('latency_min')} = {least}({current('latency_min')}, {incoming('latency_min')})")
+    updates.append(f"{qn('latency_max')} = {greatest}({current('latency_max')}, {incoming('latency_max')})")
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"{insert} {conflict} {', '.join(updates)}", params)
+
+
+def _upsert_orm(db_alias: str, key, values, resolution: str) -> None:
+    bucket, route, method, status_class = key
+    count, errors, lat_sum, lat_min, lat_max, queries, _ = values
+    lookup = dict(resolution=resolution, bucket=bucket, route=route, method=method, status_class=status_class)
+
+    row = FootprintRollup.objects.using(db_alias).select_for_update().filter(**lookup).first()
+    if row is None:
+        FootprintRollup.objects.using(db_alias).create(
+            count=count, error_count=errors, latency_sum=lat_sum,
+            latency_min=lat_min, latency_max=lat_max, db_query_sum=queries, **lookup
+        )
+        return
+
+    FootprintRollup.objects.using(db_alias).filter(pk=row.pk).update(
+        count=F("count") + count,
+        error_count=F("error_count") + errors,
+        latency_sum=F("latency_sum") + lat_sum,
+        latency_min=min(row.latency_min, lat_min),
+        latency_max=max(row.latency_max, lat_max),
+        db_query_sum=F("db_query_sum") + queries,
+    )
+
+
+class RollupBuffer:
+    """
+    Per-process accumulator for footprints written one at a time. The
+    first footprint after a flush arms a timer, so a quiet process still
+    flushes within `ROLLUP_FLUSH_INTERVAL` seconds. Celery workers flush on
+    shutdown (insider.tasks); otherwise at most one interval of counts is
+    lost when the process exits.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Aggregates] = {}
+        self._timer = None
+        self._pid = os.getpid()
+
+    def add(self, footprint: Footprint, db_alias: str) -> None:
+        interval = insider_settings.ROLLUP_FLUSH_INTERVAL
+        if not interval:
+            aggregates: Aggregates = {}
+            add_footprint(aggregates, footprint)
+            self._write(db_alias, aggregates)
+            return
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: the parent flushes what it buffered, and its timer didn't survive the fork.
+                self._pending, self._timer, self._pid = {}, None, os.getpid()
+
+            add_footprint(self._pending.setdefault(db_alias, {}), footprint)
+            if self._timer is None:
+                self._timer = threading.Timer(interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        for db_alias, aggregates in pending.items():
+            self._write(db_alias, aggregates)
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread got its own connections; don't leak them.
+            connections.close_all()
+
+    def _write(self, db_alias: str, aggregates: Aggregates) -> None:
+        try:
+            upsert_rollups(aggregates, db_alias)
+        except Exception as e:
+            logger.error(f"INSIDER: Failed to update rollups ({len(aggregates)} rows): {e}", exc_info=True)
+
+
+rollup_buffer = RollupBuffer()
+
+
+def record_footprint(footprint: Footprint, db_alias: str) -> None:
+    rollup_buffer.add(footprint, db_alias)
+
+
+def record_footprints(footprints: Iterable[Footprint], db_alias: str) -> None:
+    """
+    Rolls up a batch of stored footprints with one upsert.
+    """
+
+    aggregates: Aggregates = {}
+    for footprint in footprints:
+        add_footprint(aggregates, footprint)
+    rollup_buffer._write(db_alias, aggregates)
+
+
+def _compact(db_alias: str, source: str, target: str, before: datetime) -> int:
+    expired = FootprintRollup.objects.using(db_alias).filter(resolution=source, bucket__lt=before)
+
+    with transaction.atomic(using=db_alias):
+        aggregates: Aggregates = {}
+        rows = expired.select_for_update().values_list(
+            "bucket", "route", "method", "status_class", "count", "error_count",
+            "latency_sum", "latency_min", "latency_max", "db_query_sum", "latency_sketch",
+        )
+        for bucket, route, method, status_class, *values, blob in rows.iterator():
+            sketch = LatencySketch.from_bytes(blob) if blob else LatencySketch()
+            _merge(aggregates, (bucket_start(bucket, target), route, method, status_class), values + [sketch])
+
+        upsert_rollups(aggregates, db_alias, resolution=target)
+        expired.delete()
+
+    return len(aggregates)
+
+
+def compact_rollups(db_alias: str, now: Optional[datetime] = None) -> int:
+    """
+    Moves minute rows into hour rows and hour rows into day rows once they
+    are old enough. Returns the number of coarser rows written.
+    """
+
+    now = now or timezone.now()
+    written = _compact(db_alias, "minute", "hour", bucket_start(now - MINUTE_RETENTION, "hour"))
+    written += _compact(db_alias, "hour", "day", bucket_start(now - HOUR_RETENTION, "day"))
+    return written
+
+
+def expire_rollups(db_alias: str, before: datetime) -> int:
+    """
+    Deletes the rollups of days that ended before `before`.
+    """
+
+    deleted, _ = FootprintRollup.objects.using(db_alias).filter(bucket__lt=bucket_start(before, "day")).delete()
+    return deleted
+
+
+def rebuild_rollups(db_alias: str, since: datetime, now: Optional[datetime] = None) -> int:
+    """
+    Replaces every rollup from the start of `since`'s day onwards with
+    rollups recomputed from the raw footprints, then compacts them.
+    """
+
+    start = bucket_start(since, "day")
+
+    # Sketches need every latency, so this walks the raw rows once.
+    rows = (
+        Footprint.objects.using(db_alias)
+        .filter(created_at__gte=start)
+        .values_list("created_at", "request_path", "request_method", "status_code", "response_time", "db_query_count")
+    )
+
+    aggregates = aggregate_rows(rows.iterator(chunk_size=5000))
+
+    with transaction.atomic(using=db_alias):
+        FootprintRollup.objects.using(db_alias).filter(bucket__gte=start).delete()
+        upsert_rollups(aggregates, db_alias)
+
+    compact_rollups(db_alias, now=now)
+    return len(aggregates)
+
+
+def window_totals(since: datetime, db_alias: Optional[str] = None) -> Dict[str, float]:
+    """
+    Traffic totals from `since` (rounded down to its bucket) until now.
+    """
+
+    db_alias = db_alias or insider_settings.DB_ALIAS
+    totals = (
+        FootprintRollup.objects.using(db_alias)
+        .filter(bucket__gte=bucket_start(since))
+        .aggregate(
+            total=Sum("count"),
+            errors_500=Sum("count", filter=Q(status_class__gte=5)),
+            errors_400=Sum("count", filter=Q(status_class=4)),
+            latency_sum=Sum("latency_sum"),
+        )
+    )
+
+    total = totals["total"] or 0
+    return {
+        "total": total,
+        "errors_500": totals["errors_500"] or 0,
+        "errors_400": totals["errors_400"] or 0,
+        "avg_response_time": (totals["latency_sum"] or 0.0) / total if total else 0.0,
+    }
+
+
+def _percentiles(blobs, lowest, highest) -> Dict[str, Optional[float]]:
+    return dense_percentiles(merge_bytes(blobs), lowest, highest)
+
+
+def _window(since: datetime, until: Optional[datetime], db_alias: Optional[str], **filters):
+    rows = FootprintRollup.objects.using(db_alias or insider_settings.DB_ALIAS).filter(
+        bucket__gte=bucket_start(since), **filters
+    )
+    if until is not None:
+        rows = rows.filter(bucket__lt=until)
+    return rows
+
+
+def latency_percentiles(since: datetime, until: Optional[datetime] = None, db_alias: Optional[str] = None,
+                        **filters) -> Dict[str, Optional[float]]:
+    """
+    p50/p95/p99 response time (ms) over a window, optionally narrowed with
+    rollup field filters (route=..., method=...).
+    """
+
+    rows = _window(since, until, db_alias, **filters).values_list("latency_sketch", "latency_min", "latency_max")
+    blobs, lowest, highest = [], None, None
+    for blob, low, high in rows:
+        blobs.append(blob)
+        lowest = low if lowest is None else min(lowest, low)
+        highest = high if highest is None else max(highest, high)
+    return _percentiles(blobs, lowest, highest)
+
+
+def endpoint_latencies(since: datetime, until: Optional[datetime] = None, db_alias: Optional[str] = None,
+                       limit: int = 20) -> List[Dict]:
+    """
+    Per (route, method) request count and percentiles over a window,
+    slowest p95 first.
+    """
+
+    rows = _window(since, until, db_alias).values_list(
+        "route", "method", "count", "latency_min", "latency_max", "latency_sketch"
+    )
+    groups: Dict[Tuple[str, str], list] = {}
+    for route, method, count, low, high, blob in rows:
+        group = groups.setdefault((route, method), [0, low, high, []])
+        group[0] += count
+        group[1] = min(group[1], low)
+        group[2] = max(group[2], high)
+        group[3].append(blob)
+
+    endpoints = [
+        {"route": route, "method": method, "count": count, **_percentiles(blobs, low, high)}
+        for (route, method), (count, low, high, blobs) in groups.items()
+    ]
+    endpoints.sort(key=lambda e: e["p95"] or 0.0, reverse=True)
+    return endpoints[:limit]
+
+
+def time_series(since: datetime, until: Optional[datetime] = None, bucket_seconds: int = 3600,
+                db_alias: Optional[str] = None) -> Dict[str, list]:
+    """
+    Request, 4xx and 5xx counts, average and p50/p95/p99 response time per
+    `bucket_seconds` bucket (see insider.utils.series_window), as parallel
+    lists under "time" (bucket starts, epoch seconds). Rows compacted into
+    hours or days count in the bucket holding their start.
+    """
+
+    until = until or timezone.now()
+    start, size = series_window(since, until, bucket_seconds)
+    totals, errors_500, errors_400 = [0] * size, [0] * size, [0] * size
+    latency_sums = [0.0] * size
+    sketches = [[[], None, None] for _ in range(size)]
+
+    rows = _window(datetime.fromtimestamp(start, dt_timezone.utc), until, db_alias).values_list(
+        "bucket", "status_class", "count", "latency_sum", "latency_min", "latency_max", "latency_sketch"
+    )
+    for bucket, status_class, count, latency_sum, low, high, blob in rows.iterator():
+        n = (int(bucket.timestamp()) - start) // bucket_seconds
+        totals[n] += count
+        latency_sums[n] += latency_sum
+        if status_class >= 5:
+            errors_500[n] += count
+        elif status_class == 4:
+            errors_400[n] += count
+
+        group = sketches[n]
+        group[0].append(blob)
+        group[1] = low if group[1] is None else min(group[1], low)
+        group[2] = high if group[2] is None else max(group[2], high)
+
+    series = {
+        "time": list(range(start, start + size * bucket_seconds, bucket_seconds)),
+        "total": totals,
+        "errors_400": errors_400,
+        "errors_500": errors_500,
+        "avg_response_time_ms": [round(s / c, 2) if c else 0.0 for s, c in zip(latency_sums, totals)],
+    }
+    percentiles = [_percentiles(blobs, low, high) for blobs, low, high in sketches]
+    for name in QUANTILES:
+        series[f"{name}_response_time_ms"] = [p[name] for p in percentiles]
+    return series
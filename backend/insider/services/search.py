@@ -0,0 +1,220 @@
+"""
+insider.services.search
+-----------------------
+
+Full-text index behind the Forensics global search.
+
+Every footprint stored with an exception name or a payload gets one search
+document: the exception name and every string in its request/response
+body, system logs and stack trace (keys and frame fields included), cut at
+MAX_DOCUMENT_CHARS. Documents are written at ingestion, next to the payload
+rows, and deleted wherever payloads are.
+
+- PostgreSQL: `insider_footprintsearch (footprint_id, document tsvector)`
+  with a GIN index.
+- SQLite: an FTS5 table whose rowid is the footprint id.
+- Anything else (or SQLite built without FTS5) has no index; global search
+  then scans the payload columns as before, and so it does with
+  SEARCH_INDEX = False.
+
+A search matches the footprints containing every word of the query, each
+word as a prefix ("time" finds "timeout"), instead of any substring.
+Footprints stored before the index existed are indexed by migration 0018,
+or again with `manage.py insider_search --rebuild`.
+"""
+
+import re
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+from insider.settings import settings as insider_settings
+
+logger = logging.getLogger(__name__)
+
+TABLE = "insider_footprintsearch"
+MAX_DOCUMENT_CHARS = 32768
+PAYLOAD_FIELDS = ("request_body", "response_body", "system_logs", "stack_trace")
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_backends: Dict[str, Optional[str]] = {}
+
+
+def backend(db_alias: str) -> Optional[str]:
+    """
+    "postgresql", "sqlite" or None when `db_alias` has no search index.
+    """
+
+    if db_alias not in _backends:
+        connection = connections[db_alias]
+        supported = connection.vendor in ("postgresql", "sqlite")
+        _backends[db_alias] = (
+            connection.vendor if supported and TABLE in connection.introspection.table_names() else None
+        )
+    return _backends[db_alias]
+
+
+def forget_backend(sender, using=None, **kwargs):
+    """
+    post_migrate receiver: migration 0014 may just have created the index
+    (or a rollback dropped it), so look it up again on next use.
+    """
+
+    _backends.pop(using, None)
+
+
+def enabled(db_alias: str) -> bool:
+    return insider_settings.SEARCH_INDEX and backend(db_alias) is not None
+
+
+def _strings(value: Any) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield str(key)
+            yield from _strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+    elif value is not None:
+        yield str(value)
+
+
+def document(exception_name: Optional[str], values: Dict[str, Any]) -> str:
+    parts, size = [], 0
+    for text in _strings([exception_name, *(values.get(name) for name in PAYLOAD_FIELDS)]):
+        parts.append(text)
+        size += len(text) + 1
+        if size >= MAX_DOCUMENT_CHARS:
+            break
+    return " ".join(parts)[:MAX_DOCUMENT_CHARS]
+
+
+def index_footprints(rows: Iterable[Tuple[int, Optional[str], Dict[str, Any]]], db_alias: str) -> None:
+    """
+    Writes (or replaces) the documents of (footprint id, exception name,
+    payload values) rows.
+    """
+
+    if not enabled(db_alias):
+        return
+
+    params = [(pk, document(exception_name, values)) for pk, exception_name, values in rows]
+    params = [(pk, text) for pk, text in params if text]
+    if not params:
+        return
+
+    with connections[db_alias].cursor() as cursor:
+        if backend(db_alias) == "postgresql":
+            cursor.executemany(
+                f"INSERT INTO {TABLE} (footprint_id, document) VALUES (%s, to_tsvector('simple', %s)) "
+                f"ON CONFLICT (footprint_id) DO UPDATE SET document = EXCLUDED.document",
+                params,
+            )
+        else:
+            # FTS5 tables have no upsert.
+            cursor.executemany(f"DELETE FROM {TABLE} WHERE rowid = %s", [(pk,) for pk, _ in params])
+            cursor.executemany(f"INSERT INTO {TABLE} (rowid, document) VALUES (%s, %s)", params)
+
+
+def _key(db_alias: str) -> str:
+    return "footprint_id" if backend(db_alias) == "postgresql" else "rowid"
+
+
+def delete(ids: List[int], db_alias: str, by_incidence: bool = False) -> None:
+    """
+    Deletes the documents of the footprints `ids`, or with `by_incidence`,
+    of every footprint of the incidences `ids`.
+    """
+
+    if not ids or backend(db_alias) is None:
+        return
+
+    from insider.models import Footprint
+
+    connection = connections[db_alias]
+    qn = connection.ops.quote_name
+    placeholders = ", ".join(["%s"] * len(ids))
+    if by_incidence:
+        placeholders = (
+            f"SELECT {qn(Footprint._meta.pk.column)} FROM {qn(Footprint._meta.db_table)} "
+            f"WHERE {qn(Footprint._meta.get_field('incidence').column)} IN ({placeholders})"
+        )
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE {_key(db_alias)} IN ({placeholders})", list(ids))
+
+
+def delete_before(footprint_id: Optional[int], db_alias: str) -> None:
+    """
+    Deletes the documents of footprints older than `footprint_id` (all of
+    them when None), i.e. those of dropped partitions.
+    """
+
+    if backend(db_alias) is None:
+        return
+
+    with connections[db_alias].cursor() as cursor:
+        if footprint_id is None:
+            cursor.execute(f"DELETE FROM {TABLE}")
+        else:
+            cursor.execute(f"DELETE FROM {TABLE} WHERE {_key(db_alias)} < %s", [footprint_id])
+
+
+def matching(query: str, db_alias: str) -> Optional[RawSQL]:
+    """
+    A subquery of the ids of the footprints matching `query`, for
+    `id__in`, or None when the index can't answer it.
+    """
+
+    words = _WORD_RE.findall(query.lower())
+    if not words or not enabled(db_alias):
+        return None
+
+    if backend(db_alias) == "postgresql":
+        return RawSQL(
+            f"SELECT footprint_id FROM {TABLE} WHERE document @@ to_tsquery('simple', %s)",
+            [" & ".join(f"{word}:*" for word in words)],
+        )
+    return RawSQL(
+        f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s",
+        [" AND ".join(f'"{word}"*' for word in words)],
+    )
+
+
+def rebuild(db_alias: str, batch_size: int = 1000) -> int:
+    """
+    (Re)indexes every stored footprint. Returns how many got a document.
+    """
+
+    from insider.models import Footprint
+
+    if not enabled(db_alias):
+        return 0
+
+    footprints = Footprint.objects.using(db_alias).select_related(
+        "payload", *(f"payload__{name}_blob" for name in PAYLOAD_FIELDS)
+    ).order_by("pk")
+    indexed, last = 0, 0
+    while True:
+        batch = list(footprints.filter(pk__gt=last)[:batch_size])
+        if not batch:
+            return indexed
+
+        rows = [
+            (footprint.pk, footprint.exception_name, {name: getattr(footprint, name) for name in PAYLOAD_FIELDS})
+            for footprint in batch
+        ]
+        index_footprints(rows, db_alias)
+        indexed += sum(1 for _, exception_name, values in rows if document(exception_name, values))
+        last = batch[-1].pk
+
+
+def delete_footprint_document(sender, instance, using, **kwargs):
+    """
+    post_delete receiver for footprints deleted through the ORM.
+    """
+
+    delete([instance.pk], using)
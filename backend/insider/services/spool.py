@@ -0,0 +1,211 @@
+"""
+insider.services.spool
+----------------------
+
+Append-only local spool for footprints that could not reach the database.
+
+Records are written as frames into segment files inside SPOOL_DIR:
+
+    [4 bytes length][4 bytes crc32][insider.codec payload]
+
+Each process appends to its own segment (named after its pid) and rolls to a
+new one once SPOOL_SEGMENT_BYTES is reached, so writers never contend with
+each other and nothing is buffered in memory. The replay side
+(`manage.py insider_replay_spool`) keeps a `<segment>.offset` file next to
+each segment so an interrupted replay resumes where it stopped.
+"""
+
+import os
+import time
+import zlib
+import struct
+import logging
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from insider import codec
+from insider.settings import settings as insider_settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+FRAME_HEADER = struct.Struct(">II")
+SEGMENT_SUFFIX = ".spool"
+OFFSET_SUFFIX = ".offset"
+
+# Without flock we can't tell if a writer still holds a segment, so a fully
+# replayed segment is only removed once it has been idle this long.
+IDLE_SEGMENT_SECONDS = 60
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    payload = codec.encode(record)
+    return FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_payload(payload: bytes) -> Dict[str, Any]:
+    return codec.decode(payload)
+
+
+class Spool:
+    """
+    A directory of segment files. Safe to share between threads; every
+    process gets its own segment.
+    """
+
+    def __init__(self, directory: str, segment_bytes: Optional[int] = None):
+        self.directory = directory
+        self.segment_bytes = segment_bytes or insider_settings.SPOOL_SEGMENT_BYTES
+        self._lock = threading.Lock()
+        self._file = None
+        self._pid = None
+
+    # Writing
+
+    def append(self, record: Dict[str, Any]) -> None:
+        frame = encode_record(record)
+
+        with self._lock:
+            handle = self._writable_segment()
+            handle.write(frame)
+            handle.flush()
+
+            if handle.tell() >= self.segment_bytes:
+                self._close_segment()
+
+    def _writable_segment(self):
+        # A forked child must not share its parent's segment.
+        if self._file is not None and self._pid == os.getpid():
+            return self._file
+
+        self._file = None
+        os.makedirs(self.directory, exist_ok=True)
+
+        name = f"{time.time_ns():020d}-{os.getpid()}{SEGMENT_SUFFIX}"
+        handle = open(os.path.join(self.directory, name), "ab")
+
+        if fcntl is not None:
+            # Held for as long as we write, so the replayer knows the segment is live.
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        self._file = handle
+        self._pid = os.getpid()
+        return handle
+
+    def _close_segment(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            finally:
+                self._file = None
+
+    def close(self):
+        with self._lock:
+            self._close_segment()
+
+    # Reading
+
+    def segments(self) -> List[str]:
+        """
+        Segment paths, oldest first.
+        """
+
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+
+        return [
+            os.path.join(self.directory, name)
+            for name in sorted(names)
+            if name.endswith(SEGMENT_SUFFIX)
+        ]
+
+    def read(self, segment: str, offset: int = 0) -> Iterator[Tuple[Dict[str, Any], int]]:
+        """
+        Yields (record, offset_after_record) from `offset` onwards.
+        Stops quietly at a torn or corrupt frame; the tail is retried next time.
+        """
+
+        with open(segment, "rb") as handle:
+            handle.seek(offset)
+
+            while True:
+                header = handle.read(FRAME_HEADER.size)
+                if len(header) < FRAME_HEADER.size:
+                    return
+
+                length, checksum = FRAME_HEADER.unpack(header)
+                payload = handle.read(length)
+
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    logger.warning(f"INSIDER: Stopping at incomplete spool frame in {segment} (offset {offset}).")
+                    return
+
+                offset = handle.tell()
+                yield decode_payload(payload), offset
+
+    def get_offset(self, segment: str) -> int:
+        try:
+            with open(segment + OFFSET_SUFFIX, "r") as handle:
+                return int(handle.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def commit_offset(self, segment: str, offset: int) -> None:
+        tmp_path = segment + OFFSET_SUFFIX + ".tmp"
+        with open(tmp_path, "w") as handle:
+            handle.write(str(offset))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, segment + OFFSET_SUFFIX)
+
+    def is_active(self, segment: str) -> bool:
+        """
+        True if a writer may still append to this segment.
+        """
+
+        if self._file is not None and os.path.abspath(self._file.name) == os.path.abspath(segment):
+            return True
+
+        if fcntl is None:
+            return time.time() - os.path.getmtime(segment) < IDLE_SEGMENT_SECONDS
+
+        with open(segment, "rb") as handle:
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except OSError:
+                return True
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        return False
+
+    def remove(self, segment: str) -> None:
+        for path in (segment, segment + OFFSET_SUFFIX):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+_spools: Dict[str, Spool] = {}
+_spools_lock = threading.Lock()
+
+
+def get_spool() -> Optional[Spool]:
+    """
+    Returns the process-wide Spool for SPOOL_DIR, or None when spooling is disabled.
+    """
+
+    directory = insider_settings.SPOOL_DIR
+    if not directory:
+        return None
+
+    with _spools_lock:
+        spool = _spools.get(directory)
+        if spool is None:
+            spool = _spools[directory] = Spool(directory)
+        return spool
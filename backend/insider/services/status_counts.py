@@ -0,0 +1,106 @@
+"""
+insider.services.status_counts
+------------------------------
+
+Incidence counts per status, kept in `IncidenceStatusCount` so the
+incidence tabs, their totals and the API's data versions never count the
+incidence table. Every path changing them adjusts the counters in the
+same transaction:
+
+- creations and ORM deletes, through post_save/post_delete receivers;
+- status changes (reopening at ingestion, bulk resolve/ignore) through
+  `move`, as they are single UPDATEs;
+- retention batches through `release`, as they delete rows directly.
+
+`rebuild` recounts them from the table; the daily cleanup does, correcting
+any drift.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from insider.models import Incidence, IncidenceStatusCount
+
+
+def counts(db_alias: str) -> Dict[str, int]:
+    """
+    {status: count} for every status, zeros included.
+    """
+
+    result = {status: 0 for status, _ in Incidence.STATUS_CHOICES}
+    result.update(IncidenceStatusCount.objects.using(db_alias).values_list("status", "count"))
+    return result
+
+
+def adjust(changes: Dict[str, int], db_alias: str) -> None:
+    manager = IncidenceStatusCount.objects.using(db_alias)
+    for status, delta in changes.items():
+        if not delta or manager.filter(pk=status).update(count=F("count") + delta):
+            continue
+
+        try:
+            with transaction.atomic(using=db_alias):
+                manager.create(status=status, count=delta)
+        except IntegrityError:
+            # Created by a concurrent writer in the meantime.
+            manager.filter(pk=status).update(count=F("count") + delta)
+
+
+def move(incidences, status: str, db_alias: str) -> int:
+    """
+    Sets `status` on an Incidence queryset, moving the counts of the rows
+    that had another one. Returns how many rows matched.
+    """
+
+    with transaction.atomic(using=db_alias):
+        # Locked, so concurrent moves of the same rows count them once.
+        previous = Counter(
+            incidences.using(db_alias).select_for_update().exclude(status=status).values_list("status", flat=True)
+        )
+        matched = incidences.using(db_alias).update(status=status)
+
+        moved = sum(previous.values())
+        if moved:
+            adjust({**{old: -n for old, n in previous.items()}, status: moved}, db_alias)
+    return matched
+
+
+def release(ids: Iterable[int], db_alias: str) -> None:
+    """
+    Takes incidences about to be deleted (by id) out of the counters.
+    """
+
+    rows = Incidence.objects.using(db_alias).filter(pk__in=list(ids)).order_by().values_list("status").annotate(
+        n=Count("id")
+    )
+    adjust({status: -n for status, n in rows}, db_alias)
+
+
+def rebuild(db_alias: str) -> Dict[str, int]:
+    rows = dict(Incidence.objects.using(db_alias).order_by().values_list("status").annotate(n=Count("id")))
+    with transaction.atomic(using=db_alias):
+        IncidenceStatusCount.objects.using(db_alias).all().delete()
+        IncidenceStatusCount.objects.using(db_alias).bulk_create(
+            [IncidenceStatusCount(status=status, count=n) for status, n in rows.items()]
+        )
+    return counts(db_alias)
+
+
+def count_created(sender, instance, created, using, **kwargs):
+    """
+    post_save receiver for incidences.
+    """
+
+    if created:
+        adjust({instance.status: 1}, using)
+
+
+def count_deleted(sender, instance, using, **kwargs):
+    """
+    post_delete receiver for incidences deleted through the ORM.
+    """
+
+    adjust({instance.status: -1}, using)
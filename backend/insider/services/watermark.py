@@ -0,0 +1,101 @@
+"""
+insider.services.watermark
+--------------------------
+
+Data-version watermarks: counters in the Django cache, one per scope.
+"data" moves whenever incidences change status, "settings" whenever a
+setting or an integration is saved. Responses cached under a key carrying
+a watermark (and the API's ETags) are shared by every request until the
+data changes, then recomputed once. In-process listeners (the live tail,
+insider.api.live) are called on every bump, and on every ingested batch.
+
+Ingestion doesn't move the watermark: with a steady stream of footprints
+every request would miss. `cached` keys are quantized by time instead, so
+a response is recomputed at most once per DASHBOARD_CACHE_SECONDS however
+many dashboards are open, and is at most that old.
+"""
+
+import time
+import logging
+from typing import Any, Callable, Iterable, List, Optional
+
+from django.core.cache import cache
+
+from insider.settings import settings as insider_settings
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_KEY = "insider:watermark:{scope}"
+
+_listeners: List[Callable[[str], None]] = []
+
+
+def current(scope: str = "data") -> int:
+    return cache.get(WATERMARK_KEY.format(scope=scope), 0)
+
+
+def bump(scope: str = "data") -> None:
+    """
+    Moves a watermark. Never raises: a cache outage must not fail ingestion.
+    """
+
+    key = WATERMARK_KEY.format(scope=scope)
+    try:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr().
+        cache.set(key, 1, timeout=None)
+    except Exception as e:
+        logger.warning(f"INSIDER: Could not move the {scope} watermark: {e}")
+
+    notify(scope)
+
+
+def notify(scope: str = "data") -> None:
+    """
+    Calls the in-process listeners without moving the shared watermark.
+    """
+
+    for listener in _listeners:
+        try:
+            listener(scope)
+        except Exception as e:
+            logger.warning(f"INSIDER: Watermark listener {listener} failed: {e}")
+
+
+def listen(callback: Callable[[str], None]) -> None:
+    """
+    Calls `callback(scope)` whenever this process moves a watermark.
+    """
+
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+
+def bump_settings(sender, **kwargs):
+    """
+    post_save/post_delete receiver for settings and integrations.
+    """
+
+    bump("settings")
+
+
+def cached(name: str, parts: Iterable[Any], compute: Callable[[], Any], timeout: Optional[int] = None) -> Any:
+    """
+    Returns compute(), memoized under `name`, `parts`, the current
+    watermark and the current `timeout`-second slot (DASHBOARD_CACHE_SECONDS
+    by default).
+    """
+
+    timeout = insider_settings.DASHBOARD_CACHE_SECONDS if timeout is None else timeout
+    if not timeout:
+        return compute()
+
+    slot = int(time.time() // timeout)
+    key = ":".join(["insider", name, str(current()), str(slot), *map(str, parts)])
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout=timeout)
+    return value
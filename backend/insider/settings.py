@@ -49,6 +49,29 @@ DEFAULTS: Dict[str, Any] = {
     "CAPTURE_METHODS": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"],
     "COOLDOWN_HOURS": 24,
     "DATA_RETENTION_DAYS": 30,
+    "INCIDENCE_CACHE_SIZE": 1024,  # fingerprints cached per ingestion process, 0 disables
+    "INCIDENCE_CACHE_TTL": 300,  # seconds
+    "SPOOL_DIR": None,  # local directory for footprints that could not be saved, None disables
+    "SPOOL_SEGMENT_BYTES": 64 * 1024 * 1024,
+    "COLLECTOR_SOCKET": None,  # unix socket of `manage.py insider_collector`, None disables
+    "SINKS": [{"type": "orm"}],  # see insider.sinks
+    "PARTITION_INTERVAL": None,  # "day" or "week" to range-partition footprints (PostgreSQL)
+    "PARTITION_PREMAKE": 7,  # partitions created ahead of time
+    "ERROR_RETENTION_DAYS": None,  # errors and slow requests, None = DATA_RETENTION_DAYS
+    "INCIDENCE_RETENTION_DAYS": None,  # days resolved/ignored incidences stay after last_seen, None = DATA_RETENTION_DAYS
+    "CLEANUP_BATCH_SIZE": 5000,
+    "CLEANUP_BATCH_PAUSE": 0.05,  # seconds between cleanup batches
+    "ROLLUP_FLUSH_INTERVAL": 5,  # seconds rollup counts are buffered per process, 0 writes immediately
+    "EXACT_USERS_AFFECTED": False,  # count distinct users with a footprint join instead of HyperLogLog
+    "ARCHIVE_DIR": None,  # directory expiring footprints are archived to before cleanup, None disables
+    "METRICS_DIR": None,  # directory of the memory-mapped metrics store (needs numpy), None disables
+    "METRICS_SEGMENT_ROWS": 1024 * 1024,  # rows per metrics store segment
+    "DASHBOARD_BACKEND": "rollups",  # "rollups" or "metrics" (the metrics store)
+    "PAYLOAD_DEDUP_MIN_BYTES": 256,  # payload values this large are stored once per content, None disables
+    "DASHBOARD_CACHE_SECONDS": 30,  # how long a dashboard response is shared between requests, 0 disables
+    "SEARCH_INDEX": True,  # maintain the full-text index for global search at ingestion
+    "LIVE_POLL_INTERVAL": 2.0,  # seconds between live tail checks for footprints written by other processes
+    "LIVE_QUEUE_SIZE": 500,  # events buffered per live tail connection before the oldest are dropped
 }
 
 
@@ -71,6 +94,29 @@ class InsiderSettings:
     CAPTURE_METHODS: List[str] = field(default_factory=lambda: DEFAULTS["CAPTURE_METHODS"][:])
     COOLDOWN_HOURS: int = DEFAULTS["COOLDOWN_HOURS"]
     DATA_RETENTION_DAYS: int = DEFAULTS["DATA_RETENTION_DAYS"]
+    INCIDENCE_CACHE_SIZE: int = DEFAULTS["INCIDENCE_CACHE_SIZE"]
+    INCIDENCE_CACHE_TTL: int = DEFAULTS["INCIDENCE_CACHE_TTL"]
+    SPOOL_DIR: Optional[str] = DEFAULTS["SPOOL_DIR"]
+    SPOOL_SEGMENT_BYTES: int = DEFAULTS["SPOOL_SEGMENT_BYTES"]
+    COLLECTOR_SOCKET: Optional[str] = DEFAULTS["COLLECTOR_SOCKET"]
+    SINKS: List[Dict[str, Any]] = field(default_factory=lambda: [dict(s) for s in DEFAULTS["SINKS"]])
+    PARTITION_INTERVAL: Optional[str] = DEFAULTS["PARTITION_INTERVAL"]
+    PARTITION_PREMAKE: int = DEFAULTS["PARTITION_PREMAKE"]
+    ERROR_RETENTION_DAYS: Optional[int] = DEFAULTS["ERROR_RETENTION_DAYS"]
+    INCIDENCE_RETENTION_DAYS: Optional[int] = DEFAULTS["INCIDENCE_RETENTION_DAYS"]
+    CLEANUP_BATCH_SIZE: int = DEFAULTS["CLEANUP_BATCH_SIZE"]
+    CLEANUP_BATCH_PAUSE: float = DEFAULTS["CLEANUP_BATCH_PAUSE"]
+    ROLLUP_FLUSH_INTERVAL: float = DEFAULTS["ROLLUP_FLUSH_INTERVAL"]
+    EXACT_USERS_AFFECTED: bool = DEFAULTS["EXACT_USERS_AFFECTED"]
+    ARCHIVE_DIR: Optional[str] = DEFAULTS["ARCHIVE_DIR"]
+    METRICS_DIR: Optional[str] = DEFAULTS["METRICS_DIR"]
+    METRICS_SEGMENT_ROWS: int = DEFAULTS["METRICS_SEGMENT_ROWS"]
+    DASHBOARD_BACKEND: str = DEFAULTS["DASHBOARD_BACKEND"]
+    PAYLOAD_DEDUP_MIN_BYTES: Optional[int] = DEFAULTS["PAYLOAD_DEDUP_MIN_BYTES"]
+    DASHBOARD_CACHE_SECONDS: int = DEFAULTS["DASHBOARD_CACHE_SECONDS"]
+    SEARCH_INDEX: bool = DEFAULTS["SEARCH_INDEX"]
+    LIVE_POLL_INTERVAL: float = DEFAULTS["LIVE_POLL_INTERVAL"]
+    LIVE_QUEUE_SIZE: int = DEFAULTS["LIVE_QUEUE_SIZE"]
 
     # Additional raw dict copy for introspection if needed
     _raw: Dict[str, Any] = field(default_factory=dict, repr=False)
@@ -186,7 +232,7 @@ def _validate_and_normalize(raw: Dict[str, Any]) -> Dict[str, Any]:
     # Booleans
     for key in (
         "IGNORE_ADMIN", "CAPTURE_RESPONSE", "CAPTURE_REQUEST_BODY", 
-        "CAPTURE_USER", "CAPTURE_IP", "CAPTURE_USER_AGENT"
+        "CAPTURE_USER", "CAPTURE_IP", "CAPTURE_USER_AGENT", "EXACT_USERS_AFFECTED", "SEARCH_INDEX"
     ):
         val = raw.get(key, DEFAULTS[key])
         cleaned[key] = bool(val)
@@ -274,6 +320,199 @@ def _validate_and_normalize(raw: Dict[str, Any]) -> Dict[str, Any]:
     cleaned["DATA_RETENTION_DAYS"] = int(drd) if drd is not None else 30
 
 
+    # INCIDENCE_CACHE_SIZE / INCIDENCE_CACHE_TTL: non-negative ints
+    for key in ("INCIDENCE_CACHE_SIZE", "INCIDENCE_CACHE_TTL"):
+        val = raw.get(key, DEFAULTS[key])
+        try:
+            val_i = int(val) if val is not None else 0
+        except Exception:
+            raise TypeError(f"INSIDER['{key}'] must be an integer.")
+        if val_i < 0:
+            raise ValueError(f"INSIDER['{key}'] must be >= 0.")
+        cleaned[key] = val_i
+
+
+    # SPOOL_DIR: None or path
+    spool_dir = raw.get("SPOOL_DIR", DEFAULTS["SPOOL_DIR"])
+    cleaned["SPOOL_DIR"] = str(spool_dir) if spool_dir else None
+
+
+    # ARCHIVE_DIR: None or path
+    archive_dir = raw.get("ARCHIVE_DIR", DEFAULTS["ARCHIVE_DIR"])
+    cleaned["ARCHIVE_DIR"] = str(archive_dir) if archive_dir else None
+
+
+    # METRICS_DIR: None or path
+    metrics_dir = raw.get("METRICS_DIR", DEFAULTS["METRICS_DIR"])
+    cleaned["METRICS_DIR"] = str(metrics_dir) if metrics_dir else None
+
+
+    # METRICS_SEGMENT_ROWS: positive int
+    msr = raw.get("METRICS_SEGMENT_ROWS", DEFAULTS["METRICS_SEGMENT_ROWS"])
+    try:
+        msr_i = int(msr)
+    except Exception:
+        raise TypeError("INSIDER['METRICS_SEGMENT_ROWS'] must be an integer.")
+    if msr_i < 1:
+        raise ValueError("INSIDER['METRICS_SEGMENT_ROWS'] must be >= 1.")
+    cleaned["METRICS_SEGMENT_ROWS"] = msr_i
+
+
+    # DASHBOARD_BACKEND: "rollups" or "metrics"
+    backend = str(raw.get("DASHBOARD_BACKEND", DEFAULTS["DASHBOARD_BACKEND"]) or DEFAULTS["DASHBOARD_BACKEND"]).lower()
+    if backend not in ("rollups", "metrics"):
+        raise ValueError("INSIDER['DASHBOARD_BACKEND'] must be 'rollups' or 'metrics'.")
+    cleaned["DASHBOARD_BACKEND"] = backend
+
+
+    # PAYLOAD_DEDUP_MIN_BYTES: None or non-negative int
+    pdmb = raw.get("PAYLOAD_DEDUP_MIN_BYTES", DEFAULTS["PAYLOAD_DEDUP_MIN_BYTES"])
+    if pdmb is None:
+        cleaned["PAYLOAD_DEDUP_MIN_BYTES"] = None
+    else:
+        try:
+            pdmb_i = int(pdmb)
+        except Exception:
+            raise TypeError("INSIDER['PAYLOAD_DEDUP_MIN_BYTES'] must be an integer or None.")
+        if pdmb_i < 0:
+            raise ValueError("INSIDER['PAYLOAD_DEDUP_MIN_BYTES'] must be >= 0 or None.")
+        cleaned["PAYLOAD_DEDUP_MIN_BYTES"] = pdmb_i
+
+
+    # DASHBOARD_CACHE_SECONDS: non-negative int
+    dcs = raw.get("DASHBOARD_CACHE_SECONDS", DEFAULTS["DASHBOARD_CACHE_SECONDS"])
+    try:
+        dcs_i = int(dcs)
+    except Exception:
+        raise TypeError("INSIDER['DASHBOARD_CACHE_SECONDS'] must be an integer.")
+    if dcs_i < 0:
+        raise ValueError("INSIDER['DASHBOARD_CACHE_SECONDS'] must be >= 0.")
+    cleaned["DASHBOARD_CACHE_SECONDS"] = dcs_i
+
+
+    # LIVE_POLL_INTERVAL: positive number
+    lpi = raw.get("LIVE_POLL_INTERVAL", DEFAULTS["LIVE_POLL_INTERVAL"])
+    try:
+        lpi_f = float(lpi)
+    except Exception:
+        raise TypeError("INSIDER['LIVE_POLL_INTERVAL'] must be a number.")
+    if lpi_f <= 0:
+        raise ValueError("INSIDER['LIVE_POLL_INTERVAL'] must be > 0.")
+    cleaned["LIVE_POLL_INTERVAL"] = lpi_f
+
+
+    # LIVE_QUEUE_SIZE: positive int
+    lqs = raw.get("LIVE_QUEUE_SIZE", DEFAULTS["LIVE_QUEUE_SIZE"])
+    try:
+        lqs_i = int(lqs)
+    except Exception:
+        raise TypeError("INSIDER['LIVE_QUEUE_SIZE'] must be an integer.")
+    if lqs_i < 1:
+        raise ValueError("INSIDER['LIVE_QUEUE_SIZE'] must be >= 1.")
+    cleaned["LIVE_QUEUE_SIZE"] = lqs_i
+
+
+    # SPOOL_SEGMENT_BYTES: positive int
+    ssb = raw.get("SPOOL_SEGMENT_BYTES", DEFAULTS["SPOOL_SEGMENT_BYTES"])
+    try:
+        ssb_i = int(ssb)
+    except Exception:
+        raise TypeError("INSIDER['SPOOL_SEGMENT_BYTES'] must be an integer.")
+    if ssb_i < 1:
+        raise ValueError("INSIDER['SPOOL_SEGMENT_BYTES'] must be >= 1.")
+    cleaned["SPOOL_SEGMENT_BYTES"] = ssb_i
+
+
+    # COLLECTOR_SOCKET: None or path
+    collector_socket = raw.get("COLLECTOR_SOCKET", DEFAULTS["COLLECTOR_SOCKET"])
+    cleaned["COLLECTOR_SOCKET"] = str(collector_socket) if collector_socket else None
+
+
+    # SINKS: list of sink names or {"type": ..., **options} dicts
+    sinks = raw.get("SINKS", DEFAULTS["SINKS"])
+    if sinks is None:
+        sinks = DEFAULTS["SINKS"]
+    if not isinstance(sinks, (list, tuple)):
+        raise TypeError("INSIDER['SINKS'] must be a list of sink names or dicts.")
+
+    cleaned_sinks = []
+    for sink in sinks:
+        if isinstance(sink, str):
+            sink = {"type": sink}
+        if not isinstance(sink, dict) or not sink.get("type"):
+            raise TypeError("Every item in INSIDER['SINKS'] must be a sink name or a dict with a 'type'.")
+        cleaned_sinks.append(dict(sink))
+    cleaned["SINKS"] = cleaned_sinks
+
+
+    # PARTITION_INTERVAL: None, "day" or "week"
+    interval = raw.get("PARTITION_INTERVAL", DEFAULTS["PARTITION_INTERVAL"])
+    if interval:
+        interval = str(interval).lower()
+        if interval not in ("day", "week"):
+            raise ValueError("INSIDER['PARTITION_INTERVAL'] must be 'day', 'week' or None.")
+    cleaned["PARTITION_INTERVAL"] = interval or None
+
+
+    # PARTITION_PREMAKE: non-negative int
+    premake = raw.get("PARTITION_PREMAKE", DEFAULTS["PARTITION_PREMAKE"])
+    try:
+        premake_i = int(premake)
+    except Exception:
+        raise TypeError("INSIDER['PARTITION_PREMAKE'] must be an integer.")
+    if premake_i < 0:
+        raise ValueError("INSIDER['PARTITION_PREMAKE'] must be >= 0.")
+    cleaned["PARTITION_PREMAKE"] = premake_i
+
+
+    # ERROR_RETENTION_DAYS / INCIDENCE_RETENTION_DAYS: None or non-negative int
+    for key in ("ERROR_RETENTION_DAYS", "INCIDENCE_RETENTION_DAYS"):
+        val = raw.get(key, DEFAULTS[key])
+        if val is None:
+            cleaned[key] = None
+            continue
+        try:
+            val_i = int(val)
+        except Exception:
+            raise TypeError(f"INSIDER['{key}'] must be an integer (days) or None.")
+        if val_i < 0:
+            raise ValueError(f"INSIDER['{key}'] must be >= 0 or None.")
+        cleaned[key] = val_i
+
+
+    # CLEANUP_BATCH_SIZE: positive int
+    cbs = raw.get("CLEANUP_BATCH_SIZE", DEFAULTS["CLEANUP_BATCH_SIZE"])
+    try:
+        cbs_i = int(cbs)
+    except Exception:
+        raise TypeError("INSIDER['CLEANUP_BATCH_SIZE'] must be an integer.")
+    if cbs_i < 1:
+        raise ValueError("INSIDER['CLEANUP_BATCH_SIZE'] must be >= 1.")
+    cleaned["CLEANUP_BATCH_SIZE"] = cbs_i
+
+
+    # CLEANUP_BATCH_PAUSE: non-negative seconds
+    cbp = raw.get("CLEANUP_BATCH_PAUSE", DEFAULTS["CLEANUP_BATCH_PAUSE"])
+    try:
+        cbp_f = float(cbp or 0)
+    except Exception:
+        raise TypeError("INSIDER['CLEANUP_BATCH_PAUSE'] must be a number of seconds.")
+    if cbp_f < 0:
+        raise ValueError("INSIDER['CLEANUP_BATCH_PAUSE'] must be >= 0.")
+    cleaned["CLEANUP_BATCH_PAUSE"] = cbp_f
+
+
+    # ROLLUP_FLUSH_INTERVAL: non-negative seconds
+    rfi = raw.get("ROLLUP_FLUSH_INTERVAL", DEFAULTS["ROLLUP_FLUSH_INTERVAL"])
+    try:
+        rfi_f = float(rfi or 0)
+    except Exception:
+        raise TypeError("INSIDER['ROLLUP_FLUSH_INTERVAL'] must be a number of seconds.")
+    if rfi_f < 0:
+        raise ValueError("INSIDER['ROLLUP_FLUSH_INTERVAL'] must be >= 0.")
+    cleaned["ROLLUP_FLUSH_INTERVAL"] = rfi_f
+
+
     # store full raw data for debugging.
     cleaned["_raw"] = raw.copy()
 
@@ -0,0 +1,70 @@
+"""
+Footprint sinks: where footprints go once they reach the ingestion side.
+
+Configured through INSIDER['SINKS'], e.g. keep healthy traffic in cheap
+NDJSON files and only store errors (and their incidences) in the database:
+
+    INSIDER = {
+        "SINKS": [
+            {"type": "orm", "min_status": 400},
+            {"type": "ndjson", "path": "/var/log/insider/footprints-{pid}.ndjson"},
+        ]
+    }
+
+`type` is a key of SINK_REGISTRY or the dotted path of a BaseSink subclass.
+"""
+
+import json
+import logging
+import threading
+from typing import List
+
+from django.utils.module_loading import import_string
+
+from insider.settings import settings as insider_settings
+from .base import BaseSink
+
+logger = logging.getLogger(__name__)
+
+
+SINK_REGISTRY = {
+    "orm": "insider.sinks.orm.ORMSink",
+    "ndjson": "insider.sinks.ndjson.NDJSONFileSink",
+    "stdout": "insider.sinks.ndjson.StdoutSink",
+    "metrics": "insider.sinks.metrics.MetricsSink",
+}
+
+_cache = {"key": None, "sinks": []}
+_cache_lock = threading.Lock()
+
+
+def build_sink(config) -> BaseSink:
+    options = dict(config)
+    sink_type = options.pop("type")
+    SinkClass = import_string(SINK_REGISTRY.get(sink_type, sink_type))
+    return SinkClass(**options)
+
+
+def get_sinks() -> List[BaseSink]:
+    """
+    Returns the configured sinks, built once per configuration.
+    """
+
+    configs = insider_settings.SINKS
+    key = json.dumps(configs, sort_keys=True, default=str)
+
+    with _cache_lock:
+        if _cache["key"] != key:
+            sinks = []
+            for config in configs:
+                try:
+                    sinks.append(build_sink(config))
+                except Exception as e:
+                    logger.error(f"INSIDER: Could not build sink {config!r}: {e}")
+
+            _cache["key"], _cache["sinks"] = key, sinks
+
+        return _cache["sinks"]
+
+
+__all__ = ["BaseSink", "SINK_REGISTRY", "build_sink", "get_sinks"]
@@ -0,0 +1,65 @@
+import logging
+from typing import Any, Dict, List, Optional
+from django.db.utils import InterfaceError, OperationalError
+
+logger = logging.getLogger(__name__)
+
+
+class BaseSink:
+    """
+    Base class for all footprint sinks.
+
+    A sink receives the footprint dicts produced by the middleware (still
+    carrying the `__db_alias` key) once they reach the ingestion side of
+    `dispatch_save_footprint`. Several sinks can be configured at once; each
+    one only sees the footprints its status range accepts.
+    """
+
+    identifier = None
+
+    def __init__(self, min_status: Optional[int] = None, max_status: Optional[int] = None, **options):
+        self.min_status = min_status
+        self.max_status = max_status
+        self.options = options
+
+    def accepts(self, footprint_data: Dict[str, Any]) -> bool:
+        status = footprint_data.get("status_code", 200)
+
+        if self.min_status is not None and status < self.min_status:
+            return False
+        if self.max_status is not None and status > self.max_status:
+            return False
+        return True
+
+    def write(self, footprint_data: Dict[str, Any]) -> None:
+        """
+        Stores one footprint. Must not modify `footprint_data`.
+        """
+        raise NotImplementedError("Subclasses must implement write()")
+
+    def write_batch(self, batch: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        """
+        Stores several footprints. Override when the backend has a cheaper bulk path.
+        Returns the number of footprints written. A footprint that fails is
+        logged and skipped, so the caller never has to resend the ones written.
+        """
+
+        written = 0
+        for footprint_data in batch:
+            try:
+                self.write(footprint_data)
+            except (OperationalError, InterfaceError):
+                raise
+            except Exception as e:
+                logger.error(f"INSIDER: {self} sink skipped footprint {footprint_data.get('request_id')}: {e}")
+            else:
+                written += 1
+        return written
+
+    def flush(self) -> None:
+        """
+        Pushes out anything the sink is buffering.
+        """
+
+    def __str__(self):
+        return self.identifier or type(self).__name__
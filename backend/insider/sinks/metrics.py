@@ -0,0 +1,29 @@
+from typing import Any, Dict, List, Optional
+from insider.services.metrics_store import get_store
+from .base import BaseSink
+
+
+class MetricsSink(BaseSink):
+    """
+    Appends the numeric fields of each footprint (time, route, status,
+    latency, query count) to the memory-mapped metrics store
+    (insider.services.metrics_store). Requires numpy.
+
+    Options:
+        directory:  Store directory, defaults to INSIDER['METRICS_DIR'].
+    """
+
+    identifier = "metrics"
+
+    def __init__(self, directory: Optional[str] = None, **options):
+        super().__init__(**options)
+        self.store = get_store(directory)
+
+    def write(self, footprint_data: Dict[str, Any]) -> None:
+        self.store.append([footprint_data])
+
+    def write_batch(self, batch: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        return self.store.append(batch)
+
+    def flush(self) -> None:
+        self.store.flush()
@@ -0,0 +1,152 @@
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+from typing import Any, Dict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .base import BaseSink
+
+
+class FootprintJSONEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        if isinstance(o, (bytes, bytearray, memoryview)):
+            return bytes(o).decode("utf-8", errors="replace")
+        return super().default(o)
+
+
+def to_ndjson_line(footprint_data: Dict[str, Any]) -> bytes:
+    """
+    One footprint as a newline-terminated JSON object. Footprints captured
+    without a `created_at` are stamped now.
+    """
+
+    record = {"created_at": timezone.now()}
+    record.update((k, v) for k, v in footprint_data.items() if k != "__db_alias")
+    return json.dumps(record, cls=FootprintJSONEncoder, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class NDJSONFileSink(BaseSink):
+    """
+    Appends footprints as NDJSON to a local file for log shippers
+    (Vector, Fluent Bit, Filebeat...).
+
+    Options:
+        path:            Target file. `{pid}` is replaced by the process id, which
+                         avoids several processes rotating the same file.
+        max_bytes:       Rotate once the file reaches this size (0 disables).
+        backup_count:    Rotated files to keep (`path.1` ... `path.N`).
+        buffer_bytes:    Write buffer size.
+        flush_interval:  Max seconds a line may sit in the buffer. A timer armed by
+                         the first buffered line flushes it even if no other
+                         footprint comes.
+    """
+
+    identifier = "ndjson"
+
+    def __init__(
+        self,
+        path: str = "insider-footprints.ndjson",
+        max_bytes: int = 100 * 1024 * 1024,
+        backup_count: int = 5,
+        buffer_bytes: int = 64 * 1024,
+        flush_interval: float = 1.0,
+        **options
+    ):
+        super().__init__(**options)
+        self.path_template = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.buffer_bytes = buffer_bytes
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._pid = None
+        self._last_flush = time.monotonic()
+        self._timer = None
+        atexit.register(self.flush)
+
+    @property
+    def path(self) -> str:
+        return self.path_template.replace("{pid}", str(os.getpid()))
+
+    def write(self, footprint_data: Dict[str, Any]) -> None:
+        line = to_ndjson_line(footprint_data)
+
+        with self._lock:
+            handle = self._open()
+            handle.write(line)
+
+            if self.max_bytes and handle.tell() >= self.max_bytes:
+                self._rotate()
+            elif time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._file is not None and self._pid == os.getpid():
+            self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def _open(self):
+        if self._file is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self._file = open(self.path, "ab", buffering=self.buffer_bytes)
+            # A forked child has no timer thread, and must not cancel its parent's.
+            self._pid, self._timer = os.getpid(), None
+        return self._file
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        path = self.path
+
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{path}.{index + 1}")
+            os.replace(path, f"{path}.1")
+        else:
+            os.remove(path)
+
+
+class StdoutSink(BaseSink):
+    """
+    Writes footprints as NDJSON to stdout, for container log collection.
+    """
+
+    identifier = "stdout"
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self._lock = threading.Lock()
+
+    def write(self, footprint_data: Dict[str, Any]) -> None:
+        line = to_ndjson_line(footprint_data)
+
+        with self._lock:
+            stream = getattr(sys.stdout, "buffer", None)
+            if stream is not None:
+                stream.write(line)
+            else:
+                sys.stdout.write(line.decode("utf-8"))
+            sys.stdout.flush()
@@ -0,0 +1,138 @@
+import logging
+from typing import Any, Dict, List
+from django.db import transaction
+from django.db.utils import InterfaceError, OperationalError
+from insider.models import Footprint
+from insider.services.footprint import write_footprint
+from insider.services import blobs, rollups, search
+from .base import BaseSink
+
+logger = logging.getLogger(__name__)
+
+
+class ORMSink(BaseSink):
+    """
+    Stores footprints as `Footprint` rows and aggregates errors into
+    incidences. This is the default sink and the only one that feeds the
+    dashboard, which is why it also maintains the traffic rollups.
+    """
+
+    identifier = "orm"
+
+    def write(self, footprint_data: Dict[str, Any]) -> None:
+        footprint_data = dict(footprint_data)
+        db_alias = footprint_data.pop('__db_alias', None) or 'default'
+        footprint = write_footprint(footprint_data, db_alias)
+        rollups.record_footprint(footprint, db_alias)
+
+    def write_batch(self, batch: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        """
+        Healthy footprints are inserted with one bulk INSERT per DB alias;
+        errors still go through `write_footprint` so they are aggregated into
+        incidences. Every error, and every bulk INSERT with its payloads,
+        commits on its own: a footprint that fails is logged and skipped
+        without costing the rest of the batch (a failed bulk INSERT is
+        retried one footprint at a time), and a database error leaves
+        committed footprints in place. Footprints already stored (same
+        request_id) are skipped before inserting, which makes re-running a
+        partially applied batch safe, also on a partitioned footprint table
+        where request_id alone isn't unique.
+        """
+
+        healthy: Dict[str, List[Dict[str, Any]]] = {}
+        stored: Dict[str, List[Footprint]] = {}
+
+        for item in batch:
+            footprint_data = dict(item)
+            db_alias = footprint_data.pop('__db_alias', None) or 'default'
+
+            # Without a request_id a payload couldn't be matched to its bulk-inserted row.
+            if footprint_data.get("status_code", 200) >= 400 or not footprint_data.get("request_id"):
+                self._write_one(footprint_data, db_alias, stored)
+            else:
+                healthy.setdefault(db_alias, []).append(footprint_data)
+
+        for db_alias, items in healthy.items():
+            items = self._unseen(items, db_alias)
+            footprints = [Footprint(**footprint_data) for footprint_data in items]
+            try:
+                with transaction.atomic(using=db_alias):
+                    Footprint.objects.using(db_alias).bulk_create(
+                        footprints, batch_size=batch_size, ignore_conflicts=True
+                    )
+                    self._write_payloads(footprints, db_alias, batch_size)
+            except (OperationalError, InterfaceError):
+                raise
+            except Exception as e:
+                logger.warning(f"INSIDER: Bulk insert of {len(items)} footprints failed ({e}), writing them one by one.")
+                for footprint_data in items:
+                    self._write_one(footprint_data, db_alias, stored)
+            else:
+                stored.setdefault(db_alias, []).extend(footprints)
+
+        for db_alias, footprints in stored.items():
+            rollups.record_footprints(footprints, db_alias)
+
+        return sum(len(footprints) for footprints in stored.values())
+
+    def _unseen(self, items: List[Dict[str, Any]], db_alias: str) -> List[Dict[str, Any]]:
+        """
+        `items` without the request_ids already stored or repeated in the batch.
+        """
+
+        request_ids = [footprint_data["request_id"] for footprint_data in items]
+        seen = set(
+            Footprint.objects.using(db_alias).filter(request_id__in=request_ids).values_list("request_id", flat=True)
+        )
+        unseen = []
+        for footprint_data in items:
+            if footprint_data["request_id"] not in seen:
+                seen.add(footprint_data["request_id"])
+                unseen.append(footprint_data)
+        return unseen
+
+    def _write_one(self, footprint_data: Dict[str, Any], db_alias: str, stored: Dict[str, List[Footprint]]) -> None:
+        request_id = footprint_data.get("request_id")
+
+        try:
+            if request_id and Footprint.objects.using(db_alias).filter(request_id=request_id).exists():
+                return
+
+            if footprint_data.get("status_code", 200) >= 400:
+                footprint = write_footprint(footprint_data, db_alias)
+            else:
+                footprint = Footprint.objects.using(db_alias).create(**footprint_data)
+
+        except (OperationalError, InterfaceError):
+            raise
+        except Exception as e:
+            logger.error(f"INSIDER: Skipped footprint {request_id} in a batch: {e}", exc_info=True)
+            return
+
+        stored.setdefault(db_alias, []).append(footprint)
+
+    def _write_payloads(self, footprints: List[Footprint], db_alias: str, batch_size: int) -> None:
+        """
+        bulk_create skips Footprint.save(), so the payload rows of the
+        bulk-inserted footprints are written here, matched by request_id
+        (ignore_conflicts leaves the instances without primary keys). Large
+        values repeated within the batch share one blob reference update.
+        """
+
+        pending = {}
+        for footprint in footprints:
+            payload = footprint.pop_pending_payload()
+            if payload and any(value is not None for value in payload.values()):
+                pending[footprint.request_id] = payload
+
+        if not pending:
+            return
+
+        ids = list(Footprint.objects.using(db_alias).filter(request_id__in=list(pending)).values_list(
+            'request_id', 'pk', 'exception_name'
+        ))
+        blobs.store_payloads([(pk, pending[request_id]) for request_id, pk, _ in ids], db_alias, batch_size=batch_size)
+        search.index_footprints([(pk, name, pending[request_id]) for request_id, pk, name in ids], db_alias)
+
+    def flush(self) -> None:
+        rollups.rollup_buffer.flush()
@@ -0,0 +1,220 @@
+"""
+insider.sketch
+--------------
+
+Mergeable latency histograms for percentiles over any time range.
+
+Latencies are counted in fixed logarithmic buckets (the DDSketch mapping):
+bucket i covers (MIN_VALUE * GAMMA**(i-1), MIN_VALUE * GAMMA**i], so any
+quantile read back is within RELATIVE_ACCURACY of the true value. Because
+the buckets are the same everywhere, merging two sketches is adding their
+counts, which is what makes per-minute sketches roll up into hours, days or
+a whole dashboard window.
+
+Serialized layout (little endian):
+
+    [1 byte version][1 byte count width: 2, 4 or 8][u16 first bucket][u16 length][counts]
+
+Only the span between the lowest and highest non-empty bucket is stored.
+Merging many sketches uses numpy when it is installed (one slice add per
+sketch) and the stdlib `array` module otherwise.
+"""
+
+import sys
+import math
+import operator
+import struct
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+VERSION = 1
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+MIN_VALUE = 0.01  # ms; anything faster lands in bucket 0
+NUM_BUCKETS = 2048  # MIN_VALUE * GAMMA**2047 is ~ 4e15 ms
+
+QUANTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99}
+
+_LOG_GAMMA = math.log(GAMMA)
+_HEADER = struct.Struct("<BBHH")
+_TYPECODES = {2: "H", 4: "I", 8: "Q"}
+
+
+class SketchError(ValueError):
+    pass
+
+
+def bucket_index(value: float) -> int:
+    if value is None or value <= MIN_VALUE:
+        return 0
+    return min(NUM_BUCKETS - 1, max(0, math.ceil(math.log(value / MIN_VALUE) / _LOG_GAMMA)))
+
+
+def bucket_value(index: int) -> float:
+    """
+    Representative value of a bucket: the point with the same relative
+    error to both of its bounds.
+    """
+
+    if index <= 0:
+        return MIN_VALUE
+    return MIN_VALUE * 2 * GAMMA ** index / (GAMMA + 1)
+
+
+class LatencySketch:
+    """
+    Sparse bucket counts for one group of requests.
+    """
+
+    __slots__ = ("counts",)
+
+    def __init__(self, counts: Optional[dict] = None):
+        self.counts = counts or {}
+
+    @classmethod
+    def of(cls, values: Iterable[float]) -> "LatencySketch":
+        sketch = cls()
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def add(self, value: float, count: int = 1) -> None:
+        index = bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+
+    def merge(self, other: "LatencySketch") -> "LatencySketch":
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        return self
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        dense = [0] * NUM_BUCKETS
+        for index, count in self.counts.items():
+            dense[index] = count
+        return dense_quantiles(dense, qs)
+
+    def to_bytes(self) -> bytes:
+        if not self.counts:
+            return _HEADER.pack(VERSION, 2, 0, 0)
+
+        first, last = min(self.counts), max(self.counts)
+        peak = max(self.counts.values())
+        width = 2 if peak <= 0xFFFF else 4 if peak <= 0xFFFFFFFF else 8
+        span = array(_TYPECODES[width], bytes(width * (last - first + 1)))
+        for index, count in self.counts.items():
+            span[index - first] = count
+
+        if sys.byteorder == "big":
+            span.byteswap()
+        return _HEADER.pack(VERSION, width, first, len(span)) + span.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data) -> "LatencySketch":
+        first, span = _decode(data)
+        return cls({first + offset: int(count) for offset, count in enumerate(span) if count})
+
+
+def _decode(data):
+    """
+    Returns (first bucket, counts) of a serialized sketch.
+    """
+
+    data = bytes(data)
+    if len(data) < _HEADER.size:
+        raise SketchError("Truncated sketch.")
+
+    version, width, first, length = _HEADER.unpack_from(data)
+    if version != VERSION or width not in _TYPECODES:
+        raise SketchError(f"Unsupported sketch format (version {version}, width {width}).")
+    if len(data) != _HEADER.size + width * length or first + length > NUM_BUCKETS:
+        raise SketchError("Corrupt sketch.")
+
+    if np is not None:
+        return first, np.frombuffer(data, dtype=f"<u{width}", count=length, offset=_HEADER.size)
+
+    span = array(_TYPECODES[width])
+    span.frombytes(data[_HEADER.size:])
+    if sys.byteorder == "big":
+        span.byteswap()
+    return first, span
+
+
+def merge_bytes(blobs: Iterable[Optional[bytes]]):
+    """
+    Adds up serialized sketches into one dense array of NUM_BUCKETS counts
+    (a numpy array when numpy is available, a list otherwise). Empty or
+    missing sketches are skipped.
+    """
+
+    if np is not None:
+        dense = np.zeros(NUM_BUCKETS, dtype=np.int64)
+        for blob in blobs:
+            if blob:
+                first, span = _decode(blob)
+                dense[first:first + len(span)] += span
+        return dense
+
+    dense = [0] * NUM_BUCKETS
+    for blob in blobs:
+        if blob:
+            first, span = _decode(blob)
+            end = first + len(span)
+            dense[first:end] = map(operator.add, dense[first:end], span)
+    return dense
+
+
+def dense_quantiles(dense, qs: Sequence[float]) -> List[Optional[float]]:
+    """
+    Reads quantiles (0..1) off dense bucket counts. None when empty.
+    """
+
+    if np is not None:
+        cumulative = np.cumsum(dense)
+        total = int(cumulative[-1])
+        if not total:
+            return [None for _ in qs]
+        ranks = [min(total, max(1, math.ceil(q * total))) for q in qs]
+        return [bucket_value(int(i)) for i in np.searchsorted(cumulative, ranks)]
+
+    total = sum(dense)
+    if not total:
+        return [None for _ in qs]
+
+    results: List[Optional[float]] = [None] * len(qs)
+    wanted = sorted((min(total, max(1, math.ceil(q * total))), n) for n, q in enumerate(qs))
+    seen, position = 0, 0
+    for index, count in enumerate(dense):
+        if not count:
+            continue
+        seen += count
+        while position < len(wanted) and wanted[position][0] <= seen:
+            results[wanted[position][1]] = bucket_value(index)
+            position += 1
+        if position == len(wanted):
+            break
+    return results
+
+
+def dense_percentiles(dense, lowest: Optional[float], highest: Optional[float]) -> Dict[str, Optional[float]]:
+    """
+    QUANTILES (ms, rounded) read off dense bucket counts, clamped to the
+    observed min/max so a bucket's representative value never leaves the
+    real range.
+    """
+
+    values = dense_quantiles(dense, list(QUANTILES.values()))
+    return {
+        name: None if value is None else round(min(max(value, lowest or 0.0), highest or value), 2)
+        for name, value in zip(QUANTILES, values)
+    }
@@ -1,10 +1,12 @@
 import logging
 from celery import shared_task
-from datetime import timedelta
+from celery.signals import worker_process_shutdown
+from django.db import connections
 from django.utils import timezone
-from .models import Footprint, Incidence
 from .settings import settings as insider_settings
 from insider.services.footprint import save_footprint
+from insider import codec
+from insider.services import archive, blobs, partitions, retention, rollups, status_counts
 
 logger = logging.getLogger(__name__)
 
@@ -14,26 +16,80 @@ logger = logging.getLogger(__name__)
     autoretry_for=(Exception,),
     retry_kwargs={"max_retries": 3, "countdown": 5},
 )
-def save_footprint_task(footprint_data: dict):
+def save_footprint_task(footprint_data):
+    # Payloads are sent codec-encoded; plain dicts are still accepted from older producers.
+    if isinstance(footprint_data, str):
+        footprint_data = codec.decode_text(footprint_data)
     return save_footprint(footprint_data)
 
 
+@worker_process_shutdown.connect
+def flush_sinks(**kwargs):
+    # Buffered sinks (rollup counts, NDJSON lines) would otherwise lose their last interval.
+    from insider.sinks import get_sinks
+    for sink in get_sinks():
+        try:
+            sink.flush()
+        except Exception as e:
+            logger.error(f"INSIDER: Failed to flush {type(sink).__name__} on shutdown: {e}")
+
+
 @shared_task
 def cleanup_old_data():
     """
-    Deletes footprints older than the configured retention days.
+    Applies the retention tiers: healthy footprints after DATA_RETENTION_DAYS,
+    errors and slow requests after ERROR_RETENTION_DAYS, incidences (see
+    insider.services.retention) and rollups past the longest tier. Rows are deleted in small pk batches, after
+    being archived when ARCHIVE_DIR is set.
     """
 
     days = insider_settings.DATA_RETENTION_DAYS
     if days <= 0:
         return "Cleanup Disabled (Days=0)"
 
-    cutoff_date = timezone.now() - timedelta(days=days)
-    
-    footprint_deleted, _ = Footprint.objects.filter(created_at__lt=cutoff_date).delete()
-    incidences_deleted, _ = Incidence.objects.filter(created_at__lt=cutoff_date).delete()    
+    db_alias = insider_settings.DB_ALIAS
+    now = timezone.now()
+
+    # Keep a copy of everything about to go (see insider.services.archive).
+    archived = 0
+    if insider_settings.ARCHIVE_DIR:
+        archived = archive.archive_expired(db_alias, now=now)
+
+    # Partitioned storage: premake upcoming partitions and drop whole
+    # partitions past the longest footprint tier, leaving only newer rows
+    # for the batched deletes below.
+    connection = connections[db_alias]
+    dropped = []
+    if partitions.is_partitioned(connection):
+        partitions.create_partitions(connection)
+        dropped = partitions.drop_expired_partitions(connection, retention.footprint_retention_cutoff(now))
+        if dropped:
+            retention.delete_orphan_payloads(db_alias)
+
+    if insider_settings.METRICS_DIR:
+        from insider.services.metrics_store import get_store
+        get_store().drop_before(retention.footprint_retention_cutoff(now))
+
+    footprint_deleted = retention.cleanup_footprints(db_alias, now=now)
+    incidences_deleted = retention.cleanup_incidences(db_alias, now=now)
+    rollups.expire_rollups(db_alias, retention.footprint_retention_cutoff(now))
+    blobs_deleted = blobs.collect_garbage(db_alias)
+    status_counts.rebuild(db_alias)
 
     return (
         f"INSIDER: Cleanup Completed -  Deleted {footprint_deleted} footprints" \
+        f"{f' (plus {len(dropped)} dropped partitions)' if dropped else ''}" \
+        f"{f', {archived} archived' if archived else ''}" \
+        f"{f', {blobs_deleted} unreferenced payload blobs' if blobs_deleted else ''}" \
         f" and {incidences_deleted} incidences older than {days} days."
-    )
\ No newline at end of file
+    )
+
+
+@shared_task
+def compact_rollups():
+    """
+    Folds old minute rollups into hourly ones, and old hourly rollups into daily ones.
+    """
+
+    written = rollups.compact_rollups(insider_settings.DB_ALIAS)
+    return f"INSIDER: Rollups compacted into {written} coarser rows."
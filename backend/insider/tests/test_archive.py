@@ -0,0 +1,119 @@
+import os
+import gzip
+import shutil
+import tempfile
+import unittest
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase
+from django.utils import timezone
+from insider.models import Footprint, Incidence
+from insider.services import archive, retention
+from insider.tasks import cleanup_old_data
+from insider.settings import settings as insider_settings
+
+
+class ArchiveTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="insider-archive-")
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.now = timezone.now()
+        self.db_alias = insider_settings.DB_ALIAS
+
+        patcher = mock.patch.multiple(
+            insider_settings, ARCHIVE_DIR=self.directory, DATA_RETENTION_DAYS=7,
+            ERROR_RETENTION_DAYS=None, CLEANUP_BATCH_PAUSE=0,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _footprint(self, name, days_old, status=200, path="/orders/1/", **kwargs):
+        fp = Footprint.objects.create(
+            request_id=name, request_path=path, request_method="get", status_code=status, **kwargs
+        )
+        Footprint.objects.filter(id=fp.id).update(created_at=self.now - timedelta(days=days_old))
+        return fp
+
+    def _archive(self, fmt="ndjson"):
+        return archive.archive_expired(self.db_alias, now=self.now, fmt=fmt, chunk_size=2)
+
+    def test_archives_expiring_rows_by_day_with_manifest(self):
+        self._footprint("a", 10, stack_trace=[{"line": 1}], status=500)
+        self._footprint("b", 10)
+        self._footprint("c", 12, path="/users/7/")
+        self._footprint("fresh", 1)
+
+        self.assertEqual(self._archive(), 3)
+
+        manifest = archive.load_manifest()
+        self.assertEqual(sorted(f["rows"] for f in manifest["files"]), [1, 2])
+        for entry in manifest["files"]:
+            path = os.path.join(self.directory, entry["path"])
+            self.assertTrue(entry["path"].startswith(f"date={entry['date']}"))
+            with gzip.open(path, "rt") as handle:
+                self.assertEqual(len(handle.readlines()), entry["rows"])
+
+        # Already archived rows are not written again.
+        self.assertEqual(self._archive(), 0)
+        self._footprint("d", 9)
+        self.assertEqual(self._archive(), 1)
+
+    def test_query_pushdown(self):
+        self._footprint("a", 10, stack_trace=[{"line": 1}], status=500)
+        self._footprint("b", 10)
+        self._footprint("c", 12, path="/users/7/")
+        self._archive()
+
+        rows = list(archive.query_archive(status_min=500))
+        self.assertEqual([r["request_id"] for r in rows], ["a"])
+        self.assertEqual(rows[0]["stack_trace"], [{"line": 1}])
+
+        self.assertEqual([r["request_id"] for r in archive.query_archive(route="/users/{id}/")], ["c"])
+        self.assertEqual(
+            sorted(r["request_id"] for r in archive.query_archive(since=self.now - timedelta(days=11))), ["a", "b"]
+        )
+
+        with mock.patch.object(archive, "_read_ndjson", side_effect=AssertionError("file was not skipped")):
+            self.assertEqual(list(archive.query_archive(until=self.now - timedelta(days=30))), [])
+
+    def test_cleanup_archives_before_deleting(self):
+        self._footprint("old", 10, request_body={"q": 1})
+        self._footprint("fresh", 1)
+
+        cleanup_old_data()
+
+        self.assertEqual(set(Footprint.objects.values_list("request_id", flat=True)), {"fresh"})
+        rows = list(archive.query_archive())
+        self.assertEqual([(r["request_id"], r["request_body"]) for r in rows], [("old", {"q": 1})])
+
+    def test_incidence_retention_archives_its_footprints(self):
+        incidence = Incidence.objects.create(title="Old", fingerprint="old", status="RESOLVED")
+        Incidence.objects.filter(id=incidence.id).update(last_seen=self.now - timedelta(days=10))
+        self._footprint("with-incidence", 10, status=500, incidence=incidence)
+
+        self.assertEqual(retention.cleanup_incidences(self.db_alias, now=self.now), 1)
+
+        self.assertFalse(Footprint.objects.exists())
+        self.assertEqual([r["request_id"] for r in archive.query_archive()], ["with-incidence"])
+
+    @unittest.skipIf(archive.pq is None, "pyarrow is not installed")
+    def test_parquet_route_pushdown(self):
+        self._footprint("a", 10, path="/users/7/")
+        self._footprint("b", 10)
+        self._archive(fmt="parquet")
+
+        with mock.patch.object(archive, "_row_matches", return_value=True):
+            self.assertEqual([r["request_id"] for r in archive.query_archive(route="/users/{id}/")], ["a"])
+            self.assertEqual([r["request_id"] for r in archive.query_archive(route="/orders/1/")], ["b"])
+
+    @unittest.skipIf(archive.pq is None, "pyarrow is not installed")
+    def test_parquet_roundtrip(self):
+        self._footprint("a", 10, stack_trace=[{"line": 1}], status=500)
+        self._footprint("b", 10)
+        self._footprint("c", 10)
+
+        self.assertEqual(self._archive(fmt="parquet"), 3)
+        rows = list(archive.query_archive(status_min=500))
+        self.assertEqual([(r["request_id"], r["stack_trace"]) for r in rows], [("a", [{"line": 1}])])
@@ -0,0 +1,100 @@
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase
+from django.utils import timezone
+from insider.api.filters import FootprintFilter
+from insider.models import Footprint, FootprintPayload, PayloadBlob
+from insider.services import blobs, retention
+from insider.sinks.orm import ORMSink
+from insider.settings import settings as insider_settings
+
+ERROR_BODY = {"error": "upstream timeout", "detail": "x" * 512}
+
+
+class PayloadBlobTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def _create(self, **kwargs):
+        return Footprint.objects.create(request_path="/blob/", request_method="get", status_code=502, **kwargs)
+
+    def test_identical_large_values_share_one_blob(self):
+        footprints = [self._create(response_body=ERROR_BODY, request_body={"n": n}) for n in range(3)]
+
+        blob = PayloadBlob.objects.get()
+        self.assertEqual(blob.refcount, 3)
+        self.assertEqual(blob.size, len(blobs.canonical(ERROR_BODY)))
+
+        payload = FootprintPayload.objects.get(footprint_id=footprints[1].pk)
+        self.assertIsNone(payload.response_body)
+        self.assertEqual(payload.request_body, {"n": 1})
+        self.assertEqual(Footprint.objects.get(pk=footprints[1].pk).response_body, ERROR_BODY)
+
+    def test_small_values_stay_inline(self):
+        self._create(response_body={"ok": True})
+
+        self.assertFalse(PayloadBlob.objects.exists())
+        self.assertEqual(FootprintPayload.objects.get().response_body, {"ok": True})
+
+    def test_dedup_disabled(self):
+        with mock.patch.object(insider_settings, 'PAYLOAD_DEDUP_MIN_BYTES', None):
+            self._create(response_body=ERROR_BODY)
+
+        self.assertFalse(PayloadBlob.objects.exists())
+        self.assertEqual(FootprintPayload.objects.get().response_body, ERROR_BODY)
+
+    def test_bulk_written_footprints_share_blobs(self):
+        batch = [
+            {
+                "__db_alias": insider_settings.DB_ALIAS,
+                "request_id": f"blob-req-{n}",
+                "request_path": "/blob/",
+                "request_method": "get",
+                "status_code": 502,
+                "response_body": ERROR_BODY,
+            }
+            for n in range(4)
+        ]
+        ORMSink().write_batch(batch)
+
+        self.assertEqual(PayloadBlob.objects.get().refcount, 4)
+        self.assertEqual(Footprint.objects.get(request_id="blob-req-2").response_body, ERROR_BODY)
+
+    def test_update_moves_references(self):
+        footprint = self._create(response_body=ERROR_BODY)
+        footprint.response_body = {"error": "other", "detail": "y" * 512}
+        footprint.save()
+
+        refcounts = dict(PayloadBlob.objects.values_list('content__error', 'refcount'))
+        self.assertEqual(refcounts, {"upstream timeout": 0, "other": 1})
+        self.assertEqual(Footprint.objects.get(pk=footprint.pk).response_body["error"], "other")
+
+    def test_orm_delete_releases_references(self):
+        kept = self._create(response_body=ERROR_BODY)
+        self._create(response_body=ERROR_BODY).delete()
+
+        self.assertEqual(PayloadBlob.objects.get().refcount, 1)
+        self.assertEqual(blobs.collect_garbage(insider_settings.DB_ALIAS), 0)
+
+        kept.delete()
+        self.assertEqual(blobs.collect_garbage(insider_settings.DB_ALIAS), 1)
+        self.assertFalse(PayloadBlob.objects.exists())
+
+    def test_retention_releases_references(self):
+        expired = self._create(response_body=ERROR_BODY)
+        fresh = self._create(response_body=ERROR_BODY, stack_trace=[{"frame": "z" * 512}])
+        Footprint.objects.filter(pk=expired.pk).update(
+            created_at=timezone.now() - timedelta(days=insider_settings.DATA_RETENTION_DAYS + 1)
+        )
+
+        retention.cleanup_footprints(insider_settings.DB_ALIAS, pause=0)
+        self.assertEqual(PayloadBlob.objects.get(content=ERROR_BODY).refcount, 1)
+
+        Footprint.objects.filter(pk=fresh.pk)._raw_delete(insider_settings.DB_ALIAS)
+        retention.delete_orphan_payloads(insider_settings.DB_ALIAS)
+        self.assertEqual(blobs.collect_garbage(insider_settings.DB_ALIAS), 2)
+
+    def test_search_matches_blob_content(self):
+        footprint = self._create(response_body=ERROR_BODY)
+
+        matched = FootprintFilter({'global_search': 'upstream timeout'}, queryset=Footprint.objects.all()).qs
+        self.assertEqual(list(matched.values_list('pk', flat=True)), [footprint.pk])
@@ -1,7 +1,10 @@
+from unittest import mock
+from django.core.cache import cache
 from django.test import TestCase
 from django.utils import timezone
 from datetime import timedelta
 from insider.models import Footprint, Incidence
+from insider.services import retention
 from insider.tasks import cleanup_old_data
 from insider.settings import settings as insider_settings
 from celery import current_app
@@ -39,7 +42,7 @@ class CleanupTaskTest(TestCase):
             fingerprint="old_hash"
         )
         Incidence.objects.filter(id=expired_inc.id) \
-                         .update(created_at=old_date)
+                         .update(created_at=old_date, last_seen=old_date, status="RESOLVED")
 
         result = cleanup_old_data()
         print(result)
@@ -88,4 +91,97 @@ class CleanupTaskTest(TestCase):
             self.assertEqual(expected_schedule, crontab(hour=3, minute=0))
             
         finally:
-            insider.apps.is_celery_available = original_check
\ No newline at end of file
+            insider.apps.is_celery_available = original_check
+
+class TieredRetentionTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+
+    def _footprint(self, name, days_old, status=200, response_time=10.0, incidence=None):
+        fp = Footprint.objects.create(
+            request_id=name, request_path=f"/{name}", request_method="get",
+            status_code=status, response_time=response_time, incidence=incidence,
+        )
+        Footprint.objects.filter(id=fp.id).update(created_at=self.now - timedelta(days=days_old))
+        return fp
+
+    def _remaining(self):
+        return set(Footprint.objects.values_list("request_id", flat=True))
+
+    def test_tiers_keep_errors_and_slow_requests_longer(self):
+        self._footprint("healthy-old", 10)
+        self._footprint("healthy-new", 2)
+        self._footprint("error-mid", 10, status=500)
+        self._footprint("slow-mid", 10, response_time=5000.0)
+        self._footprint("error-old", 40, status=404)
+
+        with mock.patch.multiple(insider_settings, DATA_RETENTION_DAYS=7, ERROR_RETENTION_DAYS=30, SLOW_REQUEST_THRESHOLD=1000):
+            deleted = retention.cleanup_footprints(insider_settings.DB_ALIAS, now=self.now, pause=0)
+
+        self.assertEqual(deleted, 2)
+        self.assertEqual(self._remaining(), {"healthy-new", "error-mid", "slow-mid"})
+
+    def test_incidences_kept_until_resolved(self):
+        open_inc = Incidence.objects.create(title="Open", fingerprint="open")
+        resolved = Incidence.objects.create(title="Resolved", fingerprint="resolved", status="RESOLVED")
+        recently_resolved = Incidence.objects.create(title="Fresh", fingerprint="fresh", status="RESOLVED")
+        Incidence.objects.filter(id__in=[open_inc.id, resolved.id]).update(last_seen=self.now - timedelta(days=20))
+        self._footprint("resolved-fp", 40, status=500, incidence=resolved)
+
+        with mock.patch.multiple(insider_settings, INCIDENCE_RETENTION_DAYS=14):
+            deleted = retention.cleanup_incidences(insider_settings.DB_ALIAS, now=self.now, pause=0)
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(set(Incidence.objects.values_list("id", flat=True)), {open_inc.id, recently_resolved.id})
+        self.assertEqual(self._remaining(), set(), "Footprints of a deleted incidence must go with it.")
+
+    def test_incidences_wait_for_their_footprints_tier(self):
+        open_inc = Incidence.objects.create(title="Open", fingerprint="open")
+        resolved = Incidence.objects.create(title="Resolved", fingerprint="resolved", status="RESOLVED")
+        Incidence.objects.filter(id__in=[open_inc.id, resolved.id]).update(
+            created_at=self.now - timedelta(days=40), last_seen=self.now - timedelta(days=10)
+        )
+        self._footprint("open-fp", 10, status=500, incidence=open_inc)
+        self._footprint("resolved-fp", 10, status=500, incidence=resolved)
+
+        with mock.patch.multiple(insider_settings, DATA_RETENTION_DAYS=7, ERROR_RETENTION_DAYS=90):
+            retention.cleanup_footprints(insider_settings.DB_ALIAS, now=self.now, pause=0)
+            deleted = retention.cleanup_incidences(insider_settings.DB_ALIAS, now=self.now, pause=0)
+
+        self.assertEqual(deleted, 0)
+        self.assertEqual(self._remaining(), {"open-fp", "resolved-fp"})
+
+        with mock.patch.multiple(insider_settings, DATA_RETENTION_DAYS=7, ERROR_RETENTION_DAYS=9):
+            deleted = retention.cleanup_incidences(insider_settings.DB_ALIAS, now=self.now, pause=0)
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(list(Incidence.objects.values_list("id", flat=True)), [open_inc.id])
+        self.assertEqual(self._remaining(), {"open-fp"})
+
+    def test_batches_resume_from_checkpoint(self):
+        for n in range(7):
+            self._footprint(f"old-{n}", 40)
+
+        calls = []
+        original = retention._raw_delete
+
+        def failing_delete(model, ids, db_alias, column=None):
+            calls.append(list(ids))
+            if len(calls) == 2:
+                raise RuntimeError("worker killed")
+            return original(model, ids, db_alias, column)
+
+        with mock.patch.object(retention, "_raw_delete", side_effect=failing_delete):
+            with self.assertRaises(RuntimeError):
+                retention.cleanup_footprints(insider_settings.DB_ALIAS, now=self.now, batch_size=3, pause=0)
+
+        self.assertEqual(len(self._remaining()), 4)
+        self.assertIsNotNone(cache.get(retention.CHECKPOINT_KEY.format(tier="footprints")))
+
+        deleted = retention.cleanup_footprints(insider_settings.DB_ALIAS, now=self.now, batch_size=3, pause=0)
+        self.assertEqual(deleted, 4)
+        self.assertEqual(self._remaining(), set())
+        self.assertIsNone(cache.get(retention.CHECKPOINT_KEY.format(tier="footprints")))
@@ -0,0 +1,75 @@
+import json
+from datetime import datetime, timezone
+from django.test import SimpleTestCase
+from insider import codec
+
+
+def sample_error_footprint():
+    return {
+        "request_id": "5b3c9a0e-2f61-4d7e-9a51-0e9c4d1f2a77",
+        "request_user": "42",
+        "request_path": "/api/orders/1337/",
+        "request_method": "post",
+        "request_body": {"sku": "A-1", "qty": 3, "password": "***masked***"},
+        "status_code": 500,
+        "response_time": 812.377,
+        "db_query_count": 37,
+        "ip_address": "10.0.0.12",
+        "user_agent": "Mozilla/5.0 (X11; Linux x86_64)",
+        "response_body": {"detail": "Internal server error"},
+        "system_logs": [f"2026-01-01 00:00:0{i} - app - ERROR - retry {i}" for i in range(40)],
+        "exception_name": "ZeroDivisionError",
+        "stack_trace": [
+            {"file": "/srv/app/views.py", "line": 10 + i, "function": "handler", "code": "x = 1 / 0"}
+            for i in range(25)
+        ],
+        "__db_alias": "insider",
+    }
+
+
+class CodecTest(SimpleTestCase):
+
+    def test_round_trip_error_payload(self):
+        data = sample_error_footprint()
+        self.assertEqual(codec.decode(codec.encode(data)), data)
+
+    def test_round_trip_keeps_types_missing_keys_and_extras(self):
+        data = {
+            "request_id": "r-1",
+            "status_code": 204,
+            "response_time": 0.0,
+            "db_query_count": -3,
+            "ip_address": None,
+            "request_body": b"\x00\xffraw",
+            "response_body": {"blob": b"\x01\x02", "ok": True},
+            "custom_field": "kept",
+        }
+        decoded = codec.decode(codec.encode(data))
+
+        self.assertEqual(decoded, data)
+        self.assertNotIn("stack_trace", decoded, "Absent keys must stay absent.")
+        self.assertIsInstance(decoded["request_body"], bytes)
+
+    def test_large_payloads_are_compressed_and_smaller_than_json(self):
+        data = sample_error_footprint()
+        encoded = codec.encode(data)
+
+        self.assertTrue(encoded[1] & codec.FLAG_ZLIB)
+        self.assertLess(len(encoded), len(json.dumps(data)) / 3)
+
+    def test_text_form_and_version_check(self):
+        data = sample_error_footprint()
+        self.assertEqual(codec.decode_text(codec.encode_text(data)), data)
+
+        with self.assertRaises(codec.CodecError):
+            codec.decode(b"\x7f\x00")
+
+    def test_capture_time_round_trips_and_v1_payloads_still_decode(self):
+        data = dict(sample_error_footprint(), created_at=datetime(2026, 3, 1, 12, 30, 5, 123456, tzinfo=timezone.utc))
+        self.assertEqual(codec.decode(codec.encode(data)), data)
+
+        v1 = dict(sample_error_footprint())
+        payload = bytearray(codec.encode(v1, compress_threshold=None))
+        payload[0] = 1
+        del payload[-5]  # the absent created_at slot, before the empty extras (4 bytes)
+        self.assertEqual(codec.decode(bytes(payload)), v1)
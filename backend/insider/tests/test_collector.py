@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+from django.test import SimpleTestCase
+from insider import codec
+from insider.dispatch import dispatch_save_footprint
+from insider.services.collector import Collector, CollectorClient
+
+
+class CollectorTest(SimpleTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix="insider-collector-")
+        self.path = os.path.join(self.tmp_dir, "collector.sock")
+        self.batches = []
+        self.received = threading.Event()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _flush(self, batch):
+        self.batches.append(batch)
+        if sum(len(b) for b in self.batches) >= 3:
+            self.received.set()
+
+    def test_workers_send_and_collector_batches(self):
+        collector = Collector(self.path, flush=self._flush, batch_size=2, flush_interval=0.05)
+        collector.bind()
+        thread = threading.Thread(target=collector.serve_forever, daemon=True)
+        thread.start()
+
+        client = CollectorClient(self.path)
+        for n in range(3):
+            self.assertTrue(client.send({"request_id": f"c-{n}", "status_code": 200}))
+
+        self.assertTrue(self.received.wait(5), "Collector never flushed the footprints.")
+        collector.stop()
+        thread.join(5)
+
+        self.assertEqual(self.batches[0], [
+            {"request_id": "c-0", "status_code": 200},
+            {"request_id": "c-1", "status_code": 200},
+        ])
+        self.assertFalse(os.path.exists(self.path), "Socket file was left behind.")
+
+    def test_send_fails_without_collector(self):
+        client = CollectorClient(self.path)
+        self.assertFalse(client.send_now({"request_id": "orphan"}))
+
+    def test_dispatch_falls_back_when_collector_is_down(self):
+        client = CollectorClient(self.path)
+        started = threading.Event()
+
+        with mock.patch("insider.dispatch.get_collector_client", return_value=client), \
+                mock.patch("insider.dispatch.is_celery_available", return_value=False), \
+                mock.patch("insider.dispatch.Thread") as mock_thread, \
+                mock.patch("insider.services.collector.codec.encode", wraps=codec.encode) as encode:
+            mock_thread.return_value.start.side_effect = started.set
+            dispatch_save_footprint({"request_id": "fallback"})
+            encoded_inline = encode.called
+
+            self.assertTrue(started.wait(5), "The sender thread never fell back to the local dispatch.")
+        self.assertFalse(encoded_inline, "The footprint was encoded on the request thread.")
+
+    def test_full_queue_is_dispatched_by_the_caller(self):
+        client = CollectorClient(self.path, queue_size=1)
+        with mock.patch.object(client, "_run"):
+            self.assertTrue(client.send({"request_id": "queued"}))
+            self.assertFalse(client.send({"request_id": "overflow"}))
@@ -0,0 +1,83 @@
+import time
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from insider.api.views import DashboardStatsView, IncidenceViewSet
+from insider.models import Incidence
+from insider.services import rollups, watermark
+from insider.services.footprint import save_footprint
+from insider.sketch import LatencySketch
+from insider.settings import settings as insider_settings
+from utils import start_without_rollups
+
+
+class DashboardCacheTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        self.db_alias = insider_settings.DB_ALIAS
+        self.user = get_user_model().objects.create_user("staff", password="x", is_staff=True)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        start_without_rollups(self.db_alias)
+
+        patcher = mock.patch.object(rollups, "rollup_buffer", rollups.RollupBuffer())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _record(self, count):
+        key = (rollups.bucket_start(timezone.now() - timedelta(minutes=5)), "/a/", "get", 5)
+        rollups.upsert_rollups({key: [count, count, 10.0 * count, 10.0, 10.0, 0, LatencySketch.of([10.0] * count)]}, self.db_alias)
+
+    def _get(self):
+        request = APIRequestFactory().get("/insider/api/dashboard/stats/")
+        force_authenticate(request, user=self.user)
+        return DashboardStatsView.as_view()(request).data
+
+    def test_responses_are_shared_until_the_watermark_moves(self):
+        self._record(2)
+        self.assertEqual(self._get()["velocity"]["total_24h"], 2)
+
+        self._record(3)
+        # Only the ETag's four data versions are read.
+        with self.assertNumQueries(4, using=self.db_alias):
+            self.assertEqual(self._get()["velocity"]["total_24h"], 2)
+
+        watermark.bump()
+        self.assertEqual(self._get()["velocity"]["total_24h"], 5)
+
+    def test_ingestion_refreshes_once_per_interval(self):
+        self._record(2)
+        self.assertEqual(self._get()["velocity"]["total_24h"], 2)
+
+        before = watermark.current()
+        with mock.patch.object(insider_settings, "ROLLUP_FLUSH_INTERVAL", 0):
+            save_footprint({"__db_alias": self.db_alias, "request_path": "/a/", "request_method": "get", "status_code": 500})
+        self.assertEqual(watermark.current(), before, "Ingestion shouldn't touch the shared watermark.")
+        self.assertEqual(self._get()["velocity"]["total_24h"], 2)
+
+        later = time.time() + insider_settings.DASHBOARD_CACHE_SECONDS
+        with mock.patch("insider.services.watermark.time.time", return_value=later):
+            self.assertEqual(self._get()["velocity"]["total_24h"], 3)
+
+    def test_status_changes_refresh_top_offenders(self):
+        incidence = Incidence.objects.create(title="Boom", fingerprint="cache-hash")
+        self.assertEqual([row["id"] for row in self._get()["top_offenders"]], [incidence.pk])
+
+        request = APIRequestFactory().post("/insider/api/incidences/bulk_resolve/", {"ids": [incidence.pk]}, format="json")
+        force_authenticate(request, user=self.user)
+        IncidenceViewSet.as_view({"post": "bulk_resolve"})(request)
+
+        self.assertEqual(self._get()["top_offenders"], [])
+
+    def test_cache_disabled(self):
+        self._record(2)
+        self._get()
+        self._record(3)
+
+        with mock.patch.object(insider_settings, "DASHBOARD_CACHE_SECONDS", 0):
+            self.assertEqual(self._get()["velocity"]["total_24h"], 5)
@@ -0,0 +1,65 @@
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+from insider.api.views import DashboardStatsView, IncidenceViewSet, IntegrationViewSet, SettingsViewSet
+from insider.models import Footprint, Incidence, InsiderIntegration, InsiderSetting
+from insider.settings import settings as insider_settings
+
+DASHBOARD = DashboardStatsView.as_view()
+INCIDENCES = IncidenceViewSet.as_view({"get": "list"})
+SETTINGS = SettingsViewSet.as_view({"get": "list"})
+INTEGRATIONS = IntegrationViewSet.as_view({"get": "list"})
+
+
+class ConditionalGetTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = get_user_model().objects.create_user("staff", password="x", is_staff=True)
+
+    def _get(self, view, etag=None, **params):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        request = APIRequestFactory().get("/insider/api/", params, **headers)
+        force_authenticate(request, user=self.user)
+        return view(request)
+
+    def assertNotModified(self, view, **params):
+        first = self._get(view, **params)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self._get(view, first["ETag"], **params).status_code, 304)
+        return first["ETag"]
+
+    def test_dashboard(self):
+        etag = self.assertNotModified(DASHBOARD)
+
+        with mock.patch.object(DashboardStatsView, "compute") as compute:
+            self._get(DASHBOARD, etag)
+        compute.assert_not_called()
+
+        Footprint.objects.create(request_path="/a/", request_method="get", status_code=200)
+        self.assertEqual(self._get(DASHBOARD, etag).status_code, 200)
+
+    def test_incidence_list(self):
+        incidence = Incidence.objects.create(title="Boom", fingerprint="etag-hash")
+        etag = self.assertNotModified(INCIDENCES)
+        self.assertNotEqual(self.assertNotModified(INCIDENCES, filter="new"), etag)
+
+        request = APIRequestFactory().post("/insider/api/incidences/bulk_resolve/", {"ids": [incidence.pk]}, format="json")
+        force_authenticate(request, user=self.user)
+        IncidenceViewSet.as_view({"post": "bulk_resolve"})(request)
+        self.assertEqual(self._get(INCIDENCES, etag).status_code, 200)
+
+    def test_settings_and_integrations(self):
+        InsiderSetting.objects.create(key="DATA_RETENTION_DAYS", value=30, field_type="INTEGER")
+        integration = InsiderIntegration.objects.create(identifier="etag", name="Etag")
+        settings_etag = self.assertNotModified(SETTINGS)
+        integrations_etag = self.assertNotModified(INTEGRATIONS)
+
+        integration.is_active = True
+        integration.save()
+        self.assertEqual(self._get(INTEGRATIONS, integrations_etag).status_code, 200)
+        self.assertEqual(self._get(SETTINGS, settings_etag).status_code, 200)
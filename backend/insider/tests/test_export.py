@@ -0,0 +1,94 @@
+import os
+import csv
+import gzip
+import json
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+from insider.api.views import FootprintViewSet
+from insider.models import Footprint
+from insider.services import export
+from insider.settings import settings as insider_settings
+
+# Built like the router does, with the action's own renderer classes.
+EXPORT = FootprintViewSet.as_view({"get": "export"}, **FootprintViewSet.export.kwargs)
+
+
+class FootprintExportTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("staff", password="x", is_staff=True)
+        for n in range(5):
+            Footprint.objects.create(
+                request_path=f"/export/{n}/", request_method="GET", status_code=500 if n % 2 else 200,
+                response_time=float(n), stack_trace=[{"line": n}] if n % 2 else None,
+            )
+
+    def _get(self, accept="*/*", **params):
+        request = APIRequestFactory().get("/insider/api/footprints/export/", params, HTTP_ACCEPT=accept)
+        force_authenticate(request, user=self.user)
+        return EXPORT(request)
+
+    def test_ndjson_of_the_filtered_footprints(self):
+        response = self._get(status_code__in="500", fields="id,request_path,stack_trace")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertIn('attachment; filename="footprints-', response["Content-Disposition"])
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            [{k: v for k, v in json.loads(line).items() if k != "id"} for line in lines],
+            [{"request_path": "/export/1/", "stack_trace": [{"line": 1}]},
+             {"request_path": "/export/3/", "stack_trace": [{"line": 3}]}],
+        )
+
+    def test_gzipped_csv(self):
+        response = self._get(output="csv", gzip="1", fields="request_path,status_code,stack_trace")
+        self.assertEqual(response["Content-Type"], "application/gzip")
+
+        text = gzip.decompress(b"".join(response.streaming_content)).decode()
+        rows = list(csv.reader(StringIO(text)))
+        self.assertEqual(rows[0], ["request_path", "status_code", "stack_trace"])
+        self.assertEqual(rows[1:3], [["/export/0/", "200", ""], ["/export/1/", "500", '[{"line":1}]']])
+        self.assertEqual(len(rows), 6)
+
+    def test_accept_headers_negotiate_the_download(self):
+        response = self._get(accept="application/x-ndjson", fields="request_path")
+        self.assertEqual((response.status_code, response["Content-Type"]), (200, "application/x-ndjson"))
+        self.assertEqual(b"".join(response.streaming_content).count(b"\n"), 5)
+
+        response = self._get(accept="text/csv", fields="request_path")
+        self.assertEqual((response.status_code, response["Content-Type"]), (200, "text/csv"))
+        self.assertEqual(b"".join(response.streaming_content).decode().splitlines()[0], "request_path")
+
+        response = self._get(accept="application/gzip", output="csv", fields="request_path")
+        self.assertEqual((response.status_code, response["Content-Type"]), (200, "application/gzip"))
+        self.assertEqual(len(gzip.decompress(b"".join(response.streaming_content)).splitlines()), 6)
+
+        self.assertEqual(self._get(accept="text/csv", fields="id,password").status_code, 400)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self._get(fields="id,password").status_code, 400)
+        self.assertEqual(self._get(output="xml").status_code, 400)
+        self.assertEqual(self._get(created_after="yesterday").status_code, 400)
+
+    def test_chunks_are_bounded(self):
+        with mock.patch.object(export, "CHUNK_BYTES", 100):
+            chunks = list(export.export(Footprint.objects.all(), fields=["request_path"]))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b"".join(chunks).count(b"\n"), 5)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "errors.ndjson.gz")
+            call_command(
+                "insider_export", database=insider_settings.DB_ALIAS, filter=["status_code__in=500"],
+                fields="request_path", gzip=True, output=path, stderr=StringIO(),
+            )
+            with gzip.open(path, "rt") as handle:
+                self.assertEqual([json.loads(line) for line in handle],
+                                 [{"request_path": "/export/1/"}, {"request_path": "/export/3/"}])
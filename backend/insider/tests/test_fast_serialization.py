@@ -0,0 +1,55 @@
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from insider.api.renderers import FastJSONRenderer
+from insider.api.serializers import FootprintListRows, FootprintListSerializer
+from insider.models import Footprint, PayloadBlob
+from insider.settings import settings as insider_settings
+
+LONG_TRACE = [{"file": f"/srv/app/views_{n}.py", "line": n, "code": "total = amount / qty"} for n in range(40)]
+
+
+class FootprintListRowsTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        Footprint.objects.create(request_path="/plain/", request_method="GET", status_code=200, response_time=12.5)
+        Footprint.objects.create(
+            request_path="/slow/\u2028é/", request_method="POST", status_code=500, response_time=1500.0,
+            request_id="abc", request_user="7", ip_address="10.0.0.1", user_agent="curl", db_query_count=3,
+            stack_trace=[{"line": 1}],
+        )
+        Footprint.objects.create(request_path="/blob/", request_method="PUT", status_code=502, stack_trace=LONG_TRACE)
+        self.assertTrue(PayloadBlob.objects.exists())
+        self.footprints = Footprint.objects.order_by('-created_at', '-id')
+
+    def assertSameJSON(self, fields=None):
+        expected = JSONRenderer().render(FootprintListSerializer(self.footprints, many=True, fields=fields).data)
+        rows = FootprintListRows(fields)
+        with self.assertNumQueries(1, using=insider_settings.DB_ALIAS):
+            data = rows.to_representation(rows.values(self.footprints))
+        self.assertEqual(FastJSONRenderer().render(data), expected)
+
+    def test_same_output_as_the_serializer(self):
+        self.assertSameJSON()
+        self.assertSameJSON(["id", "is_slow", "created_at"])
+        self.assertSameJSON(["stack_trace", "request_method"])
+
+    def test_slow_threshold_settings(self):
+        for threshold in (None, 10, "oops"):
+            with mock.patch.object(insider_settings, "SLOW_REQUEST_THRESHOLD", threshold, create=True):
+                self.assertSameJSON(["id", "is_slow"])
+
+
+class FastJSONRendererTest(TestCase):
+    def assertSameJSON(self, data, media_type=None):
+        self.assertEqual(FastJSONRenderer().render(data, media_type), JSONRenderer().render(data, media_type))
+
+    def test_same_output_as_json_renderer(self):
+        self.assertSameJSON({"a": [1, 2.5, None, True], "b": "\u2028\u2029\x00é", "c": {"d": []}})
+        self.assertSameJSON({"at": datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc)})
+        self.assertSameJSON({"tiny": 5e-05, "huge": [1e16], "text": "1e5,1e6"})
+        self.assertSameJSON({1: "non-string key"})
+        self.assertSameJSON({"a": 1}, "application/json; indent=4")
+        self.assertEqual(FastJSONRenderer().render(None), b"")
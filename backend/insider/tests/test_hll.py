@@ -0,0 +1,83 @@
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+from insider import hll
+from insider.api.views import IncidenceViewSet
+from insider.hll import HyperLogLog
+from insider.models import Incidence
+from insider.services.footprint import save_footprint
+from insider.services.incidence_cache import incidence_cache
+from insider.settings import settings as insider_settings
+
+
+class HyperLogLogTest(TestCase):
+
+    def test_small_counts_are_exact(self):
+        self.assertEqual(HyperLogLog().count(), 0)
+        self.assertEqual(HyperLogLog.of(["1", "2", "3", "2", "1"]).count(), 3)
+
+    def test_large_count_error(self):
+        counter = HyperLogLog.of(str(n) for n in range(100000))
+        self.assertAlmostEqual(counter.count(), 100000, delta=100000 * 0.05)
+
+    def test_merge_and_serialization(self):
+        a = HyperLogLog.of(str(n) for n in range(0, 600))
+        b = HyperLogLog.of(str(n) for n in range(400, 1000))
+        merged = HyperLogLog(a.to_bytes()).merge(b)
+
+        self.assertEqual(len(a.to_bytes()), hll.NUM_REGISTERS)
+        self.assertEqual(merged.to_bytes(), HyperLogLog.of(str(n) for n in range(1000)).to_bytes())
+        self.assertFalse(merged.add("5"), "A value already counted raised a register.")
+
+
+class UsersAffectedTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        incidence_cache.clear()
+        self.addCleanup(incidence_cache.clear)
+        self.counter = 0
+        self.staff = get_user_model().objects.create_user("staff", password="x", is_staff=True)
+
+    def _error(self, user):
+        self.counter += 1
+        save_footprint({
+            "__db_alias": insider_settings.DB_ALIAS,
+            "request_id": f"hll-req-{self.counter}",
+            "request_user": user,
+            "request_path": "/boom/",
+            "request_method": "get",
+            "status_code": 500,
+        })
+
+    def _list(self):
+        request = APIRequestFactory().get("/insider/api/incidences/")
+        force_authenticate(request, user=self.staff)
+        return IncidenceViewSet.as_view({'get': 'list'})(request).data
+
+    def test_users_affected_is_maintained_during_ingestion(self):
+        for user in ["1", "2", "1", "3", "2", "1"]:
+            self._error(user)
+
+        incidence = Incidence.objects.get()
+        self.assertEqual(incidence.occurrence_count, 6)
+        self.assertEqual(incidence.users_affected, 3)
+        self.assertEqual(self._list()[0]["users_affected"], 3)
+
+    def test_stale_cache_still_counts(self):
+        self._error("1")
+        incidence_cache.clear()
+        self._error("2")
+        self._error("1")
+
+        self.assertEqual(Incidence.objects.get().users_affected, 2)
+
+    def test_exact_mode(self):
+        for user in ["1", "2", "2"]:
+            self._error(user)
+        Incidence.objects.update(users_affected=0)
+
+        with mock.patch.object(insider_settings, "EXACT_USERS_AFFECTED", True):
+            self.assertEqual(self._list()[0]["users_affected"], 2)
+        self.assertEqual(self._list()[0]["users_affected"], 0)
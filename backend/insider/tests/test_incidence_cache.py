@@ -0,0 +1,78 @@
+from unittest import mock
+from django.test import TestCase
+from insider.models import Footprint, Incidence
+from insider.services.footprint import save_footprint
+from insider.services.incidence_cache import IncidenceCache, CachedIncidence, incidence_cache
+from insider.settings import settings as insider_settings
+
+
+class IncidenceCacheTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        incidence_cache.clear()
+        self.counter = 0
+
+    def tearDown(self):
+        incidence_cache.clear()
+
+    def _error_data(self):
+        self.counter += 1
+        return {
+            "__db_alias": insider_settings.DB_ALIAS,
+            "request_id": f"cache-req-{self.counter}",
+            "request_user": "anonymous",
+            "request_path": "/boom/",
+            "request_method": "get",
+            "status_code": 500,
+            "response_time": 12.0,
+            "db_query_count": 1,
+        }
+
+    def test_lru_eviction_and_ttl(self):
+        cache = IncidenceCache(max_size=2, ttl=60)
+        cache.set("a", CachedIncidence(1, "OPEN", None))
+        cache.set("b", CachedIncidence(2, "OPEN", None))
+        cache.get("a")
+        cache.set("c", CachedIncidence(3, "OPEN", None))
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"), "Least recently used entry was not evicted.")
+
+        with mock.patch("insider.services.incidence_cache.time.monotonic", return_value=10 ** 9):
+            self.assertIsNone(cache.get("a"), "Expired entry was served.")
+
+    def test_repeat_occurrence_skips_reads(self):
+        save_footprint(self._error_data())
+        incidence = Incidence.objects.get()
+
+        # One conditional UPDATE on the incidence plus the footprint INSERT, in
+        # one transaction (a savepoint here, inside the test's transaction).
+        with self.assertNumQueries(4, using=insider_settings.DB_ALIAS):
+            save_footprint(self._error_data())
+
+        incidence.refresh_from_db()
+        self.assertEqual(incidence.occurrence_count, 2)
+        self.assertEqual(
+            Footprint.objects.filter(incidence=incidence).count(), 2
+        )
+
+    def test_status_change_elsewhere_falls_back_to_lookup(self):
+        save_footprint(self._error_data())
+        incidence = Incidence.objects.get()
+
+        # Resolved by another process: the cached 'OPEN' entry must not be trusted.
+        Incidence.objects.filter(id=incidence.id).update(status='RESOLVED')
+        save_footprint(self._error_data())
+
+        incidence.refresh_from_db()
+        self.assertEqual(incidence.status, 'OPEN', "Regression did not re-open the incidence.")
+        self.assertEqual(incidence.occurrence_count, 2)
+
+    def test_invalidate_ids(self):
+        save_footprint(self._error_data())
+        incidence = Incidence.objects.get()
+        self.assertEqual(len(incidence_cache), 1)
+
+        incidence_cache.invalidate_ids([str(incidence.id)])
+        self.assertEqual(len(incidence_cache), 0)
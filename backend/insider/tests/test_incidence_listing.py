@@ -0,0 +1,80 @@
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from insider.api.views import IncidenceViewSet
+from insider.models import Incidence, IncidenceStatusCount
+from insider.services import retention, status_counts
+from insider.settings import settings as insider_settings
+
+INCIDENCES = IncidenceViewSet.as_view({"get": "list"})
+
+
+class IncidenceListingTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("staff", password="x", is_staff=True)
+        for n, users in enumerate([3, 1, 2]):
+            Incidence.objects.create(
+                title=f"Boom {n}", fingerprint=f"listing-{n}", occurrence_count=10 - n, users_affected=users
+            )
+
+    def _get(self, view=INCIDENCES, **params):
+        request = APIRequestFactory().get("/insider/api/incidences/", params)
+        force_authenticate(request, user=self.user)
+        return view(request)
+
+    def counts(self):
+        return status_counts.counts(insider_settings.DB_ALIAS)
+
+    def test_unpaginated_by_default(self):
+        response = self._get()
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 3)
+
+    def test_pages_sort_and_filter(self):
+        response = self._get(page=1, page_size=2, ordering="-users_affected")
+        self.assertEqual([row["title"] for row in response.data["results"]], ["Boom 0", "Boom 2"])
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(response.data["status_counts"], {"OPEN": 3, "RESOLVED": 0, "IGNORED": 0})
+        self.assertIsNotNone(response.data["next"])
+
+        response = self._get(page=1, ordering="occurrence_count", status="open")
+        self.assertEqual([row["title"] for row in response.data["results"]], ["Boom 2", "Boom 1", "Boom 0"])
+
+        response = self._get(page=1, last_seen_after=(timezone.now() + timedelta(hours=1)).isoformat())
+        self.assertEqual(response.data["count"], 0)
+
+        self.assertEqual(self._get(ordering="title").status_code, 400)
+        self.assertEqual(self._get(status="LOST").status_code, 400)
+
+    def test_total_comes_from_the_counters(self):
+        IncidenceStatusCount.objects.filter(status="OPEN").update(count=42)
+        self.assertEqual(self._get(page=1, status="OPEN").data["count"], 42)
+        # Other filters are counted.
+        self.assertEqual(self._get(page=1, filter="new").data["count"], 3)
+
+    def test_counters_follow_status_changes_and_deletes(self):
+        ids = list(Incidence.objects.values_list("pk", flat=True))
+        request = APIRequestFactory().post("/insider/api/incidences/bulk_resolve/", {"ids": ids[:2]}, format="json")
+        force_authenticate(request, user=self.user)
+        IncidenceViewSet.as_view({"post": "bulk_resolve"})(request)
+        self.assertEqual(self.counts(), {"OPEN": 1, "RESOLVED": 2, "IGNORED": 0})
+
+        # Moving rows already in the target status changes nothing.
+        status_counts.move(Incidence.objects.filter(pk__in=ids), "RESOLVED", insider_settings.DB_ALIAS)
+        status_counts.move(Incidence.objects.filter(pk__in=ids), "RESOLVED", insider_settings.DB_ALIAS)
+        self.assertEqual(self.counts(), {"OPEN": 0, "RESOLVED": 3, "IGNORED": 0})
+
+        Incidence.objects.get(pk=ids[0]).delete()
+        Incidence.objects.filter(pk=ids[1]).update(last_seen=timezone.now() - timedelta(days=400))
+        with mock.patch.object(insider_settings, "INCIDENCE_RETENTION_DAYS", 7):
+            retention.cleanup_incidences(insider_settings.DB_ALIAS, batch_size=10, pause=0)
+        self.assertEqual(self.counts(), {"OPEN": 0, "RESOLVED": 1, "IGNORED": 0})
+        self.assertEqual(self.counts(), status_counts.rebuild(insider_settings.DB_ALIAS))
+
+        response = self._get(IncidenceViewSet.as_view({"get": "counts"}))
+        self.assertEqual(response.data, {"OPEN": 0, "RESOLVED": 1, "IGNORED": 0})
@@ -0,0 +1,65 @@
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from insider.api.pagination import KeysetPagination
+from insider.api.views import FootprintViewSet
+from insider.models import Footprint
+from insider.settings import settings as insider_settings
+
+
+class KeysetPaginationTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("staff", password="x", is_staff=True)
+        now = timezone.now()
+        for n in range(7):
+            footprint = Footprint.objects.create(request_path=f"/page/{n}/", request_method="get", status_code=200)
+            # Pairs of footprints share a timestamp, so ties are broken by id.
+            Footprint.objects.filter(pk=footprint.pk).update(created_at=now - timedelta(seconds=n // 2))
+        self.expected = list(Footprint.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def _get(self, url="/insider/api/footprints/", **params):
+        request = APIRequestFactory().get(url, params)
+        force_authenticate(request, user=self.user)
+        return FootprintViewSet.as_view({"get": "list"})(request)
+
+    def _ids(self, response):
+        return [row["id"] for row in response.data["results"]]
+
+    def test_walks_forward_and_back(self):
+        response = self._get(cursor="", page_size=3)
+        pages = [self._ids(response)]
+        self.assertIsNone(response.data["previous"])
+        self.assertNotIn("count", response.data)
+
+        while response.data["next"]:
+            response = self._get(response.data["next"])
+            pages.append(self._ids(response))
+        self.assertEqual(pages, [self.expected[0:3], self.expected[3:6], self.expected[6:]])
+
+        response = self._get(response.data["previous"])
+        self.assertEqual(self._ids(response), self.expected[3:6])
+        response = self._get(response.data["previous"])
+        self.assertEqual(self._ids(response), self.expected[0:3])
+        self.assertIsNone(response.data["previous"])
+
+    def test_counts(self):
+        response = self._get(cursor="", count="exact")
+        self.assertEqual((response.data["count"], response.data["count_exact"]), (7, True))
+
+        with mock.patch.object(KeysetPagination, "count_cap", 5):
+            response = self._get(cursor="", count="estimate")
+        self.assertEqual(response.data["count"], 5)
+        self.assertFalse(response.data["count_exact"])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self._get(cursor="not-a-cursor").status_code, 404)
+
+    def test_page_numbers_stay_the_default(self):
+        response = self._get(page=2, page_size=5)
+        self.assertEqual(response.data["count"], 7)
+        self.assertEqual(len(response.data["results"]), 2)
@@ -0,0 +1,107 @@
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.http import QueryDict
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+from insider.api import live
+from insider.api.views import LiveView
+from insider.models import Footprint, Incidence
+from insider.services import status_counts, watermark
+from insider.settings import settings as insider_settings
+
+
+def footprint(path, status_code=200):
+    return Footprint.objects.create(request_path=path, request_method="GET", status_code=status_code)
+
+
+class LiveHubTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        self.hub = live.LiveHub(threaded=False)
+
+    def test_filtered_footprints_share_one_query_per_filter(self):
+        errors = [self.hub.subscribe(QueryDict("status_code__in=500")) for _ in range(3)]
+        everything = self.hub.subscribe(QueryDict(""))
+        footprint("/ok/")
+        failed = footprint("/boom/", status_code=500)
+
+        # New ids, changed incidences, status counts, then one query per distinct filter.
+        with self.assertNumQueries(5, using=insider_settings.DB_ALIAS):
+            self.hub.dispatch()
+
+        for subscriber in errors:
+            self.assertEqual([(e, data["request_path"], pk) for e, data, pk in subscriber.drain()],
+                             [("footprint", "/boom/", failed.pk)])
+        self.assertEqual(len(everything.drain()), 2)
+
+        self.hub.dispatch()
+        self.assertEqual(everything.drain(), [])
+
+    def test_incidence_changes(self):
+        subscriber = self.hub.subscribe(QueryDict(""))
+        incidence = Incidence.objects.create(title="Boom", fingerprint="live-hash")
+        self.hub.dispatch()
+
+        events = subscriber.drain()
+        self.assertEqual([(e, data.get("id")) for e, data, _ in events[:1]], [("incidence", incidence.pk)])
+        self.assertEqual(events[1][:2], ("incidences", {"OPEN": 1, "RESOLVED": 0, "IGNORED": 0}))
+
+        status_counts.move(Incidence.objects.filter(pk=incidence.pk), "RESOLVED", insider_settings.DB_ALIAS)
+        self.hub.dispatch()
+        self.assertEqual([data for _, data, _ in subscriber.drain()], [{"OPEN": 0, "RESOLVED": 1, "IGNORED": 0}])
+
+    def test_slow_subscriber_queue_is_bounded(self):
+        with mock.patch.object(insider_settings, "LIVE_QUEUE_SIZE", 2):
+            subscriber = self.hub.subscribe(QueryDict(""))
+        for n in range(5):
+            footprint(f"/{n}/")
+        self.hub.dispatch()
+
+        events = subscriber.drain()
+        self.assertEqual(events[0], ("overflow", {"dropped": 3}, None))
+        self.assertEqual([data["request_path"] for _, data, _ in events[1:]], ["/3/", "/4/"])
+
+    def test_watermark_bump_wakes_the_hub(self):
+        self.assertIn(live.hub.publish, watermark._listeners)
+        listener = mock.Mock()
+        with mock.patch.object(watermark, "_listeners", [listener]):
+            watermark.bump()
+        listener.assert_called_once_with("data")
+
+
+class LiveViewTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("staff", password="x", is_staff=True)
+        self.hub = live.LiveHub(threaded=False)
+        patcher = mock.patch.object(live, "hub", self.hub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _get(self, **params):
+        request = APIRequestFactory().get("/insider/api/live/", params, HTTP_ACCEPT="text/event-stream")
+        force_authenticate(request, user=self.user)
+        return LiveView.as_view()(request)
+
+    def test_event_stream(self):
+        response = self._get(status_code__in="500")
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+
+        stream = iter(response.streaming_content)
+        self.assertEqual(next(stream), b"retry: 5000\n\n")
+
+        failed = footprint("/boom/", status_code=500)
+        self.hub.dispatch()
+        frame = next(stream).decode()
+        self.assertTrue(frame.startswith(f"event: footprint\nid: {failed.pk}\ndata: {{"))
+
+        response.close()
+        self.assertEqual(self.hub.subscribers, set())
+
+    def test_invalid_filter(self):
+        response = self._get(created_after="yesterday")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.hub.subscribers, set())
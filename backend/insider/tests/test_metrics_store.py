@@ -0,0 +1,107 @@
+import shutil
+import tempfile
+import unittest
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from insider.api.views import DashboardStatsView
+from insider.services import metrics_store
+from insider.sinks import build_sink
+from insider.settings import settings as insider_settings
+
+
+@unittest.skipIf(metrics_store.np is None, "numpy is not installed")
+class MetricsStoreTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="insider-metrics-")
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.now = timezone.now()
+
+    def _data(self, status=200, response_time=10.0, path="/orders/1/"):
+        return {
+            "request_path": path, "request_method": "get", "status_code": status,
+            "response_time": response_time, "db_query_count": 2,
+        }
+
+    def test_sink_appends_and_aggregates(self):
+        sink = build_sink({"type": "metrics", "directory": self.directory})
+        sink.write(self._data(response_time=50.0))
+        sink.write_batch([self._data(status=500, response_time=150.0), self._data(status=404, path="/users/9/")])
+        sink.flush()
+
+        # A fresh reader (e.g. the web process) sees what the writer committed.
+        store = metrics_store.MetricsStore(self.directory)
+        since = self.now - timedelta(minutes=1)
+
+        totals = store.window_totals(since)
+        self.assertEqual((totals["total"], totals["errors_500"], totals["errors_400"]), (3, 1, 1))
+        self.assertAlmostEqual(totals["avg_response_time"], 70.0)
+
+        self.assertAlmostEqual(store.latency_percentiles(since, route="/orders/{id}/")["p99"], 150.0, delta=1.5)
+        endpoints = store.endpoint_latencies(since)
+        self.assertEqual([(e["route"], e["count"]) for e in endpoints], [("/orders/{id}/", 2), ("/users/{id}/", 1)])
+
+        series = store.time_series(since, self.now + timedelta(minutes=1), bucket_seconds=60)
+        self.assertEqual(sum(series["total"]), 3)
+        self.assertEqual(sum(series["errors_500"]) + sum(series["errors_400"]), 2)
+        self.assertEqual(len(series["time"]), len(series["p95_response_time_ms"]))
+
+        self.assertEqual(store.window_totals(self.now + timedelta(minutes=5))["total"], 0)
+
+    def test_segments_roll_over_and_expire(self):
+        store = metrics_store.MetricsStore(self.directory, segment_rows=4)
+        old = int((self.now - timedelta(days=40)).timestamp() * 1000)
+        store.append_columns(
+            {"ts": [old] * 4, "route": [0] * 4, "status": [200] * 4, "latency": [1.0] * 4, "queries": [0] * 4},
+            [("/a/", "get")],
+        )
+        store.append([self._data()])
+
+        self.assertEqual(len(store.segments()), 2)
+        self.assertEqual(len(store.drop_before(self.now - timedelta(days=30))), 1)
+        self.assertEqual(store.window_totals(self.now - timedelta(days=60))["total"], 1)
+
+    def test_rows_keep_their_capture_time(self):
+        store = metrics_store.MetricsStore(self.directory)
+        store.append([self._data()])
+        # A replayed backlog from two hours ago goes to its own segment, still in time order.
+        late = [dict(self._data(), created_at=self.now - timedelta(hours=2, minutes=m)) for m in (0, 30)]
+        store.append(late)
+
+        self.assertEqual(len(store.segments()), 2)
+        window = store.time_series(self.now - timedelta(hours=3), self.now + timedelta(minutes=1), bucket_seconds=3600)
+        self.assertEqual(sum(window["total"]), 3)
+        self.assertEqual(store.window_totals(self.now - timedelta(minutes=1))["total"], 1)
+
+    def test_readers_see_rows_before_their_routes(self):
+        store = metrics_store.MetricsStore(self.directory)
+        store.append([self._data()])
+        reader = metrics_store.MetricsStore(self.directory)
+        reader.segments()
+        store.append([self._data(path="/users/7/")])
+
+        endpoints = reader.endpoint_latencies(self.now - timedelta(minutes=1))
+        self.assertEqual(len(endpoints), 2)
+
+        # A row whose route line isn't readable yet is left out rather than failing the query.
+        store.append([self._data(path="/carts/3/")])
+        with mock.patch.object(metrics_store.Segment, "refresh"):
+            endpoints = reader.endpoint_latencies(self.now - timedelta(minutes=1))
+        self.assertEqual(len(endpoints), 2)
+
+    def test_dashboard_backend(self):
+        store = metrics_store.MetricsStore(self.directory)
+        store.append([self._data(status=500), self._data()])
+
+        user = get_user_model().objects.create_user("staff", password="x", is_staff=True)
+        request = APIRequestFactory().get("/insider/api/dashboard/stats/")
+        force_authenticate(request, user=user)
+        with mock.patch.multiple(insider_settings, DASHBOARD_BACKEND="metrics", METRICS_DIR=self.directory):
+            response = DashboardStatsView.as_view()(request)
+
+        self.assertEqual(response.data["velocity"], {"total_24h": 2, "errors_500": 1, "errors_400": 0})
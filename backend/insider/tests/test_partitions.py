@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from insider.models import Footprint
+from insider.services import partitions
+from insider.settings import settings as insider_settings
+from insider.tasks import cleanup_old_data
+
+
+class PartitionHelpersTest(SimpleTestCase):
+
+    def test_period_start_for_day_and_week(self):
+        moment = datetime(2026, 3, 12, 17, 45, tzinfo=dt_timezone.utc)  # a Thursday
+
+        self.assertEqual(partitions.period_start(moment, "day"), datetime(2026, 3, 12, tzinfo=dt_timezone.utc))
+        self.assertEqual(partitions.period_start(moment, "week"), datetime(2026, 3, 9, tzinfo=dt_timezone.utc))
+
+        with self.assertRaises(ValueError):
+            partitions.period_start(moment, "month")
+
+    def test_partition_names_and_bounds(self):
+        start = datetime(2026, 3, 9, tzinfo=dt_timezone.utc)
+        self.assertEqual(partitions.partition_name(start), "insider_footprint_p20260309")
+
+        bound = "FOR VALUES FROM ('2026-03-09 00:00:00+00') TO ('2026-03-10 00:00:00+00')"
+        self.assertEqual(partitions.partition_upper_bound(bound), datetime(2026, 3, 10, tzinfo=dt_timezone.utc))
+        self.assertIsNone(partitions.partition_upper_bound("DEFAULT"))
+
+
+class PartitionFallbackTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def test_non_postgres_keeps_row_deletes(self):
+        connection = connections[insider_settings.DB_ALIAS]
+        if partitions.supports_partitioning(connection):
+            self.skipTest("Row-delete fallback only applies to non-PostgreSQL backends.")
+
+        old = Footprint.objects.create(request_id="old", request_path="/", request_method="get", status_code=200)
+        Footprint.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=365))
+        Footprint.objects.create(request_id="new", request_path="/", request_method="get", status_code=200)
+
+        self.assertFalse(partitions.is_partitioned(connection))
+        cleanup_old_data()
+        self.assertEqual(list(Footprint.objects.values_list("request_id", flat=True)), ["new"])
+
+        with self.assertRaises(CommandError):
+            call_command("insider_partitions", interval="day")
@@ -0,0 +1,85 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from insider.models import Footprint, FootprintPayload
+from insider.services import retention
+from insider.sinks.orm import ORMSink
+from insider.api.serializers import FootprintDetailSerializer, FootprintListSerializer
+from insider.settings import settings as insider_settings
+
+
+class FootprintPayloadTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def _create(self, **kwargs):
+        return Footprint.objects.create(request_path="/payload/", request_method="post", **kwargs)
+
+    def test_payload_is_stored_in_its_own_row(self):
+        footprint = self._create(request_body={"q": 1}, stack_trace=[{"line": 3}], status_code=500)
+
+        payload = FootprintPayload.objects.get(footprint_id=footprint.pk)
+        self.assertEqual(payload.request_body, {"q": 1})
+
+        footprint = Footprint.objects.get(pk=footprint.pk)
+        self.assertEqual(footprint.stack_trace, [{"line": 3}])
+        self.assertIsNone(footprint.response_body)
+
+    def test_footprint_without_payload_has_no_payload_row(self):
+        footprint = self._create(status_code=200)
+
+        self.assertFalse(FootprintPayload.objects.filter(footprint_id=footprint.pk).exists())
+        self.assertIsNone(Footprint.objects.get(pk=footprint.pk).request_body)
+
+    def test_updating_payload(self):
+        footprint = self._create()
+        footprint.system_logs = ["started"]
+        footprint.save()
+
+        self.assertEqual(Footprint.objects.get(pk=footprint.pk).system_logs, ["started"])
+
+    def test_bulk_written_footprints_keep_their_payload(self):
+        batch = [
+            {
+                "__db_alias": insider_settings.DB_ALIAS,
+                "request_id": f"payload-req-{n}",
+                "request_path": "/payload/",
+                "request_method": "get",
+                "status_code": 200,
+                "response_body": {"n": n} if n % 2 else None,
+            }
+            for n in range(4)
+        ]
+        ORMSink().write_batch(batch)
+
+        self.assertEqual(FootprintPayload.objects.count(), 2)
+        self.assertEqual(Footprint.objects.get(request_id="payload-req-3").response_body, {"n": 3})
+
+    def test_serializers_include_payload(self):
+        footprint = self._create(request_body={"q": 1}, stack_trace=[{"line": 3}], status_code=500)
+
+        detail = FootprintDetailSerializer(Footprint.objects.select_related('payload').get(pk=footprint.pk)).data
+        self.assertEqual(detail["request_body"], {"q": 1})
+        self.assertEqual(detail["stack_trace"], [{"line": 3}])
+
+        listed = FootprintListSerializer(Footprint.objects.get(pk=footprint.pk)).data
+        self.assertEqual(listed["stack_trace"], [{"line": 3}])
+
+    def test_retention_deletes_payloads(self):
+        expired = self._create(request_body={"old": True})
+        fresh = self._create(request_body={"new": True})
+        Footprint.objects.filter(pk=expired.pk).update(
+            created_at=timezone.now() - timedelta(days=insider_settings.DATA_RETENTION_DAYS + 1)
+        )
+
+        retention.cleanup_footprints(insider_settings.DB_ALIAS, pause=0)
+
+        self.assertFalse(FootprintPayload.objects.filter(footprint_id=expired.pk).exists())
+        self.assertTrue(FootprintPayload.objects.filter(footprint_id=fresh.pk).exists())
+
+    def test_orphan_payload_sweep(self):
+        orphan = self._create(request_body={"old": True})
+        kept = self._create(request_body={"new": True})
+        Footprint.objects.filter(pk=orphan.pk)._raw_delete(insider_settings.DB_ALIAS)
+
+        self.assertEqual(retention.delete_orphan_payloads(insider_settings.DB_ALIAS), 1)
+        self.assertEqual(list(FootprintPayload.objects.values_list('footprint_id', flat=True)), [kept.pk])
@@ -0,0 +1,89 @@
+import unittest
+from datetime import timedelta
+from django.db import connections, transaction
+from django.test import TestCase
+from django.utils import timezone
+from insider.models import Footprint, Incidence
+from insider.settings import settings as insider_settings
+
+
+class FootprintQueryPlanTest(TestCase):
+    """
+    EXPLAINs the hot footprint queries and asserts they are served by an index
+    instead of a full table scan.
+    """
+
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        self.connection = connections[insider_settings.DB_ALIAS]
+        if self.connection.vendor not in ('sqlite', 'postgresql'):
+            raise unittest.SkipTest(f"No plan assertions for {self.connection.vendor}.")
+
+        self.incidence = Incidence.objects.create(title="Boom", fingerprint="plan-hash")
+        for n in range(20):
+            Footprint.objects.create(
+                request_id=f"plan-{n}",
+                request_path="/plan/",
+                request_method="get",
+                request_user=str(n % 3),
+                status_code=500 if n % 4 == 0 else 200,
+                incidence=self.incidence if n % 4 == 0 else None,
+            )
+
+    def assertUsesIndex(self, queryset, index_name=None):
+        with transaction.atomic(using=self.connection.alias):
+            if self.connection.vendor == 'postgresql':
+                # Tiny test tables always favour a seq scan; ask whether an index *can* serve the query.
+                with self.connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+
+        if self.connection.vendor == 'sqlite':
+            self.assertNotRegex(plan, r"SCAN (TABLE )?insider_footprint(?! USING)", f"Full scan:\n{plan}")
+            self.assertIn("INDEX", plan, f"No index used:\n{plan}")
+        else:
+            self.assertNotIn("Seq Scan on insider_footprint", plan, f"Full scan:\n{plan}")
+
+        if index_name:
+            self.assertIn(index_name, plan)
+
+    def test_dashboard_window_queries(self):
+        recent = Footprint.objects.filter(created_at__gte=timezone.now() - timedelta(hours=24))
+
+        self.assertUsesIndex(recent.values('id'), 'insider_fp_created_stat_idx')
+        self.assertUsesIndex(recent.filter(status_code__gte=500).values('id'))
+        self.assertUsesIndex(recent.filter(status_code__gte=400, status_code__lt=500).values('id'))
+
+    def test_keyset_page_query(self):
+        last = Footprint.objects.order_by('-created_at', '-id')[10]
+        page = Footprint.objects.filter(created_at__lte=last.created_at).exclude(
+            created_at=last.created_at, id__gte=last.pk
+        ).order_by('-created_at', '-id')[:51]
+
+        self.assertUsesIndex(page)
+
+    def test_breadcrumbs_query(self):
+        now = timezone.now()
+        breadcrumbs = Footprint.objects.filter(
+            request_user="1",
+            created_at__gte=now - timedelta(minutes=5),
+            created_at__lt=now,
+        ).order_by('-created_at')[:10]
+
+        self.assertUsesIndex(breadcrumbs, 'insider_fp_user_idx')
+
+    def test_incidence_recent_occurrences_query(self):
+        recent = self.incidence.footprint_set.all().order_by('-created_at')[:20]
+        self.assertUsesIndex(recent, 'insider_fp_incidence_idx')
+
+    def test_retention_cleanup_query(self):
+        expired = Footprint.objects.filter(created_at__lt=timezone.now() - timedelta(days=30))
+        self.assertUsesIndex(expired.values('id'))
+
+    def test_incidence_tab_queries(self):
+        tab = Incidence.objects.filter(status__in=['OPEN'])
+        self.assertUsesIndex(tab.order_by('-last_seen', '-id')[:50], 'insider_inc_status_seen_idx')
+        self.assertUsesIndex(tab.order_by('-occurrence_count', '-id')[:50], 'insider_inc_status_count_idx')
+        self.assertUsesIndex(tab.order_by('-users_affected', '-id')[:50], 'insider_inc_status_users_idx')
+        self.assertUsesIndex(Incidence.objects.order_by('-last_seen', '-id')[:50], 'insider_inc_seen_idx')
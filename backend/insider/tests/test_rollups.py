@@ -0,0 +1,171 @@
+import importlib
+from datetime import timedelta
+from unittest import mock
+from django.apps import apps as django_apps
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from insider.api.views import DashboardStatsView, TimeSeriesView
+from insider.models import Footprint, FootprintRollup
+from insider import sketch
+from insider.services import rollups
+from insider.sketch import LatencySketch
+from insider.services.footprint import save_footprint
+from insider.settings import settings as insider_settings
+from utils import start_without_rollups
+
+
+class RollupTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        self.db_alias = insider_settings.DB_ALIAS
+        self.now = timezone.now()
+        start_without_rollups(self.db_alias)
+
+        # Start from an empty per-process buffer, whatever earlier tests left in it.
+        patcher = mock.patch.object(rollups, "rollup_buffer", rollups.RollupBuffer())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _data(self, n, status=200, response_time=10.0, path="/orders/1/"):
+        return {
+            "__db_alias": self.db_alias,
+            "request_id": f"rollup-{n}",
+            "request_path": path,
+            "request_method": "get",
+            "status_code": status,
+            "response_time": response_time,
+            "db_query_count": 2,
+        }
+
+    def test_upserts_are_additive(self):
+        key = (rollups.bucket_start(self.now), "/orders/{id}/", "get", 2)
+
+        rollups.upsert_rollups({key: [2, 0, 30.0, 10.0, 20.0, 4, LatencySketch.of([10.0, 20.0])]}, self.db_alias)
+        rollups.upsert_rollups({key: [1, 0, 50.0, 50.0, 50.0, 1, LatencySketch.of([50.0])]}, self.db_alias)
+
+        row = FootprintRollup.objects.get()
+        self.assertEqual((row.count, row.latency_sum, row.latency_min, row.latency_max, row.db_query_sum), (3, 80.0, 10.0, 50.0, 5))
+        self.assertEqual(LatencySketch.from_bytes(row.latency_sketch).total, 3)
+
+    def test_ingestion_feeds_rollups(self):
+        with mock.patch.object(insider_settings, "ROLLUP_FLUSH_INTERVAL", 0):
+            save_footprint(self._data(1, response_time=10.0, path="/orders/1/"))
+            save_footprint(self._data(2, response_time=30.0, path="/orders/2/"))
+            save_footprint(self._data(3, status=503, response_time=500.0))
+
+        rows = {(r.route, r.status_class): r for r in FootprintRollup.objects.all()}
+        self.assertEqual(rows[("/orders/{id}/", 2)].count, 2)
+        self.assertEqual(rows[("/orders/{id}/", 5)].error_count, 1)
+
+        totals = rollups.window_totals(self.now - timedelta(hours=1))
+        self.assertEqual((totals["total"], totals["errors_500"], totals["errors_400"]), (3, 1, 0))
+        self.assertAlmostEqual(totals["avg_response_time"], 180.0)
+
+    def test_buffer_flushes_in_one_upsert(self):
+        with mock.patch.object(insider_settings, "ROLLUP_FLUSH_INTERVAL", 3600):
+            for n in range(5):
+                save_footprint(self._data(n))
+            self.assertFalse(FootprintRollup.objects.exists())
+            rollups.rollup_buffer.flush()
+
+        self.assertEqual(FootprintRollup.objects.get().count, 5)
+
+    def test_compaction_and_rebuild_keep_totals(self):
+        for n, days_old in enumerate([0, 1, 3, 3, 20]):
+            fp = Footprint.objects.create(**{k: v for k, v in self._data(n, status=404 if n == 2 else 200).items() if k != "__db_alias"})
+            Footprint.objects.filter(pk=fp.pk).update(created_at=self.now - timedelta(days=days_old, minutes=n))
+
+        rollups.rebuild_rollups(self.db_alias, since=self.now - timedelta(days=30), now=self.now)
+
+        resolutions = set(FootprintRollup.objects.values_list("resolution", flat=True))
+        self.assertEqual(resolutions, {"minute", "hour", "day"})
+
+        totals = rollups.window_totals(self.now - timedelta(days=30))
+        self.assertEqual((totals["total"], totals["errors_400"]), (5, 1))
+
+        # Compacting again moves nothing and counts nothing twice.
+        rollups.compact_rollups(self.db_alias, now=self.now)
+        self.assertEqual(rollups.window_totals(self.now - timedelta(days=30))["total"], 5)
+
+    def test_upgrade_backfills_recent_rollups(self):
+        backfill = importlib.import_module("insider.migrations.0017_backfill_rollups").backfill_rollups
+        for n, hours_old in enumerate([1, 2, 72]):
+            fp = Footprint.objects.create(**{k: v for k, v in self._data(n).items() if k != "__db_alias"})
+            Footprint.objects.filter(pk=fp.pk).update(created_at=self.now - timedelta(hours=hours_old))
+
+        backfill(django_apps, mock.Mock(connection=connections[self.db_alias]))
+
+        self.assertEqual(rollups.window_totals(self.now - timedelta(days=30))["total"], 2)
+        self.assertEqual(sum(LatencySketch.from_bytes(r.latency_sketch).total for r in FootprintRollup.objects.all()), 2)
+
+    def test_expired_days_are_dropped(self):
+        for days_old in (0, 31, 40):
+            key = (rollups.bucket_start(self.now - timedelta(days=days_old), "day"), "/a/", "get", 2)
+            rollups.upsert_rollups({key: [1, 0, 10.0, 10.0, 10.0, 0, LatencySketch.of([10.0])]}, self.db_alias, resolution="day")
+
+        self.assertEqual(rollups.expire_rollups(self.db_alias, self.now - timedelta(days=30)), 2)
+        self.assertEqual(rollups.window_totals(self.now - timedelta(days=60))["total"], 1)
+
+    def test_dashboard_reads_rollups(self):
+        key = (rollups.bucket_start(self.now - timedelta(hours=2)), "/a/", "get", 5)
+        rollups.upsert_rollups({key: [4, 4, 400.0, 50.0, 150.0, 0, LatencySketch.of([50.0, 50.0, 150.0, 150.0])]}, self.db_alias)
+
+        user = get_user_model().objects.create_user("staff", password="x", is_staff=True)
+        request = APIRequestFactory().get("/insider/api/dashboard/stats/")
+        force_authenticate(request, user=user)
+        response = DashboardStatsView.as_view()(request)
+
+        self.assertEqual(response.data["velocity"], {"total_24h": 4, "errors_500": 4, "errors_400": 0})
+        self.assertEqual(response.data["health"]["avg_response_time_ms"], 100.0)
+        self.assertAlmostEqual(response.data["health"]["p50_response_time_ms"], 50.0, delta=1.0)
+        self.assertAlmostEqual(response.data["health"]["p99_response_time_ms"], 150.0, delta=1.5)
+
+    def test_time_series(self):
+        start = rollups.bucket_start(self.now - timedelta(hours=3), "hour")
+        rows = {
+            (start + timedelta(minutes=5), "/a/", "get", 2): [3, 0, 30.0, 10.0, 10.0, 0, LatencySketch.of([10.0] * 3)],
+            (start + timedelta(minutes=50), "/a/", "get", 5): [1, 1, 90.0, 90.0, 90.0, 0, LatencySketch.of([90.0])],
+            (start + timedelta(hours=2), "/b/", "post", 4): [2, 2, 40.0, 20.0, 20.0, 0, LatencySketch.of([20.0] * 2)],
+        }
+        rollups.upsert_rollups(rows, self.db_alias)
+
+        series = rollups.time_series(start, self.now, bucket_seconds=3600)
+        self.assertEqual(series["time"][:3], [int(start.timestamp()) + n * 3600 for n in range(3)])
+        self.assertEqual(series["total"][:3], [4, 0, 2])
+        self.assertEqual(series["errors_500"][:3], [1, 0, 0])
+        self.assertEqual(series["errors_400"][:3], [0, 0, 2])
+        self.assertEqual(series["avg_response_time_ms"][:3], [30.0, 0.0, 20.0])
+        self.assertAlmostEqual(series["p99_response_time_ms"][0], 90.0, delta=1.0)
+        self.assertIsNone(series["p50_response_time_ms"][1])
+
+        user = get_user_model().objects.create_user("staff", password="x", is_staff=True)
+        request = APIRequestFactory().get("/insider/api/dashboard/timeseries/", {"hours": 4, "bucket": 3600})
+        force_authenticate(request, user=user)
+        with mock.patch.object(insider_settings, "DASHBOARD_CACHE_SECONDS", 0):
+            response = TimeSeriesView.as_view()(request)
+
+        self.assertEqual(response.data["bucket_seconds"], 3600)
+        self.assertEqual(sum(response.data["total"]), 6)
+        self.assertEqual(len(response.data["time"]), len(response.data["p95_response_time_ms"]))
+
+        request = APIRequestFactory().get("/insider/api/dashboard/timeseries/", {"bucket": 90})
+        force_authenticate(request, user=user)
+        self.assertEqual(TimeSeriesView.as_view()(request).status_code, 400)
+
+    def test_percentiles_merge_across_buckets_and_resolutions(self):
+        # 1..1000 ms spread over many minute rows, half of them compacted into hours.
+        for n in range(1, 1001):
+            key = (rollups.bucket_start(self.now - timedelta(hours=n % 72, minutes=n % 60)), "/slow/", "get", 2)
+            rollups.upsert_rollups({key: [1, 0, float(n), float(n), float(n), 0, LatencySketch.of([float(n)])]}, self.db_alias)
+        rollups.compact_rollups(self.db_alias, now=self.now)
+
+        percentiles = rollups.latency_percentiles(self.now - timedelta(days=4))
+        for name, expected in (("p50", 500), ("p95", 950), ("p99", 990)):
+            self.assertAlmostEqual(percentiles[name], expected, delta=expected * sketch.RELATIVE_ACCURACY + 1)
+
+        [endpoint] = rollups.endpoint_latencies(self.now - timedelta(days=4))
+        self.assertEqual((endpoint["route"], endpoint["count"]), ("/slow/", 1000))
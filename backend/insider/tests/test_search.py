@@ -0,0 +1,115 @@
+import importlib
+import unittest
+from io import StringIO
+from datetime import timedelta
+from unittest import mock
+from django.apps import apps as django_apps
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase
+from django.utils import timezone
+from insider.api.filters import FootprintFilter
+from insider.models import Footprint, Incidence
+from insider.services import retention, search
+from insider.sinks.orm import ORMSink
+from insider.settings import settings as insider_settings
+
+
+class SearchIndexTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        self.db_alias = insider_settings.DB_ALIAS
+        if search.backend(self.db_alias) is None:
+            raise unittest.SkipTest("No full-text search index on this database.")
+
+    def _create(self, **kwargs):
+        return Footprint.objects.create(request_path="/search/", request_method="post", status_code=500, **kwargs)
+
+    def _search(self, value):
+        queryset = FootprintFilter({'global_search': value}, queryset=Footprint.objects.all()).qs
+        return sorted(queryset.values_list('pk', flat=True))
+
+    def _documents(self):
+        return Footprint.objects.filter(id__in=search.matching("needle", self.db_alias)).count()
+
+    def test_matches_words_and_prefixes_across_fields(self):
+        error = self._create(
+            exception_name="PaymentDeclined",
+            stack_trace=[{"file": "billing/charge.py", "line": 42, "function": "capture_funds"}],
+            system_logs=["retrying gateway call"],
+        )
+        body = self._create(response_body={"detail": "Upstream timeout talking to inventory"})
+
+        self.assertEqual(self._search("paymentdeclined"), [error.pk])
+        self.assertEqual(self._search("capture_funds"), [error.pk])
+        self.assertEqual(self._search("gateway retry"), [error.pk])
+        self.assertEqual(self._search("upstream TIME"), [body.pk])
+        self.assertEqual(self._search("timeout gateway"), [])
+
+    def test_bulk_written_and_updated_footprints_are_indexed(self):
+        ORMSink().write_batch([{
+            "__db_alias": self.db_alias,
+            "request_id": "search-req-1",
+            "request_path": "/search/",
+            "request_method": "get",
+            "status_code": 200,
+            "request_body": {"query": "needle"},
+        }])
+        footprint = self._create(system_logs=["haystack"])
+        footprint.system_logs = ["needle found"]
+        footprint.save()
+
+        self.assertEqual(self._documents(), 2)
+        self.assertEqual(self._search("haystack"), [])
+
+    def test_deletes_follow_footprints(self):
+        incidence = Incidence.objects.create(title="Boom", fingerprint="search-hash", status="RESOLVED")
+        expired = self._create(system_logs=["needle"])
+        by_incidence = self._create(system_logs=["needle"], incidence=incidence)
+        self._create(system_logs=["needle"]).delete()
+        kept = self._create(system_logs=["needle"])
+
+        Footprint.objects.filter(pk=expired.pk).update(
+            created_at=timezone.now() - timedelta(days=insider_settings.DATA_RETENTION_DAYS + 1)
+        )
+        retention.cleanup_footprints(self.db_alias, pause=0)
+        retention._delete_payloads([incidence.pk], self.db_alias, by_incidence=True)
+        Footprint.objects.filter(pk=by_incidence.pk)._raw_delete(self.db_alias)
+
+        self.assertEqual(self._search("needle"), [kept.pk])
+        self.assertEqual(self._documents(), 1)
+
+    def test_missing_index_is_looked_up_again_after_migrating(self):
+        introspection = connections[self.db_alias].introspection
+        with mock.patch.dict(search._backends, clear=True):
+            with mock.patch.object(introspection, "table_names", return_value=[]) as table_names:
+                self.assertIsNone(search.backend(self.db_alias))
+                self.assertIsNone(search.backend(self.db_alias))
+            # Remembered, so ingestion doesn't introspect for every footprint...
+            self.assertEqual(table_names.call_count, 1)
+            self.assertIsNone(search.backend(self.db_alias))
+
+            # ...until migrations have run.
+            search.forget_backend(sender=None, using=self.db_alias)
+            self.assertIsNotNone(search.backend(self.db_alias))
+
+    def test_upgrade_backfills_the_index(self):
+        backfill = importlib.import_module("insider.migrations.0018_backfill_search_index").backfill_search_index
+        footprint = self._create(exception_name="LegacyError", request_body={"note": "needle"})
+        search.delete_before(None, self.db_alias)
+        self.assertEqual(self._search("needle"), [])
+
+        backfill(django_apps, mock.Mock(connection=connections[self.db_alias]))
+
+        self.assertEqual(self._search("needle legacyerror"), [footprint.pk])
+
+    def test_rebuild_and_fallback(self):
+        with mock.patch.object(insider_settings, 'SEARCH_INDEX', False):
+            footprint = self._create(request_body={"note": "needle in the haystack"})
+            # Without the index global search scans for the substring.
+            self.assertEqual(self._search("edle in"), [footprint.pk])
+
+        self.assertEqual(self._search("needle"), [])
+        call_command('insider_search', rebuild=True, database=self.db_alias, stdout=StringIO())
+        self.assertEqual(self._search("needle"), [footprint.pk])
@@ -0,0 +1,109 @@
+import io
+import os
+import json
+import shutil
+import tempfile
+from unittest import mock
+from django.db.models import Sum
+from django.test import TestCase
+from insider.models import Footprint, FootprintRollup, Incidence
+from insider.services.footprint import save_footprint
+from insider.sinks import build_sink
+from insider.sinks.ndjson import NDJSONFileSink, StdoutSink
+from insider.settings import settings as insider_settings
+from utils import start_without_rollups
+
+
+class SinkTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix="insider-sinks-")
+        self.path = os.path.join(self.tmp_dir, "footprints.ndjson")
+        start_without_rollups(insider_settings.DB_ALIAS)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _data(self, n, status=200):
+        return {
+            "__db_alias": insider_settings.DB_ALIAS,
+            "request_id": f"sink-req-{n}",
+            "request_user": "anonymous",
+            "request_path": "/sinks/",
+            "request_method": "get",
+            "status_code": status,
+            "response_time": 1.0,
+            "db_query_count": 0,
+        }
+
+    def _lines(self, path):
+        with open(path, "rb") as handle:
+            return [json.loads(line) for line in handle]
+
+    def test_ndjson_sink_buffers_and_rotates(self):
+        sink = NDJSONFileSink(path=self.path, max_bytes=400, backup_count=2)
+        for n in range(6):
+            sink.write(self._data(n))
+        sink.flush()
+
+        self.assertTrue(os.path.exists(self.path + ".1"), "File was not rotated.")
+        self.assertFalse(os.path.exists(self.path + ".3"), "backup_count was not respected.")
+
+        line = self._lines(self.path + ".1")[0]
+        self.assertIn("created_at", line)
+        self.assertNotIn("__db_alias", line)
+
+    def test_ndjson_sink_flushes_when_idle(self):
+        sink = NDJSONFileSink(path=self.path, flush_interval=0.05)
+        sink.write(self._data(1))
+        self.assertEqual(os.path.getsize(self.path), 0, "Line was not buffered.")
+
+        sink._timer.join(5)
+        self.assertEqual([r["request_id"] for r in self._lines(self.path)], ["sink-req-1"])
+        self.assertIsNone(sink._timer)
+
+    def test_stdout_sink(self):
+        stream = io.TextIOWrapper(io.BytesIO())
+        with mock.patch("sys.stdout", stream):
+            StdoutSink().write(self._data(1))
+            stream.seek(0)
+            self.assertEqual(json.loads(stream.read())["request_id"], "sink-req-1")
+
+    def test_fan_out_keeps_incidences_for_errors_only(self):
+        sinks = [
+            build_sink({"type": "orm", "min_status": 400}),
+            build_sink({"type": "ndjson", "path": self.path}),
+        ]
+
+        with mock.patch("insider.services.footprint.get_sinks", return_value=sinks):
+            save_footprint(self._data(1))
+            save_footprint(self._data(2, status=500))
+        sinks[1].flush()
+
+        self.assertEqual(list(Footprint.objects.values_list("request_id", flat=True)), ["sink-req-2"])
+        self.assertEqual(Incidence.objects.count(), 1)
+        self.assertEqual([r["request_id"] for r in self._lines(self.path)], ["sink-req-1", "sink-req-2"])
+
+    def test_failing_footprint_does_not_cost_the_batch(self):
+        batch = [self._data(1), self._data(2, status=500), self._data(3, status=500), self._data(4)]
+        batch[2]["request_path"] = None  # NOT NULL column
+
+        with mock.patch.object(Footprint.objects, "bulk_create", side_effect=ValueError("bad row")):
+            written = build_sink({"type": "orm"}).write_batch(batch)
+
+        self.assertEqual(written, 3)
+        self.assertEqual(
+            sorted(Footprint.objects.values_list("request_id", flat=True)), ["sink-req-1", "sink-req-2", "sink-req-4"]
+        )
+        self.assertEqual(Incidence.objects.get().occurrence_count, 1)
+
+    def test_replayed_batch_is_not_stored_or_rolled_up_twice(self):
+        batch = [self._data(1), self._data(2), self._data(2)]
+        sink = build_sink({"type": "orm"})
+
+        self.assertEqual(sink.write_batch(batch), 2)
+        self.assertEqual(sink.write_batch(batch), 0)
+
+        self.assertEqual(Footprint.objects.count(), 2)
+        self.assertEqual(FootprintRollup.objects.aggregate(n=Sum("count"))["n"], 2)
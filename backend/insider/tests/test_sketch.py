@@ -0,0 +1,46 @@
+import random
+from django.test import SimpleTestCase
+from insider import sketch
+from insider.sketch import LatencySketch
+
+
+class LatencySketchTest(SimpleTestCase):
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.values = [rng.lognormvariate(3, 1.2) for _ in range(20000)]
+
+    def assertWithinAccuracy(self, estimate, exact):
+        self.assertLessEqual(abs(estimate - exact), exact * sketch.RELATIVE_ACCURACY * 1.01)
+
+    def test_quantiles_are_within_relative_accuracy(self):
+        ordered = sorted(self.values)
+        estimates = LatencySketch.of(self.values).quantiles([0.5, 0.95, 0.99])
+
+        for q, estimate in zip((0.5, 0.95, 0.99), estimates):
+            self.assertWithinAccuracy(estimate, ordered[int(q * len(ordered)) - 1])
+
+    def test_round_trip_and_merge_equal_one_sketch(self):
+        halves = [LatencySketch.of(self.values[:10000]), LatencySketch.of(self.values[10000:])]
+        blobs = [half.to_bytes() for half in halves]
+
+        merged = LatencySketch.from_bytes(blobs[0]).merge(LatencySketch.from_bytes(blobs[1]))
+        whole = LatencySketch.of(self.values)
+        self.assertEqual(merged.counts, whole.counts)
+        self.assertEqual(
+            sketch.dense_quantiles(sketch.merge_bytes(blobs + [None]), [0.5, 0.99]),
+            whole.quantiles([0.5, 0.99]),
+        )
+
+    def test_edge_values_and_wide_counts(self):
+        wide = LatencySketch()
+        wide.add(0.0)
+        wide.add(10 ** 9, count=70000)
+
+        restored = LatencySketch.from_bytes(wide.to_bytes())
+        self.assertEqual(restored.counts, wide.counts)
+        self.assertEqual(restored.quantiles([0.0])[0], sketch.MIN_VALUE)
+        self.assertEqual(LatencySketch().quantiles([0.5]), [None])
+
+        with self.assertRaises(sketch.SketchError):
+            LatencySketch.from_bytes(b"\x09\x02\x00\x00\x00\x00")
@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+from insider.api.views import FootprintViewSet
+from insider.models import Footprint
+from insider.settings import settings as insider_settings
+
+FOOTPRINTS = FootprintViewSet.as_view({"get": "list"})
+
+
+class SparseFieldsTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("staff", password="x", is_staff=True)
+        for n in range(3):
+            Footprint.objects.create(
+                request_path=f"/sparse/{n}/", request_method="GET", status_code=500, response_time=900.0,
+                user_agent="curl", stack_trace=[{"line": n}], response_body={"big": "x" * 1000},
+            )
+
+    def _list(self, **params):
+        request = APIRequestFactory().get("/insider/api/footprints/", params)
+        force_authenticate(request, user=self.user)
+        with CaptureQueriesContext(connections[insider_settings.DB_ALIAS]) as queries:
+            response = FOOTPRINTS(request)
+            response.render()
+        return response, [q["sql"] for q in queries.captured_queries if "insider_footprint" in q["sql"]]
+
+    def test_only_requested_columns_are_read(self):
+        response, queries = self._list(fields="id,request_path,is_slow")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data["results"][0]), {"id", "request_path", "is_slow"})
+        self.assertTrue(response.data["results"][0]["is_slow"])
+
+        page = queries[-1]
+        self.assertIn('"response_time"', page)
+        self.assertNotIn("user_agent", page)
+        self.assertNotIn("insider_footprintpayload", page)
+
+    def test_stack_trace_joins_the_payload_alone(self):
+        response, queries = self._list()
+        self.assertEqual(response.data["results"][0]["stack_trace"], [{"line": 2}])
+        self.assertIn("user_agent", response.data["results"][0])
+
+        page = queries[-1]
+        self.assertIn("insider_footprintpayload", page)
+        self.assertNotIn("response_body", page)
+        # One query for the count, one for the page: no per-row lookups.
+        self.assertEqual(len(queries), 2)
+
+    def test_unknown_field(self):
+        response, _ = self._list(fields="id,response_body")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+from django.core.management import call_command
+from django.db.utils import OperationalError
+from django.test import TestCase
+from django.utils import timezone
+from insider.models import Footprint, FootprintRollup, Incidence
+from insider.services.footprint import save_footprint, write_footprint
+from insider.services.spool import Spool
+from insider.settings import settings as insider_settings
+from utils import start_without_rollups
+
+
+class SpoolTest(TestCase):
+    databases = {'default', insider_settings.DB_ALIAS}
+
+    def setUp(self):
+        self.spool_dir = tempfile.mkdtemp(prefix="insider-spool-")
+        self.spool = Spool(self.spool_dir, segment_bytes=1024 * 1024)
+        start_without_rollups(insider_settings.DB_ALIAS)
+
+    def tearDown(self):
+        self.spool.close()
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+    def _data(self, n, status=200):
+        return {
+            "__db_alias": insider_settings.DB_ALIAS,
+            "request_id": f"spool-req-{n}",
+            "request_user": "anonymous",
+            "request_path": f"/spooled/{n}/",
+            "request_method": "post",
+            "request_body": {"n": n},
+            "status_code": status,
+            "response_time": 3.5,
+            "db_query_count": 0,
+        }
+
+    def test_frames_round_trip_and_stop_at_torn_tail(self):
+        for n in range(3):
+            self.spool.append(self._data(n))
+        self.spool.close()
+
+        segment = self.spool.segments()[0]
+        with open(segment, "ab") as handle:
+            handle.write(b"\x00\x00\x10")  # half-written header
+
+        records = [record for record, _ in self.spool.read(segment)]
+        self.assertEqual([r["request_body"] for r in records], [{"n": 0}, {"n": 1}, {"n": 2}])
+
+    def test_database_outage_is_spooled(self):
+        with mock.patch("insider.services.footprint.get_spool", return_value=self.spool), \
+                mock.patch("insider.sinks.orm.write_footprint", side_effect=OperationalError("down")):
+            save_footprint(self._data(1))
+
+        self.spool.close()
+        records = [record for record, _ in self.spool.read(self.spool.segments()[0])]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["__db_alias"], insider_settings.DB_ALIAS)
+
+    def test_replay_loads_spool_and_resumes(self):
+        for n in range(5):
+            self.spool.append(self._data(n))
+        self.spool.append(self._data(99, status=500))
+        self.spool.close()
+
+        segment = self.spool.segments()[0]
+
+        # Pretend a previous run already committed the first two records.
+        committed = [offset for _, offset in self.spool.read(segment)][1]
+        self.spool.commit_offset(segment, committed)
+
+        call_command("insider_replay_spool", spool_dir=self.spool_dir, batch_size=2, stdout=open(os.devnull, "w"))
+
+        self.assertEqual(Footprint.objects.count(), 4)
+        self.assertFalse(Footprint.objects.filter(request_id__in=["spool-req-0", "spool-req-1"]).exists())
+        self.assertEqual(Incidence.objects.count(), 1, "Spooled errors were not aggregated.")
+        self.assertEqual(self.spool.segments(), [], "Fully replayed segment was not removed.")
+
+    def test_replay_keeps_capture_time(self):
+        captured = timezone.now().replace(microsecond=0) - timedelta(hours=2)
+        for n, status in ((1, 200), (2, 500)):
+            self.spool.append({**self._data(n, status=status), "created_at": captured})
+        self.spool.close()
+
+        call_command("insider_replay_spool", spool_dir=self.spool_dir, stdout=open(os.devnull, "w"))
+
+        self.assertEqual(set(Footprint.objects.values_list("created_at", flat=True)), {captured})
+        self.assertEqual(set(FootprintRollup.objects.values_list("bucket", flat=True)), {captured.replace(second=0)})
+
+    def test_failed_insert_does_not_count_the_incidence(self):
+        data = self._data(1, status=500)
+        data.pop("__db_alias")
+        write_footprint(dict(data, request_id="first"), insider_settings.DB_ALIAS)
+
+        with mock.patch.object(Footprint, "save", side_effect=OperationalError("down")):
+            with self.assertRaises(OperationalError):
+                write_footprint(dict(data, request_id="second"), insider_settings.DB_ALIAS)
+
+        self.assertEqual(Incidence.objects.get().occurrence_count, 1)
+        write_footprint(dict(data, request_id="second"), insider_settings.DB_ALIAS)
+        self.assertEqual(Incidence.objects.get().occurrence_count, 2)
@@ -20,4 +20,18 @@ def execution_time(func):
         LOG.info(f"Total Execution time: {total_time}")
         return result
     
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+def start_without_rollups(db_alias):
+    """
+    Flushes the process-wide rollup buffer into the current test (cancelling
+    its timer) and empties the rollups table. A timer that fired during an
+    earlier test committed its rows from its own connection, so they are not
+    rolled back with that test.
+    """
+
+    from insider.models import FootprintRollup
+    from insider.services import rollups
+
+    rollups.rollup_buffer.flush()
+    FootprintRollup.objects.using(db_alias).all().delete()
@@ -1,6 +1,7 @@
 import sys
 import re
-from typing import Any, Dict
+from datetime import datetime
+from typing import Any, Dict, Tuple
 import hashlib
 
 
@@ -39,6 +40,27 @@ def is_celery_available() -> bool:
     return False
 
 
+def normalize_route(path: str) -> str:
+    """
+    Replaces numeric path segments (IDs) with {id}, so "/orders/12/" and
+    "/orders/13/" count as the same route.
+    """
+
+    return re.sub(r'/\d+/', '/{id}/', path or '')
+
+
+def series_window(since: datetime, until: datetime, bucket_seconds: int) -> Tuple[int, int]:
+    """
+    Returns (first bucket start in epoch seconds, number of buckets) of a
+    time series covering `since` to `until`. Buckets are aligned to
+    multiples of `bucket_seconds` since the epoch, so a bucket covers the
+    same span whatever the window; the last one holds `until`.
+    """
+
+    start = int(since.timestamp()) // bucket_seconds * bucket_seconds
+    return start, max(1, (int(until.timestamp()) - start) // bucket_seconds + 1)
+
+
 def generate_fingerprint(footprint_data: dict) -> str:
     """
     Generates a unique MD5 hash to group errors.
@@ -62,7 +84,6 @@ def generate_fingerprint(footprint_data: dict) -> str:
 
     else:
         # Normalize paths: replace digits (IDs) with {id} to group similar endpoint errors
-        normalized_path = re.sub(r'/\d+/', '/{id}/', path)
-        identify_string = f"{status}|{normalized_path}"
+        identify_string = f"{status}|{normalize_route(path)}"
 
     return hashlib.md5(identify_string.encode('utf-8')).hexdigest()
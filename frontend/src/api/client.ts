@@ -1,5 +1,5 @@
 import axios from 'axios';
-import type { DashboardStats, Incidence, Footprint, InsiderSetting, Integration } from '../types';
+import type { DashboardStats, IncidencePage, Footprint, InsiderSetting, Integration } from '../types';
 
 // Manually find the CSRF token in the browser cookies
 const getCookie = (name: string) => {
@@ -46,8 +46,8 @@ export const fetchDashboardStats = async (): Promise<DashboardStats> => {
   return response.data;
 };
 
-export const fetchIncidences = async (filter?: string): Promise<Incidence[]> => {
-  const params = filter ? { filter } : {};
+export const fetchIncidences = async (filter?: string, page: number = 1): Promise<IncidencePage> => {
+  const params = filter ? { page, filter } : { page };
   const response = await apiClient.get('incidences/', { params });
   return response.data;
 };
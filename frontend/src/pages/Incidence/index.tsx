@@ -1,7 +1,7 @@
 import { useState } from "react";
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { fetchIncidences, bulkResolveIncidences, bulkIgnoreIncidences } from "../../api/client";
-import { Search, ArrowUpDown, User, Check, XCircle } from "lucide-react";
+import { Search, ArrowUpDown, User, Check, XCircle, ArrowLeft, ArrowRight } from "lucide-react";
 import { Link } from "react-router-dom";
 import { formatDistanceToNow } from "date-fns";
 import { TableRowSkeleton } from "../../components/Skeleton";
@@ -12,13 +12,19 @@ export default function Incidence() {
   // State for Filtering and Selection
   const [activeFilter, setActiveFilter] = useState<string>(""); // '' | 'new' | 'regressions'
   const [selectedIds, setSelectedIds] = useState<number[]>([]);
+  const [page, setPage] = useState(1);
 
-  // Fetch Data with Filter
-  const { data: incidences, isLoading, isFetching } = useQuery({
-    queryKey: ["incidences", activeFilter],
-    queryFn: () => fetchIncidences(activeFilter),
+  // Fetch one page with Filter
+  const { data, isLoading, isFetching } = useQuery({
+    queryKey: ["incidences", activeFilter, page],
+    queryFn: () => fetchIncidences(activeFilter, page),
+    placeholderData: (previousData) => previousData,
   });
 
+  const incidences = data?.results;
+  const hasNext = !!data?.next;
+  const hasPrev = !!data?.previous;
+
   // Hybrid Loader Logic
   const showSkeleton = isLoading;
   const isFilterLoading = isFetching && !isLoading;
@@ -50,6 +56,17 @@ export default function Incidence() {
     }
   };
 
+  const changeFilter = (filter: string) => {
+    setActiveFilter(filter);
+    setPage(1);
+    setSelectedIds([]);
+  };
+
+  const changePage = (next: number) => {
+    setPage(next);
+    setSelectedIds([]); // Selection only spans the visible page
+  };
+
   const handleSelectRow = (id: number) => {
     setSelectedIds(prev => 
       prev.includes(id) ? prev.filter(i => i !== id) : [...prev, id]
@@ -85,27 +102,50 @@ export default function Incidence() {
           {/* Filter Dropdown Logic */}
           <div className="flex bg-white border border-gray-200 rounded-lg overflow-hidden">
              <button 
-               onClick={() => setActiveFilter("")}
+               onClick={() => changeFilter("")}
                disabled={isFilterLoading}
                className={`px-3 py-2 text-xs font-medium disabled:opacity-50 disabled:cursor-not-allowed ${activeFilter === "" ? "bg-gray-100 text-gray-900" : "text-gray-500 hover:bg-gray-50"}`}
              >
                All
              </button>
              <button 
-               onClick={() => setActiveFilter("new")}
+               onClick={() => changeFilter("new")}
                disabled={isFilterLoading}
                className={`px-3 py-2 text-xs font-medium border-l border-gray-200 disabled:opacity-50 disabled:cursor-not-allowed ${activeFilter === "new" ? "bg-gray-100 text-gray-900" : "text-gray-500 hover:bg-gray-50"}`}
              >
                New
              </button>
              <button 
-               onClick={() => setActiveFilter("regressions")}
+               onClick={() => changeFilter("regressions")}
                disabled={isFilterLoading}
                className={`px-3 py-2 text-xs font-medium border-l border-gray-200 disabled:opacity-50 disabled:cursor-not-allowed ${activeFilter === "regressions" ? "bg-gray-100 text-gray-900" : "text-gray-500 hover:bg-gray-50"}`}
              >
                Regressions
              </button>
           </div>
+
+          {/* Pagination Controls */}
+          <div className="flex items-center gap-2">
+            <span className="text-xs text-gray-500 font-medium">
+              Page {page} {data?.count ? `of ${Math.ceil(data.count / 50)}` : ''}
+            </span>
+            <div className="flex bg-white border border-gray-200 rounded-lg overflow-hidden shadow-sm">
+              <button
+                onClick={() => changePage(Math.max(1, page - 1))}
+                disabled={!hasPrev || isFilterLoading}
+                className="px-3 py-2 text-xs font-medium text-gray-600 hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed border-r border-gray-200"
+              >
+                <ArrowLeft size={14} />
+              </button>
+              <button
+                onClick={() => changePage(page + 1)}
+                disabled={!hasNext || isFilterLoading}
+                className="px-3 py-2 text-xs font-medium text-gray-600 hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed"
+              >
+                <ArrowRight size={14} />
+              </button>
+            </div>
+          </div>
         </div>
       </div>
 
@@ -7,6 +7,14 @@ export interface Incidence {
   last_seen: string;
 }
 
+export interface IncidencePage {
+  count: number;
+  next: string | null;
+  previous: string | null;
+  results: Incidence[];
+  status_counts: Record<Incidence['status'], number>;
+}
+
 export interface DashboardStats {
   velocity: {
     total_24h: number;